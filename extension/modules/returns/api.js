@@ -37,21 +37,69 @@ async function getAuthHeaders() {
   };
 }
 
+/**
+ * Pre-screen emails by headers before fetching and uploading their bodies.
+ * Runs only the backend's Stage 1 domain filter; rejected ids would be
+ * rejected by /api/extract too.
+ *
+ * @param {Array<{email_id: string, from_address: string, subject: string, snippet: string}>} emails
+ * @returns {Promise<Set<string>>} Ids of emails worth extracting
+ */
+async function screenEmails(emails) {
+  const headers = await getAuthHeaders();
+
+  const response = await fetch(`${API_BASE_URL}/api/extract/screen`, {
+    method: 'POST',
+    headers,
+    body: JSON.stringify({ emails }),
+  });
+
+  validateResponseOrigin(response);
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to screen email batch: ${response.status} ${errorText}`);
+  }
+
+  const data = await response.json();
+  return new Set(data.candidate_ids);
+}
+
+/**
+ * Gzip a JSON request body (email HTML compresses 5-20x).
+ * Falls back to plain JSON where CompressionStream is unavailable.
+ *
+ * @param {Object} payload
+ * @returns {Promise<{body: BodyInit, encoding: string|null}>}
+ */
+async function encodeJsonBody(payload) {
+  const json = JSON.stringify(payload);
+  if (typeof CompressionStream === 'undefined') {
+    return { body: json, encoding: null };
+  }
+  const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+  return { body: await new Response(stream).arrayBuffer(), encoding: 'gzip' };
+}
+
 /**
  * Process a batch of emails through the stateless extraction pipeline.
  * Sends all emails in one request for cross-email dedup and cancellation suppression.
  * No data is persisted on the server — results are returned as JSON.
  *
  * @param {Array<{email_id: string, from_address: string, subject: string, body: string, body_html?: string, received_at?: string}>} emails
- * @returns {Promise<{results: Array<{email_id: string, success: boolean, card?: Object, rejection_reason?: string}>, stats: Object}>}
+ * @returns {Promise<{success: boolean, cards: Array<Object>, retry_email_ids: Array<string>, stats: Object}>}
  */
 async function processEmailBatch(emails) {
   const headers = await getAuthHeaders();
+  const { body, encoding } = await encodeJsonBody({ emails });
+  if (encoding) {
+    headers['Content-Encoding'] = encoding;
+  }
 
   const response = await fetch(`${API_BASE_URL}/api/extract`, {
     method: 'POST',
     headers,
-    body: JSON.stringify({ emails }),
+    body,
   });
 
   validateResponseOrigin(response);
@@ -69,9 +117,16 @@ async function processEmailBatch(emails) {
     .filter(r => r.success && r.card)
     .map(r => r.card);
 
+  // Degraded results ran out of server time before the LLM saw them (no
+  // card, or a rules-only one); leave them unprocessed so the next scan retries
+  const retry_email_ids = data.results
+    .filter(r => r.degraded || r.rejection_reason === 'deadline:unclassified')
+    .map(r => r.email_id);
+
   return {
     success: true,
     cards,
+    retry_email_ids,
     stats: {
       total: data.stats.total,
       rejected_filter: data.stats.rejected_filter,
@@ -57,6 +57,7 @@ const CONFIG = {
 
   // --- Batch Processing ---
   BATCH_CHUNK_SIZE: 10,
+  SCREEN_CHUNK_SIZE: 500,
 
   // --- Storage Keys ---
   KEYS: {
@@ -498,11 +498,37 @@ function convertReturnCardToOrder(card, user_id) {
 // MAIN SCANNER
 // ============================================================
 
+/**
+ * Run the backend's Stage 1 filter over email headers before fetching bodies.
+ * Fails open: if screening is unavailable, every email stays a candidate and
+ * /api/extract applies the same filter after upload.
+ *
+ * @param {Array<Object>} emails - Collected metadata (email_id, from_address, subject, snippet)
+ * @returns {Promise<Set<string>>} Candidate email ids
+ */
+async function screenCandidates(emails) {
+  const candidates = new Set();
+  for (let i = 0; i < emails.length; i += CONFIG.SCREEN_CHUNK_SIZE) {
+    const chunk = emails.slice(i, i + CONFIG.SCREEN_CHUNK_SIZE);
+    try {
+      const ids = await screenEmails(chunk.map(({ email_id, from_address, subject, snippet }) => (
+        { email_id, from_address, subject, snippet }
+      )));
+      ids.forEach(id => candidates.add(id));
+    } catch (error) {
+      console.warn(SCANNER_LOG_PREFIX, 'Screen failed, fetching all bodies:', error.message);
+      chunk.forEach(email => candidates.add(email.email_id));
+    }
+  }
+  return candidates;
+}
+
 /**
  * Scan Gmail for purchase emails and process them as a batch.
  *
  * Flow:
- * 1. Collect — Loop through messages, apply local filter, fetch body for those that pass
+ * 1. Collect — Loop through messages, apply local filter, screen headers on the
+ *    backend (Stage 1), fetch body only for candidates
  * 2. Batch send — Send all collected emails to POST /api/returns/process-batch
  * 3. Store — Clear stale orders, upsert each returned card into local storage
  * 4. Post-scan — Local cancellation detection as safety net
@@ -588,6 +614,7 @@ async function scanPurchases(options = {}) {
   };
 
   // ---- Phase 1: Collect emails that pass local filter ----
+  const emailsToScreen = [];
   const emailsForBackend = [];
   const emailMetas = [];
 
@@ -631,6 +658,35 @@ async function scanPurchases(options = {}) {
         continue;
       }
 
+      emailsToScreen.push({
+        email_id: messageId,
+        from_address,
+        subject,
+        snippet,
+        received_at: receivedAt,
+        _internal_date_ms: parseInt(message.internalDate || '0'),
+      });
+
+    } catch (error) {
+      console.error(SCANNER_LOG_PREFIX, 'ERROR', messageId, error.message);
+      stats.errors++;
+    }
+  }
+
+  // ---- Phase 1b: Backend Stage 1 on headers, so only candidates' bodies are fetched ----
+  const candidateIds = await screenCandidates(emailsToScreen);
+
+  for (const meta of emailsToScreen) {
+    const messageId = meta.email_id;
+    try {
+      if (!candidateIds.has(messageId)) {
+        console.log(SCANNER_LOG_PREFIX, 'SCREEN_REJECTED', messageId);
+        await markEmailProcessed(messageId);
+        stats.blocked++;
+        stats.processed++;
+        continue;
+      }
+
       // Fetch full email body
       let body = '';
       let body_html = null;
@@ -655,12 +711,12 @@ async function scanPurchases(options = {}) {
 
       emailsForBackend.push({
         email_id: messageId,
-        from_address,
-        subject,
+        from_address: meta.from_address,
+        subject: meta.subject,
         body,
         body_html,
-        received_at: receivedAt,
-        _internal_date_ms: parseInt(message.internalDate || '0'),
+        received_at: meta.received_at,
+        _internal_date_ms: meta._internal_date_ms,
       });
 
       // Rate limiting between Gmail API calls
@@ -724,11 +780,16 @@ async function scanPurchases(options = {}) {
             }
           }
 
-          // Only mark emails as processed on success (retry on failure)
+          // Only mark emails as processed on success (retry on failure);
+          // emails the server degraded at its deadline are retried too
+          const retryIds = new Set(batchResponse.retry_email_ids || []);
           for (const email of chunk) {
+            if (retryIds.has(email.email_id)) {
+              continue;
+            }
             await markEmailProcessed(email.email_id);
           }
-          stats.processed += chunk.length;
+          stats.processed += chunk.length - retryIds.size;
 
           console.log(SCANNER_LOG_PREFIX, 'BATCH_CHUNK_RESULT',
             `${ci + 1}/${chunks.length}`,
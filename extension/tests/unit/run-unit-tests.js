@@ -170,6 +170,7 @@ function initSharedContext() {
       API_REQUEST_DELAY_MS: 0,
       MAX_MESSAGES_PER_QUERY: 100,
       BATCH_CHUNK_SIZE: 10,
+      SCREEN_CHUNK_SIZE: 500,
       MESSAGE_RATE_LIMIT_MAX: 100,
       MESSAGE_RATE_LIMIT_WINDOW_MS: 1000,
       VERBOSE_LOGGING: false,
@@ -232,6 +233,7 @@ function initSharedContext() {
   baseContext.upsertOrder = async (o) => o;
   baseContext.cancelOrderByOrderId = async () => null;
   baseContext.processEmailBatch = async () => ({ success: false });
+  baseContext.screenEmails = async (emails) => new Set(emails.map(e => e.email_id));
   baseContext.updateLastScanState = async () => {};
   baseContext.beginResolutionStats = () => {};
   baseContext.endResolutionStats = () => {};
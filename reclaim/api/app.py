@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, status
@@ -10,6 +12,7 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from reclaim.api.middleware.compression import CompressionMiddleware
 from reclaim.api.middleware.csrf import CSRFMiddleware
 from reclaim.api.middleware.rate_limit import RateLimitMiddleware
 from reclaim.api.middleware.security_headers import SecurityHeadersMiddleware
@@ -22,7 +25,19 @@ from reclaim.observability.telemetry import log_event
 # Load environment variables from .env file
 load_dotenv()
 
-app = FastAPI(title="Reclaim Return Watch API", version=APP_VERSION)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Build the shared extraction pipeline before serving traffic."""
+    from reclaim.returns import get_extractor
+    from reclaim.returns.jobs import get_job_manager
+
+    get_extractor()
+    yield
+    await get_job_manager().shutdown()
+
+
+app = FastAPI(title="Reclaim Return Watch API", version=APP_VERSION, lifespan=lifespan)
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -80,7 +95,7 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "X-Request-ID"],
+    allow_headers=["Content-Type", "Content-Encoding", "Authorization", "X-Request-ID"],
 )
 
 # SEC-006: CSRF protection - validate Origin header on state-changing requests
@@ -96,6 +111,10 @@ app.add_middleware(
 # Security headers
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Compressed request/response bodies (outermost: routes and the other
+# middleware only ever see decoded bodies)
+app.add_middleware(CompressionMiddleware)
+
 # Include routers (stateless — no database initialization needed)
 app.include_router(health_router)
 app.include_router(extract_router)
@@ -0,0 +1,409 @@
+"""Request/response body compression middleware for Reclaim API
+
+An ExtractRequest can carry 500 emails of mostly-markup HTML, which
+compresses 5-20x. This middleware lets clients upload it compressed and get
+compressed responses back:
+
+- Request bodies with Content-Encoding gzip, deflate, br or zstd are decoded
+  chunk by chunk as the app reads them, so streaming consumers never see
+  (or buffer) the compressed form. Decoding stops as soon as the output
+  exceeds API_DECODED_BODY_MAX_BYTES or API_DECOMPRESSION_RATIO_MAX times
+  the bytes received so far (zip bomb protection) -> 413.
+- Unknown encodings -> 415 with the supported list in Accept-Encoding.
+- Non-streaming responses of at least API_RESPONSE_COMPRESS_MIN_BYTES are
+  compressed with the best encoding the client accepts. Streamed responses
+  (NDJSON progress, SSE) pass through so each line still arrives on time.
+
+br and zstd need the optional brotli (>= 1.2 to accept br uploads) /
+zstandard packages; without them only gzip and deflate are offered or
+accepted.
+
+Written as plain ASGI (not BaseHTTPMiddleware) because the request body has
+to be rewritten on its way to route handlers.
+
+Metrics:
+    api.compression.request.<encoding>        counter, compressed requests
+    api.compression.request.bytes_wire        counter, bytes received
+    api.compression.request.bytes_decoded     counter, bytes after decoding
+    api.compression.rejected.<reason>         counter, unsupported/too_large/ratio/corrupt
+    api.compression.response.<encoding>       counter, compressed responses
+    api.compression.response.bytes_raw        counter, bytes before compression
+    api.compression.response.bytes_wire       counter, bytes sent
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException
+
+from reclaim.config import (
+    API_DECODED_BODY_MAX_BYTES,
+    API_DECOMPRESSION_RATIO_MAX,
+    API_RESPONSE_COMPRESS_MIN_BYTES,
+)
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter, log_event
+
+logger = get_logger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+# Decoders are fed at most this many compressed bytes at a time so one call
+# can't expand a tiny bomb into gigabytes before the size check runs
+_DECODE_SLICE_BYTES = 4096
+
+# Output chunk size for the zstd stream writer, i.e. how far past the output
+# budget a single zstd decode can run before it is stopped
+_ZSTD_WRITE_SIZE = 1 << 16
+
+# Ratio checks only kick in after this much output, since small repetitive
+# bodies (a few near-identical emails) legitimately compress very well
+_RATIO_GRACE_BYTES = 1 << 20
+
+
+class BodyDecodeError(HTTPException):
+    """Compressed request body could not be decoded within limits.
+
+    An HTTPException so that, raised from receive() while a route reads its
+    body, FastAPI passes it through as-is instead of turning it into a 400.
+    """
+
+    def __init__(self, reason: str, status_code: int, detail: str):
+        super().__init__(status_code=status_code, detail=detail)
+        self.reason = reason
+
+
+class _ZlibDecoder:
+    """gzip (wbits=31) or zlib/deflate (wbits=15) stream, output-capped per call."""
+
+    def __init__(self, wbits: int):
+        self._obj = zlib.decompressobj(wbits=wbits)
+
+    def decode(self, data: bytes, max_length: int) -> bytes:
+        out = self._obj.decompress(data, max_length)
+        if self._obj.unconsumed_tail:
+            # More output pending than the remaining budget allows
+            raise BodyDecodeError("too_large", 413, "Decoded request body too large")
+        return out
+
+
+class _BrotliDecoder:
+    """brotli stream, output-capped per call via output_buffer_limit (brotli >= 1.2)."""
+
+    def __init__(self) -> None:
+        self._obj = brotli.Decompressor()
+
+    def decode(self, data: bytes, max_length: int) -> bytes:
+        out = self._obj.process(data, output_buffer_limit=max_length)
+        if not self._obj.can_accept_more_data():
+            # More output pending than the remaining budget allows
+            raise BodyDecodeError("too_large", 413, "Decoded request body too large")
+        return out
+
+
+class _CappedSink:
+    """Write target for zstd's stream_writer that refuses output past a cap."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.limit = 0
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        if len(self.buffer) > self.limit:
+            raise BodyDecodeError("too_large", 413, "Decoded request body too large")
+        return len(data)
+
+
+class _ZstdDecoder:
+    """
+    zstd stream, output-capped per call.
+
+    zstandard's decompressobj has no output limit, and stream_reader can't be
+    refilled once its source runs dry, so input goes through a stream_writer
+    whose sink raises as soon as the output passes max_length. At most
+    _ZSTD_WRITE_SIZE bytes past the cap are ever materialized.
+    """
+
+    def __init__(self) -> None:
+        self._sink = _CappedSink()
+        self._obj = zstandard.ZstdDecompressor().stream_writer(
+            self._sink,  # type: ignore[arg-type]
+            write_size=_ZSTD_WRITE_SIZE,
+        )
+
+    def decode(self, data: bytes, max_length: int) -> bytes:
+        self._sink.limit = max_length
+        self._obj.write(data)
+        out = bytes(self._sink.buffer)
+        self._sink.buffer.clear()
+        return out
+
+
+def _decoders() -> dict[str, Callable[[], Any]]:
+    decoders: dict[str, Callable[[], Any]] = {
+        "gzip": lambda: _ZlibDecoder(31),
+        "x-gzip": lambda: _ZlibDecoder(31),
+        "deflate": lambda: _ZlibDecoder(15),
+    }
+    # Older brotli releases can't cap output per call, so a bomb would expand
+    # in full before the size check runs: only accept br when they can
+    if brotli is not None and hasattr(brotli.Decompressor, "can_accept_more_data"):
+        decoders["br"] = _BrotliDecoder
+    if zstandard is not None:
+        decoders["zstd"] = _ZstdDecoder
+    return decoders
+
+
+def _encoders() -> dict[str, Callable[[bytes], bytes]]:
+    """Response encoders in server preference order."""
+    encoders: dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=4)
+    encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=6)
+    return encoders
+
+
+DECODERS = _decoders()
+ENCODERS = _encoders()
+
+
+class BodyDecoder:
+    """
+    Incremental decoder for one request body, enforcing size and ratio limits.
+
+    feed() returns the decoded bytes for each compressed chunk as it arrives,
+    so nothing upstream has to hold the whole body.
+
+    Raises (from feed):
+        BodyDecodeError: limits exceeded (413) or corrupt data (400)
+    """
+
+    def __init__(
+        self,
+        encoding: str,
+        max_bytes: int = API_DECODED_BODY_MAX_BYTES,
+        max_ratio: float = API_DECOMPRESSION_RATIO_MAX,
+    ):
+        factory = DECODERS.get(encoding)
+        if factory is None:
+            raise BodyDecodeError("unsupported", 415, f"Unsupported Content-Encoding: {encoding}")
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.max_ratio = max_ratio
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._decoder = factory()
+
+    def feed(self, chunk: bytes) -> bytes:
+        out = bytearray()
+        try:
+            for start in range(0, len(chunk), _DECODE_SLICE_BYTES):
+                piece = chunk[start : start + _DECODE_SLICE_BYTES]
+                self.wire_bytes += len(piece)
+                decoded = self._decoder.decode(piece, self.max_bytes - self.decoded_bytes + 1)
+                self.decoded_bytes += len(decoded)
+                out += decoded
+                if self.decoded_bytes > self.max_bytes:
+                    raise BodyDecodeError("too_large", 413, "Decoded request body too large")
+                if (
+                    self.decoded_bytes > _RATIO_GRACE_BYTES
+                    and self.decoded_bytes > self.wire_bytes * self.max_ratio
+                ):
+                    raise BodyDecodeError("ratio", 413, "Request body compression ratio too high")
+        except BodyDecodeError:
+            raise
+        except Exception as e:
+            raise BodyDecodeError("corrupt", 400, "Malformed compressed request body") from e
+        return bytes(out)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Best server-supported encoding the client accepts (q > 0), or None."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+
+    best: str | None = None
+    best_q = 0.0
+    for name in ENCODERS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Decode compressed request bodies and compress eligible responses."""
+
+    def __init__(
+        self,
+        app: Any,
+        max_decoded_bytes: int = API_DECODED_BODY_MAX_BYTES,
+        max_ratio: float = API_DECOMPRESSION_RATIO_MAX,
+        min_response_bytes: int = API_RESPONSE_COMPRESS_MIN_BYTES,
+    ) -> None:
+        self.app = app
+        self.max_decoded_bytes = max_decoded_bytes
+        self.max_ratio = max_ratio
+        self.min_response_bytes = min_response_bytes
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.lower(): v for k, v in scope["headers"]}
+        content_encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+
+        if content_encoding and content_encoding != "identity":
+            try:
+                decoder = BodyDecoder(content_encoding, self.max_decoded_bytes, self.max_ratio)
+            except BodyDecodeError as e:
+                counter(f"api.compression.rejected.{e.reason}")
+                logger.warning("Rejected %s request body: %s", content_encoding, e.detail)
+                await self._send_error(send, e)
+                return
+            scope, receive = self._decoding_receive(scope, receive, decoder)
+
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._compressing_send(send, encoding))
+
+    @staticmethod
+    def _decoding_receive(
+        scope: dict, receive: Callable, decoder: BodyDecoder
+    ) -> tuple[dict, Callable]:
+        """
+        Scope/receive that decode the body chunk by chunk as the app reads it.
+
+        The decoded length isn't known up front, so Content-Length is dropped
+        along with Content-Encoding. A limit breach surfaces in the route as
+        BodyDecodeError (413/400) when it reads the offending chunk.
+        """
+        new_headers = [
+            (k, v)
+            for k, v in scope["headers"]
+            if k.lower() not in (b"content-encoding", b"content-length")
+        ]
+        scope = {**scope, "headers": new_headers}
+
+        async def decoding_receive() -> dict:
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+
+            try:
+                body = decoder.feed(message.get("body", b""))
+            except BodyDecodeError as e:
+                counter(f"api.compression.rejected.{e.reason}")
+                logger.warning("Rejected %s request body: %s", decoder.encoding, e.detail)
+                raise
+
+            if not message.get("more_body", False):
+                counter(f"api.compression.request.{decoder.encoding}")
+                counter("api.compression.request.bytes_wire", decoder.wire_bytes)
+                counter("api.compression.request.bytes_decoded", decoder.decoded_bytes)
+                log_event(
+                    "api.compression.request",
+                    path=scope.get("path", ""),
+                    encoding=decoder.encoding,
+                    wire_bytes=decoder.wire_bytes,
+                    decoded_bytes=decoder.decoded_bytes,
+                    ratio=round(decoder.decoded_bytes / decoder.wire_bytes, 2)
+                    if decoder.wire_bytes
+                    else 0.0,
+                )
+            return {**message, "body": body}
+
+        return scope, decoding_receive
+
+    def _compressing_send(self, send: Callable, encoding: str) -> Callable:
+        """Wrap send to compress single-message bodies; streams pass through."""
+        start_message: dict | None = None
+        passthrough = False
+
+        async def wrapped(message: dict) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                header_names = {k.lower() for k, _ in message.get("headers", [])}
+                passthrough = b"content-encoding" in header_names
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            start, start_message = start_message, None
+            if message.get("more_body", False) or len(body) < self.min_response_bytes:
+                # Streaming or too small to be worth it: send as-is from here on
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = ENCODERS[encoding](body)
+            vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+            headers = [
+                (k, v)
+                for k, v in start.get("headers", [])
+                if k.lower() not in (b"content-length", b"vary")
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b", ".join([*vary, b"Accept-Encoding"])),
+            ]
+            counter(f"api.compression.response.{encoding}")
+            counter("api.compression.response.bytes_raw", len(body))
+            counter("api.compression.response.bytes_wire", len(compressed))
+            await send({**start, "headers": headers})
+            await send({**message, "body": compressed})
+
+        return wrapped
+
+    @staticmethod
+    async def _send_error(send: Callable, error: BodyDecodeError) -> None:
+        body = json.dumps({"detail": error.detail}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        if error.status_code == 415:
+            headers.append((b"accept-encoding", ", ".join(DECODERS).encode("latin-1")))
+        await send({"type": "http.response.start", "status": error.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
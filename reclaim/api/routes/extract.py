@@ -6,20 +6,44 @@ and returns structured JSON. No database writes, no user data stored.
 
 from __future__ import annotations
 
+import json
 import time
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
+import orjson
 from cachetools import TTLCache
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field, field_validator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from reclaim.api.middleware.user_auth import AuthenticatedUser, get_current_user
-from reclaim.config import API_BATCH_SIZE_MAX
+from reclaim.config import (
+    API_BATCH_SIZE_MAX,
+    API_SCREEN_BATCH_SIZE_MAX,
+    EXTRACT_DEADLINE_MAX_S,
+    EXTRACT_DEADLINE_S,
+)
 from reclaim.observability.logging import get_logger
-from reclaim.returns.types import ExtractionStage
+from reclaim.observability.telemetry import TimingCollector, collect_timings, counter
+from reclaim.returns.deadline import Deadline
+from reclaim.returns.jobs import (
+    ExtractionJob,
+    JobQueueFullError,
+    JobStatus,
+    JobUserLimitError,
+    get_job_manager,
+)
+from reclaim.returns.types import ExtractionResult, ExtractionStage
+from reclaim.utils.json_stream import JSONStreamError, iter_json_array_items
 from reclaim.utils.validators import validate_email_id
 
+if TYPE_CHECKING:
+    from reclaim.returns.extractor import ReturnableReceiptExtractor
+    from reclaim.returns.models import ReturnCard
+
 router = APIRouter(prefix="/api", tags=["extract"])
 logger = get_logger(__name__)
 
@@ -28,6 +52,10 @@ logger = get_logger(__name__)
 _LLM_RATE_LIMIT_PER_MIN = 10
 _llm_user_buckets: TTLCache[str, list[float]] = TTLCache(maxsize=1000, ttl=120)
 
+# Largest single email the incremental parser will buffer: ExtractEmail's
+# body + body_html limits, with headroom for JSON escaping of the HTML
+_MAX_EMAIL_JSON_CHARS = 4 * (50000 + 500000)
+
 
 async def _check_llm_rate_limit(
     user: AuthenticatedUser = Depends(get_current_user),
@@ -108,6 +136,9 @@ class ExtractResultItem(BaseModel):
     card: ExtractedCard | None = None
     rejection_reason: str | None = None
     stage_reached: str | None = None
+    # The request deadline left no time for the LLM: rules-only card, or no
+    # card at all when the email was never classified
+    degraded: bool = False
 
 
 class ExtractStats(BaseModel):
@@ -118,6 +149,21 @@ class ExtractStats(BaseModel):
     rejected_classifier: int
     rejected_empty: int
     cards_extracted: int
+    degraded: int = 0
+
+
+class ExtractStageTiming(BaseModel):
+    """Time spent in one pipeline stage, summed over the batch's emails."""
+
+    total_ms: float
+    calls: int
+
+
+class ExtractDebug(BaseModel):
+    """Per-request diagnostics, included with ``?debug=true``."""
+
+    duration_ms: float
+    stages: dict[str, ExtractStageTiming]
 
 
 class ExtractResponse(BaseModel):
@@ -125,6 +171,353 @@ class ExtractResponse(BaseModel):
 
     results: list[ExtractResultItem]
     stats: ExtractStats
+    debug: ExtractDebug | None = None
+
+
+class ExtractStreamResult(BaseModel):
+    """NDJSON stream event: one email finished (sent in completion order)."""
+
+    type: Literal["result"] = "result"
+    index: int  # Position of the email in the request batch
+    item: ExtractResultItem
+
+
+class ExtractStreamComplete(BaseModel):
+    """Final NDJSON stream event: authoritative results after batch post-passes.
+
+    ``results`` reflects dedup merges and cancelled-order suppression, so it
+    supersedes the per-email ``result`` events streamed before it.
+    """
+
+    type: Literal["complete"] = "complete"
+    results: list[ExtractResultItem]
+    stats: ExtractStats
+
+
+class ScreenEmail(BaseModel):
+    """Headers of one email for the Stage 1 pre-screen (no body)."""
+
+    email_id: str
+    from_address: str = Field(..., max_length=500)
+    subject: str = Field(..., max_length=2000)
+    # First 2000 chars of the plain-text body, as Stage 1 sees it in /extract
+    snippet: str = Field("", max_length=2000)
+
+    @field_validator("email_id")
+    @classmethod
+    def validate_email(cls, v: str) -> str:
+        validated = validate_email_id(v)
+        if not validated:
+            raise ValueError("Invalid email_id")
+        return validated
+
+
+class ScreenRequest(BaseModel):
+    """Request to pre-screen emails with Stage 1 before uploading bodies."""
+
+    emails: list[ScreenEmail] = Field(..., max_length=API_SCREEN_BATCH_SIZE_MAX)
+
+
+class ScreenResponse(BaseModel):
+    """Ids worth extracting; everything else would be rejected at Stage 1."""
+
+    candidate_ids: list[str]
+    total: int
+    rejected: int
+
+
+class ExtractJobStatus(BaseModel):
+    """Background extraction job progress (``result`` is set once completed)."""
+
+    job_id: str
+    status: str  # queued | running | completed | failed
+    total: int
+    completed: int
+    result: ExtractResponse | None = None
+    error: str | None = None
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+
+def _card_payload(card: ReturnCard, user_id: str) -> dict[str, Any]:
+    """Plain-dict ExtractedCard, built straight from the pipeline's ReturnCard."""
+    card.user_id = user_id
+    return {
+        "id": card.id,
+        "merchant": card.merchant,
+        "merchant_domain": card.merchant_domain,
+        "item_summary": card.item_summary,
+        "status": card.status if isinstance(card.status, str) else card.status.value,
+        "confidence": card.confidence
+        if isinstance(card.confidence, str)
+        else card.confidence.value,
+        "source_email_ids": card.source_email_ids,
+        "order_number": card.order_number,
+        "amount": card.amount,
+        "currency": card.currency,
+        "order_date": card.order_date.isoformat() if card.order_date else None,
+        "delivery_date": card.delivery_date.isoformat() if card.delivery_date else None,
+        "return_by_date": card.return_by_date.isoformat() if card.return_by_date else None,
+        "return_portal_link": card.return_portal_link,
+        "shipping_tracking_link": card.shipping_tracking_link,
+        "evidence_snippet": card.evidence_snippet,
+        "days_remaining": card.days_until_expiry(),
+        "created_at": card.created_at.isoformat() if card.created_at else None,
+        "updated_at": card.updated_at.isoformat() if card.updated_at else None,
+    }
+
+
+def _result_payload(result: ExtractionResult, user_id: str) -> dict[str, Any]:
+    """Plain-dict ExtractResultItem for one pipeline result."""
+    if not result.success or not result.card:
+        # Get email_id from the result's card if available
+        email_id = ""
+        if result.card and result.card.source_email_ids:
+            email_id = result.card.source_email_ids[0]
+
+        return {
+            "email_id": email_id,
+            "success": False,
+            "card": None,
+            "rejection_reason": result.rejection_reason,
+            "stage_reached": result.stage_reached.value if result.stage_reached else None,
+            "degraded": result.degraded,
+        }
+
+    card = result.card
+    return {
+        "email_id": card.source_email_ids[0] if card.source_email_ids else "",
+        "success": True,
+        "card": _card_payload(card, user_id),
+        "rejection_reason": None,
+        "stage_reached": "extractor",
+        "degraded": result.degraded,
+    }
+
+
+def _response_payload(results: list[ExtractionResult], total: int, user_id: str) -> dict[str, Any]:
+    """Plain-dict ExtractResponse (result items + rejection stats)."""
+    stats = {
+        "total": total,
+        "rejected_filter": 0,
+        "rejected_classifier": 0,
+        "rejected_empty": 0,
+        "cards_extracted": 0,
+        "degraded": 0,
+    }
+
+    result_items: list[dict[str, Any]] = []
+
+    for result in results:
+        if result.degraded:
+            stats["degraded"] += 1
+        if not result.success or not result.card:
+            # Count rejection reasons (candidates held back unclassified at the
+            # deadline passed Stage 1 and only count as degraded)
+            if result.stage_reached == ExtractionStage.FILTER:
+                if not result.degraded:
+                    stats["rejected_filter"] += 1
+            elif result.stage_reached == ExtractionStage.CLASSIFIER:
+                stats["rejected_classifier"] += 1
+            else:
+                stats["rejected_empty"] += 1
+        else:
+            stats["cards_extracted"] += 1
+
+        result_items.append(_result_payload(result, user_id))
+
+    return {"results": result_items, "stats": stats, "debug": None}
+
+
+def _to_result_item(result: ExtractionResult, user_id: str) -> ExtractResultItem:
+    """Convert a pipeline ExtractionResult into the API result item."""
+    return ExtractResultItem.model_validate(_result_payload(result, user_id))
+
+
+def _build_response(results: list[ExtractionResult], total: int, user_id: str) -> ExtractResponse:
+    """Build the batch response model (streaming and job endpoints)."""
+    return ExtractResponse.model_validate(_response_payload(results, total, user_id))
+
+
+def _json_response(payload: dict[str, Any], headers: dict[str, str] | None = None) -> Response:
+    """
+    Serialize an already-shaped payload without a second pydantic pass.
+
+    /extract builds its response as plain dicts matching ExtractResponse
+    (see _response_payload), so FastAPI's validate-then-encode step would
+    only repeat work; orjson encodes the dicts directly.
+    """
+    return Response(content=orjson.dumps(payload), media_type="application/json", headers=headers)
+
+
+def _stage_breakdown(timings: TimingCollector) -> dict[str, ExtractStageTiming]:
+    """Per-stage totals recorded while the request ran."""
+    from reclaim.returns.extractor import stage_timings
+
+    return {
+        stage: ExtractStageTiming(total_ms=round(total * 1000, 1), calls=calls)
+        for stage, (total, calls) in stage_timings(timings).items()
+    }
+
+
+def _server_timing(stages: dict[str, ExtractStageTiming], duration_ms: float) -> str:
+    """Format a Server-Timing header value (stage durations are summed over emails)."""
+    entries = [
+        f'{stage};dur={timing.total_ms};desc="{timing.calls} calls"'
+        for stage, timing in stages.items()
+    ]
+    entries.append(f"total;dur={round(duration_ms, 1)}")
+    return ", ".join(entries)
+
+
+def _request_deadline(deadline_ms: int | None) -> Deadline:
+    """The client's deadline if given (capped), else EXTRACT_DEADLINE_S from now."""
+    seconds = deadline_ms / 1000 if deadline_ms is not None else EXTRACT_DEADLINE_S
+    return Deadline.after(min(seconds, EXTRACT_DEADLINE_MAX_S))
+
+
+def _to_pipeline_email(email: ExtractEmail) -> dict[str, Any]:
+    """Convert one request email to the dict format the pipeline expects."""
+    return {
+        "id": email.email_id,
+        "from": email.from_address,
+        "subject": email.subject,
+        "body": email.body,
+        "body_html": email.body_html,
+        "received_at": datetime.fromisoformat(email.received_at) if email.received_at else None,
+    }
+
+
+def _to_pipeline_emails(request: ExtractRequest) -> list[dict[str, Any]]:
+    """Convert request emails to the dict format process_email_batch() expects."""
+    return [_to_pipeline_email(email) for email in request.emails]
+
+
+async def _parse_emails_incrementally(
+    request: Request, parsed: list[int]
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Validate and yield pipeline emails one at a time as the body streams in.
+
+    parsed[0] counts the emails yielded so far. Shape and field errors are
+    raised as RequestValidationError so they get the same sanitized 422 as
+    /extract; they can surface after earlier emails were already yielded.
+    """
+    items = iter_json_array_items(request.stream(), "emails", _MAX_EMAIL_JSON_CHARS)
+    try:
+        async for raw in items:
+            index = parsed[0]
+            if index >= API_BATCH_SIZE_MAX:
+                raise RequestValidationError(
+                    [{"type": "too_long", "loc": ("body", "emails"), "msg": "Too many emails"}]
+                )
+            try:
+                email = ExtractEmail.model_validate(raw)
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [{**err, "loc": ("body", "emails", index, *err["loc"])} for err in e.errors()]
+                ) from e
+            parsed[0] = index + 1
+            yield _to_pipeline_email(email)
+    except JSONStreamError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": str(e)}]
+        ) from e
+
+
+def _result_event(index: int, result: ExtractionResult, email_id: str, user_id: str) -> str:
+    """Serialize one NDJSON ``result`` event."""
+    item = _to_result_item(result, user_id)
+    if not item.email_id:
+        # Rejections carry no card; the request knows which email this was
+        item.email_id = email_id
+    return ExtractStreamResult(index=index, item=item).model_dump_json() + "\n"
+
+
+def _complete_event(response: ExtractResponse) -> str:
+    """Serialize the final NDJSON ``complete`` event."""
+    return (
+        ExtractStreamComplete(results=response.results, stats=response.stats).model_dump_json()
+        + "\n"
+    )
+
+
+def _error_event() -> str:
+    """Serialize an in-band NDJSON ``error`` event (headers are already sent)."""
+    return json.dumps({"type": "error", "detail": "Failed to extract email batch"}) + "\n"
+
+
+async def _stream_extraction(
+    extractor: ReturnableReceiptExtractor,
+    user_id: str,
+    emails: list[dict[str, Any]],
+    deadline: Deadline | None = None,
+) -> AsyncIterator[str]:
+    """Yield NDJSON lines: one ``result`` per email, then one ``complete``."""
+    results: list[ExtractionResult | None] = [None] * len(emails)
+    try:
+        async for index, result in extractor.iter_email_batch_async(
+            user_id, emails, deadline=deadline
+        ):
+            results[index] = result
+            yield _result_event(index, result, emails[index]["id"], user_id)
+
+        finalized = extractor.finalize_batch(user_id, emails, [r for r in results if r is not None])
+        response = _build_response(finalized, len(emails), user_id)
+        yield _complete_event(response)
+
+        logger.info(
+            "Streamed extraction complete: %d emails -> %d cards extracted",
+            len(emails),
+            response.stats.cards_extracted,
+        )
+
+    except Exception as e:
+        logger.error("Failed to stream email batch: %s", e, exc_info=True)
+        yield _error_event()
+
+
+async def _stream_job(job: ExtractionJob) -> AsyncIterator[str]:
+    """Yield a job's NDJSON events from the start, following it until it finishes."""
+    sent = 0
+    while True:
+        # Snapshot before yielding: progress may grow while the client reads.
+        # Progress made after the snapshot sets `changed`, so the wait below
+        # returns straight away rather than waiting for the next update
+        changed = job.next_change()
+        done = job.done
+        pending = job.progress[sent:]
+        for index, result in pending:
+            yield _result_event(index, result, job.email_ids[index], job.user_id)
+        sent += len(pending)
+
+        if done:
+            break
+        await job.wait_for_change(changed)
+
+    if job.status == JobStatus.COMPLETED and job.results is not None:
+        yield _complete_event(_build_response(job.results, job.total, job.user_id))
+    else:
+        yield _error_event()
+
+
+def _job_status(job: ExtractionJob) -> ExtractJobStatus:
+    """Build the polling view of a job (results only once it has finished)."""
+    result = None
+    if job.status == JobStatus.COMPLETED and job.results is not None:
+        result = _build_response(job.results, job.total, job.user_id)
+
+    return ExtractJobStatus(
+        job_id=job.id,
+        status=job.status.value,
+        total=job.total,
+        completed=job.completed,
+        result=result,
+        error=job.error,
+    )
 
 
 # ============================================================================
@@ -136,7 +529,12 @@ class ExtractResponse(BaseModel):
 async def extract_emails(
     request: ExtractRequest,
     user: AuthenticatedUser = Depends(get_current_user),
-) -> ExtractResponse:
+    stream: bool = Query(False, description="Stream NDJSON events as emails finish"),
+    debug: bool = Query(False, description="Include per-stage timings in the response"),
+    deadline_ms: int | None = Query(
+        None, ge=1, description="Time budget for the batch; defaults to the server's"
+    ),
+) -> Response:
     """
     Extract return card data from a batch of emails (stateless).
 
@@ -144,122 +542,256 @@ async def extract_emails(
     deduplicates across the batch, and returns structured JSON. No data is persisted.
     Email content is processed and immediately discarded.
 
+    With ``?stream=true`` the response is ``application/x-ndjson``: one
+    ``result`` event per email as soon as it finishes, then a ``complete``
+    event with the deduplicated results and stats.
+
+    Non-streamed responses carry a ``Server-Timing`` header with the time
+    spent in each pipeline stage (summed over the batch's emails); with
+    ``?debug=true`` the same breakdown is returned in ``debug``.
+
+    Results always come back within the request deadline (``deadline_ms``,
+    default EXTRACT_DEADLINE_S). Emails the LLM can't finish in time are
+    marked ``degraded``: extracted with rules only when the classifier
+    already accepted them, otherwise returned without a card.
+
     Max 500 emails per batch.
     """
-    from reclaim.returns import ReturnableReceiptExtractor
+    from reclaim.returns import get_extractor
 
     try:
         user_id = user.id
+        # Started before parsing so the budget covers the whole request
+        deadline = _request_deadline(deadline_ms)
+
+        emails = _to_pipeline_emails(request)
 
-        # Convert request emails to the dict format process_email_batch() expects
-        emails = [
-            {
-                "id": email.email_id,
-                "from": email.from_address,
-                "subject": email.subject,
-                "body": email.body,
-                "body_html": email.body_html,
-                "received_at": datetime.fromisoformat(email.received_at)
-                if email.received_at
-                else None,
-            }
-            for email in request.emails
-        ]
-
-        logger.info("Extracting batch of %d emails for user %s", len(emails), user_id)
-
-        extractor = ReturnableReceiptExtractor()
-        results = extractor.process_email_batch(user_id, emails)
-
-        # Build response
-        stats = ExtractStats(
-            total=len(request.emails),
-            rejected_filter=0,
-            rejected_classifier=0,
-            rejected_empty=0,
-            cards_extracted=0,
+        logger.info(
+            "Extracting batch of %d emails for user %s (stream=%s)", len(emails), user_id, stream
         )
 
-        result_items: list[ExtractResultItem] = []
-
-        for result in results:
-            if not result.success or not result.card:
-                # Count rejection reasons
-                if result.stage_reached == ExtractionStage.FILTER:
-                    stats.rejected_filter += 1
-                elif result.stage_reached == ExtractionStage.CLASSIFIER:
-                    stats.rejected_classifier += 1
-                else:
-                    stats.rejected_empty += 1
-
-                # Get email_id from the result's card if available
-                email_id = ""
-                if result.card and result.card.source_email_ids:
-                    email_id = result.card.source_email_ids[0]
-
-                result_items.append(
-                    ExtractResultItem(
-                        email_id=email_id,
-                        success=False,
-                        rejection_reason=result.rejection_reason,
-                        stage_reached=result.stage_reached.value if result.stage_reached else None,
-                    )
-                )
-            else:
-                card = result.card
-                card.user_id = user_id
-                stats.cards_extracted += 1
-
-                result_items.append(
-                    ExtractResultItem(
-                        email_id=card.source_email_ids[0] if card.source_email_ids else "",
-                        success=True,
-                        card=ExtractedCard(
-                            id=card.id,
-                            merchant=card.merchant,
-                            merchant_domain=card.merchant_domain,
-                            item_summary=card.item_summary,
-                            status=card.status
-                            if isinstance(card.status, str)
-                            else card.status.value,
-                            confidence=card.confidence
-                            if isinstance(card.confidence, str)
-                            else card.confidence.value,
-                            source_email_ids=card.source_email_ids,
-                            order_number=card.order_number,
-                            amount=card.amount,
-                            currency=card.currency,
-                            order_date=card.order_date.isoformat() if card.order_date else None,
-                            delivery_date=card.delivery_date.isoformat()
-                            if card.delivery_date
-                            else None,
-                            return_by_date=card.return_by_date.isoformat()
-                            if card.return_by_date
-                            else None,
-                            return_portal_link=card.return_portal_link,
-                            shipping_tracking_link=card.shipping_tracking_link,
-                            evidence_snippet=card.evidence_snippet,
-                            days_remaining=card.days_until_expiry(),
-                            created_at=card.created_at.isoformat() if card.created_at else None,
-                            updated_at=card.updated_at.isoformat() if card.updated_at else None,
-                        ),
-                        stage_reached="extractor",
-                    )
-                )
+        # Shared warm pipeline (rules reload only when merchant_rules.yaml changes)
+        extractor = get_extractor()
+
+        if stream:
+            counter("api.extract.stream")
+            return StreamingResponse(
+                _stream_extraction(extractor, user_id, emails, deadline),
+                media_type="application/x-ndjson",
+            )
+
+        # Async pipeline: LLM calls are awaited so this worker keeps serving
+        # other requests (and health checks) while the batch is in flight
+        started = time.perf_counter()
+        with collect_timings() as timings:
+            results = await extractor.process_email_batch_async(user_id, emails, deadline=deadline)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        payload = _response_payload(results, len(request.emails), user_id)
+
+        stages = _stage_breakdown(timings)
+        if debug:
+            payload["debug"] = ExtractDebug(
+                duration_ms=round(duration_ms, 1), stages=stages
+            ).model_dump()
 
         logger.info(
             "Extraction complete: %d emails -> %d cards extracted",
             len(request.emails),
-            stats.cards_extracted,
+            payload["stats"]["cards_extracted"],
         )
 
-        return ExtractResponse(results=result_items, stats=stats)
+        return _json_response(
+            payload, headers={"Server-Timing": _server_timing(stages, duration_ms)}
+        )
 
     except Exception as e:
         logger.error("Failed to extract email batch: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to extract email batch") from e
 
 
+@router.post(
+    "/extract/incremental",
+    response_model=ExtractResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/ExtractRequest"}}
+            },
+        }
+    },
+)
+async def extract_emails_incremental(
+    request: Request,
+    user: AuthenticatedUser = Depends(get_current_user),
+    debug: bool = Query(False, description="Include per-stage timings in the response"),
+    deadline_ms: int | None = Query(
+        None, ge=1, description="Time budget for the batch; defaults to the server's"
+    ),
+) -> Response:
+    """
+    Same request and response as /extract, parsed incrementally.
+
+    Instead of materializing the whole ExtractRequest first, emails are
+    parsed, validated and fed into the pipeline one at a time as the body
+    arrives, and each body is released once its email has been processed.
+    Peak memory is bounded by the emails in flight (LLM_MAX_CONCURRENCY)
+    rather than by the batch, which matters for large scans with HTML.
+
+    A malformed email later in the body still fails the whole request (422).
+    """
+    from reclaim.returns import get_extractor
+
+    try:
+        user_id = user.id
+        deadline = _request_deadline(deadline_ms)
+        counter("api.extract.incremental")
+
+        parsed = [0]
+        started = time.perf_counter()
+        with collect_timings() as timings:
+            results = await get_extractor().process_email_stream_async(
+                user_id, _parse_emails_incrementally(request, parsed), deadline=deadline
+            )
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        payload = _response_payload(results, parsed[0], user_id)
+
+        stages = _stage_breakdown(timings)
+        if debug:
+            payload["debug"] = ExtractDebug(
+                duration_ms=round(duration_ms, 1), stages=stages
+            ).model_dump()
+
+        logger.info(
+            "Incremental extraction complete: %d emails -> %d cards extracted",
+            parsed[0],
+            payload["stats"]["cards_extracted"],
+        )
+
+        return _json_response(
+            payload, headers={"Server-Timing": _server_timing(stages, duration_ms)}
+        )
+
+    except (RequestValidationError, HTTPException):
+        raise
+    except Exception as e:
+        logger.error("Failed to extract email batch: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to extract email batch") from e
+
+
+# ============================================================================
+# Stage 1 Pre-screen
+# ============================================================================
+
+
+@router.post("/extract/screen", response_model=ScreenResponse)
+async def screen_emails(
+    request: ScreenRequest,
+    user: AuthenticatedUser = Depends(get_current_user),
+) -> ScreenResponse:
+    """
+    Run only Stage 1 (domain filter) on email headers and return the candidates.
+
+    Lets the extension upload bodies to ``/api/extract`` only for emails that
+    can get past Stage 1. The filter is the same one ``/api/extract`` runs, so
+    an email screened out here would be rejected there too, provided the
+    snippet is the start of the plain-text body. No LLM calls are made.
+
+    Max 2000 emails per batch.
+    """
+    from reclaim.returns import get_extractor
+
+    emails = request.emails
+    screened = get_extractor().domain_filter.filter_batch(
+        [email.from_address for email in emails],
+        [email.subject for email in emails],
+        [email.snippet for email in emails],
+    )
+    candidate_ids = [
+        email.email_id
+        for email, is_candidate in zip(emails, screened.is_candidate, strict=True)
+        if is_candidate
+    ]
+
+    total = len(request.emails)
+    counter("api.extract.screen")
+    counter("api.extract.screen.emails", total)
+    counter("api.extract.screen.candidates", len(candidate_ids))
+    logger.info(
+        "Screened %d emails for user %s -> %d candidates", total, user.id, len(candidate_ids)
+    )
+
+    return ScreenResponse(
+        candidate_ids=candidate_ids, total=total, rejected=total - len(candidate_ids)
+    )
+
+
+# ============================================================================
+# Extraction Jobs
+# ============================================================================
+
+
+@router.post("/extract/jobs", response_model=ExtractJobStatus, status_code=202)
+async def submit_extraction_job(
+    request: ExtractRequest,
+    user: AuthenticatedUser = Depends(get_current_user),
+) -> ExtractJobStatus:
+    """
+    Submit a batch for background extraction and return its job id immediately.
+
+    Poll ``GET /api/extract/jobs/{job_id}`` for progress and the final result,
+    or stream ``GET /api/extract/jobs/{job_id}/events`` (NDJSON, same events
+    as ``/api/extract?stream=true``). Returns 429 when the user already has
+    their maximum of queued or running jobs, 503 when the job queue is full.
+    Finished jobs are kept for a limited time; jobs do not survive a restart.
+    """
+    try:
+        job = get_job_manager().submit(user.id, _to_pipeline_emails(request))
+    except JobUserLimitError as e:
+        logger.warning("Rejected extraction job for user %s: %s", user.id, e)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many extraction jobs in progress. Wait for one to finish.",
+            headers={"Retry-After": "30"},
+        ) from e
+    except JobQueueFullError as e:
+        logger.warning("Rejected extraction job for user %s: %s", user.id, e)
+        raise HTTPException(
+            status_code=503,
+            detail="Extraction queue is full. Please retry shortly.",
+            headers={"Retry-After": "30"},
+        ) from e
+
+    logger.info("Queued extraction job %s (%d emails) for user %s", job.id, job.total, user.id)
+    return _job_status(job)
+
+
+@router.get("/extract/jobs/{job_id}", response_model=ExtractJobStatus)
+async def get_extraction_job(
+    job_id: str,
+    user: AuthenticatedUser = Depends(get_current_user),
+) -> ExtractJobStatus:
+    """Get a background extraction job's progress, and its result once completed."""
+    job = get_job_manager().get(job_id, user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+
+@router.get("/extract/jobs/{job_id}/events")
+async def stream_extraction_job(
+    job_id: str,
+    user: AuthenticatedUser = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream a background job's events as NDJSON, replaying those already sent."""
+    job = get_job_manager().get(job_id, user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(_stream_job(job), media_type="application/x-ndjson")
+
+
 # ============================================================================
 # Policy Extraction (On-demand)
 # ============================================================================
@@ -291,7 +823,7 @@ async def extract_policy(
 
     Used for on-demand enrichment when user views order details.
     """
-    from reclaim.llm.retry import call_llm
+    from reclaim.llm.retry import call_llm_async
     from reclaim.utils.redaction import redact_pii, sanitize_llm_input
 
     try:
@@ -323,7 +855,7 @@ Respond with ONLY the JSON."""
         if os.getenv("RECLAIM_USE_LLM", os.getenv("SHOPQ_USE_LLM", "false")).lower() != "true":
             return ExtractPolicyResponse()
 
-        response_text = call_llm(prompt, counter_prefix="policy")
+        response_text = await call_llm_async(prompt, counter_prefix="policy")
 
         # Parse JSON response
         json_text = response_text.strip()
@@ -360,14 +892,11 @@ async def get_merchant_rules() -> dict[str, Any]:
     Cacheable, no auth required. Extension polls on startup
     and falls back to bundled defaults.
     """
-    from pathlib import Path
-
-    import yaml
+    from reclaim.returns.merchant_rules import get_merchant_rules_store
 
-    rules_path = Path(__file__).parent.parent.parent.parent / "config" / "merchant_rules.yaml"
+    snapshot = get_merchant_rules_store().current()
 
-    if not rules_path.exists():
+    if not snapshot.exists:
         return {"merchants": {}, "version": "1.0"}
 
-    with open(rules_path) as f:
-        return yaml.safe_load(f)
+    return snapshot.rules
@@ -26,15 +26,98 @@ APP_VERSION: str = "1.0.0"
 # --- Extraction Pipeline ---
 PIPELINE_MIN_BODY_CHARS: int = 100
 PIPELINE_BODY_TRUNCATION: int = 4000
+# Extractor prompt body: the most order-relevant blocks within TOKEN_BUDGET
+# estimated tokens (reclaim.returns.body_windows) instead of the first
+# PIPELINE_BODY_TRUNCATION characters
+EXTRACTOR_BODY_WINDOWS_ENABLED: bool = (
+    _env("RECLAIM_EXTRACTOR_BODY_WINDOWS", "SHOPQ_EXTRACTOR_BODY_WINDOWS", "false").lower()
+    == "true"
+)
+EXTRACTOR_BODY_TOKEN_BUDGET: int = int(
+    _env("RECLAIM_EXTRACTOR_BODY_TOKENS", "SHOPQ_EXTRACTOR_BODY_TOKENS", "600")
+)
+# HTML-only bodies are converted to at most this much text: the LLM window and
+# Stage 1 snippet, with headroom for footer return-policy text the rules scan
+PIPELINE_HTML_TEXT_MAX_CHARS: int = 20000
 PIPELINE_DATE_WINDOW_DAYS: int = 180
 PIPELINE_DEFAULT_RETURN_DAYS: int = 30
 PIPELINE_ORDER_NUM_MIN_LEN: int = 3
 PIPELINE_ORDER_NUM_MAX_LEN: int = 40
+# Stage 2+3 LLM engine: "two_call" (classifier, then extractor) or
+# "combined" (one call returning verdict + fields)
+PIPELINE_LLM_MODE: str = _env("RECLAIM_PIPELINE_LLM_MODE", "SHOPQ_PIPELINE_LLM_MODE", "two_call")
+# Emails per packed classifier request in batch mode (1 disables packing)
+CLASSIFIER_PACK_SIZE: int = int(
+    _env("RECLAIM_CLASSIFIER_PACK_SIZE", "SHOPQ_CLASSIFIER_PACK_SIZE", "10")
+)
+# Local returnability model (Stage 1.5): emails it scores at or above ACCEPT_P
+# or at or below REJECT_P skip the LLM classifier; PATH overrides
+# config/returnability_model.json
+LOCAL_MODEL_ENABLED: bool = (
+    _env("RECLAIM_LOCAL_MODEL", "SHOPQ_LOCAL_MODEL", "false").lower() == "true"
+)
+LOCAL_MODEL_PATH: str = _env("RECLAIM_LOCAL_MODEL_PATH", "SHOPQ_LOCAL_MODEL_PATH", "")
+LOCAL_MODEL_ACCEPT_P: float = float(
+    _env("RECLAIM_LOCAL_MODEL_ACCEPT_P", "SHOPQ_LOCAL_MODEL_ACCEPT_P", "0.98")
+)
+LOCAL_MODEL_REJECT_P: float = float(
+    _env("RECLAIM_LOCAL_MODEL_REJECT_P", "SHOPQ_LOCAL_MODEL_REJECT_P", "0.02")
+)
+# Distinct From headers whose resolved sender domain is memoized per pipeline
+DOMAIN_RESOLVER_CACHE_MAX: int = int(
+    _env("RECLAIM_DOMAIN_RESOLVER_CACHE_MAX", "SHOPQ_DOMAIN_RESOLVER_CACHE_MAX", "20000")
+)
+# How often the shared pipeline stats merchant_rules.yaml for hot reload
+MERCHANT_RULES_RELOAD_INTERVAL_S: float = float(
+    _env("RECLAIM_MERCHANT_RULES_RELOAD_S", "SHOPQ_MERCHANT_RULES_RELOAD_S", "5")
+)
 
 # --- LLM ---
 LLM_TIMEOUT_SECONDS: int = int(_env("RECLAIM_LLM_TIMEOUT", "SHOPQ_LLM_TIMEOUT", "30"))
 LLM_MAX_RETRIES: int = int(_env("RECLAIM_LLM_MAX_RETRIES", "SHOPQ_LLM_MAX_RETRIES", "3"))
 LLM_MAX_WORKERS: int = int(_env("RECLAIM_LLM_MAX_WORKERS", "SHOPQ_LLM_MAX_WORKERS", "4"))
+# In-flight emails per request on the async pipeline (coroutines, not threads)
+LLM_MAX_CONCURRENCY: int = int(
+    _env("RECLAIM_LLM_MAX_CONCURRENCY", "SHOPQ_LLM_MAX_CONCURRENCY", "32")
+)
+
+# Parsed classifier/extractor results reused across rescans of the same email
+LLM_RESULT_CACHE_TTL_S: float = float(
+    _env("RECLAIM_LLM_RESULT_CACHE_TTL_S", "SHOPQ_LLM_RESULT_CACHE_TTL_S", "86400")
+)
+LLM_RESULT_CACHE_MAX_ENTRIES: int = int(
+    _env("RECLAIM_LLM_RESULT_CACHE_MAX", "SHOPQ_LLM_RESULT_CACHE_MAX", "10000")
+)
+# Cross-request micro-batching of Stage 2/3 LLM calls (async pipeline only):
+# requests queue for up to MAX_WAIT_MS or until MAX_SIZE are pending
+LLM_MICROBATCH_ENABLED: bool = (
+    _env("RECLAIM_LLM_MICROBATCH", "SHOPQ_LLM_MICROBATCH", "false").lower() == "true"
+)
+LLM_MICROBATCH_MAX_WAIT_MS: float = float(
+    _env("RECLAIM_LLM_MICROBATCH_MAX_WAIT_MS", "SHOPQ_LLM_MICROBATCH_MAX_WAIT_MS", "25")
+)
+LLM_MICROBATCH_MAX_SIZE: int = int(
+    _env("RECLAIM_LLM_MICROBATCH_MAX_SIZE", "SHOPQ_LLM_MICROBATCH_MAX_SIZE", "8")
+)
+# Classifier verdicts reused across emails from the same sender template
+# (reclaim.returns.templates): served once MIN_OBSERVATIONS LLM verdicts
+# agree, each template expires TTL_S after it was learned, and
+# REVALIDATE_RATE of hits are re-checked against the LLM
+TEMPLATE_CACHE_ENABLED: bool = (
+    _env("RECLAIM_TEMPLATE_CACHE", "SHOPQ_TEMPLATE_CACHE", "false").lower() == "true"
+)
+TEMPLATE_CACHE_TTL_S: float = float(
+    _env("RECLAIM_TEMPLATE_CACHE_TTL_S", "SHOPQ_TEMPLATE_CACHE_TTL_S", "604800")
+)
+TEMPLATE_CACHE_MAX_ENTRIES: int = int(
+    _env("RECLAIM_TEMPLATE_CACHE_MAX", "SHOPQ_TEMPLATE_CACHE_MAX", "5000")
+)
+TEMPLATE_CACHE_MIN_OBSERVATIONS: int = int(
+    _env("RECLAIM_TEMPLATE_CACHE_MIN_OBS", "SHOPQ_TEMPLATE_CACHE_MIN_OBS", "2")
+)
+TEMPLATE_CACHE_REVALIDATE_RATE: float = float(
+    _env("RECLAIM_TEMPLATE_CACHE_REVALIDATE", "SHOPQ_TEMPLATE_CACHE_REVALIDATE", "0.05")
+)
 
 # --- Rate Limiting ---
 RATE_LIMIT_RPM: int = 60
@@ -47,8 +130,56 @@ RATE_LIMIT_MAX_IPS: int = 10000
 API_LIST_LIMIT_DEFAULT: int = 100
 API_LIST_LIMIT_MAX: int = 500
 API_BATCH_SIZE_MAX: int = 500
+# Header-only Stage 1 pre-screen: tuples are tiny, so allow larger batches
+API_SCREEN_BATCH_SIZE_MAX: int = 2000
 API_EXPIRING_THRESHOLD_DAYS: int = 7
 
+# --- Body Compression ---
+# Request bodies may be sent gzip/deflate (always) or br/zstd (when brotli /
+# zstandard are installed). Decoded size is capped just above the largest
+# legal ExtractRequest (500 emails x ~550 KB), and the decoded/wire ratio is
+# capped well above what real HTML compresses to, so zip bombs are cut off
+# while decoding instead of after.
+API_DECODED_BODY_MAX_BYTES: int = int(
+    _env("RECLAIM_API_DECODED_BODY_MAX_BYTES", "SHOPQ_API_DECODED_BODY_MAX_BYTES", "300000000")
+)
+API_DECOMPRESSION_RATIO_MAX: float = float(
+    _env("RECLAIM_API_DECOMPRESSION_RATIO_MAX", "SHOPQ_API_DECOMPRESSION_RATIO_MAX", "200")
+)
+# Responses smaller than this are sent uncompressed
+API_RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+
+# --- Extraction Deadline ---
+# Default time budget for a synchronous /api/extract batch (kept under common
+# 30s client/proxy timeouts), the most a client may request, and the time that
+# must remain to start another LLM call (otherwise the email goes rules-only)
+EXTRACT_DEADLINE_S: float = float(
+    _env("RECLAIM_EXTRACT_DEADLINE_S", "SHOPQ_EXTRACT_DEADLINE_S", "25")
+)
+EXTRACT_DEADLINE_MAX_S: float = float(
+    _env("RECLAIM_EXTRACT_DEADLINE_MAX_S", "SHOPQ_EXTRACT_DEADLINE_MAX_S", "120")
+)
+EXTRACT_LLM_RESERVE_S: float = float(
+    _env("RECLAIM_EXTRACT_LLM_RESERVE_S", "SHOPQ_EXTRACT_LLM_RESERVE_S", "4")
+)
+
+# --- Extraction Jobs ---
+# Batches running concurrently in the background, jobs allowed to wait, jobs
+# one user may have queued or running at once, and how long finished jobs
+# stay pollable
+EXTRACT_JOB_WORKERS: int = int(
+    _env("RECLAIM_EXTRACT_JOB_WORKERS", "SHOPQ_EXTRACT_JOB_WORKERS", "2")
+)
+EXTRACT_JOB_QUEUE_MAX: int = int(
+    _env("RECLAIM_EXTRACT_JOB_QUEUE_MAX", "SHOPQ_EXTRACT_JOB_QUEUE_MAX", "20")
+)
+EXTRACT_JOB_USER_MAX: int = int(
+    _env("RECLAIM_EXTRACT_JOB_USER_MAX", "SHOPQ_EXTRACT_JOB_USER_MAX", "2")
+)
+EXTRACT_JOB_TTL_S: float = float(
+    _env("RECLAIM_EXTRACT_JOB_TTL_S", "SHOPQ_EXTRACT_JOB_TTL_S", "3600")
+)
+
 # --- LLM Budget ---
 LLM_USER_DAILY_LIMIT: int = 500
 LLM_GLOBAL_DAILY_LIMIT: int = 10000
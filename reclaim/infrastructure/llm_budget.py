@@ -17,6 +17,7 @@ Cost estimates (Gemini Flash):
 
 from __future__ import annotations
 
+import threading
 from typing import NamedTuple
 
 from cachetools import TTLCache
@@ -42,6 +43,8 @@ _DAY_SECONDS = 86400
 _user_calls: TTLCache[str, int] = TTLCache(maxsize=10000, ttl=_DAY_SECONDS)
 _global_counter: TTLCache[str, int] = TTLCache(maxsize=1, ttl=_DAY_SECONDS)
 _GLOBAL_KEY = "__global__"
+# cachetools caches are not thread-safe; batch extraction records calls from worker threads
+_lock = threading.Lock()
 
 
 class BudgetStatus(NamedTuple):
@@ -71,8 +74,9 @@ def check_budget(
     Returns:
         BudgetStatus with current usage and whether call is allowed
     """
-    user_calls = _user_calls.get(user_id, 0)
-    global_calls = _global_counter.get(_GLOBAL_KEY, 0)
+    with _lock:
+        user_calls = _user_calls.get(user_id, 0)
+        global_calls = _global_counter.get(_GLOBAL_KEY, 0)
 
     if user_calls >= user_limit:
         return BudgetStatus(
@@ -115,11 +119,12 @@ def record_llm_call(
         user_id: User who made the call
         call_type: Type of call (classifier, extractor)
     """
-    # Increment user counter
-    _user_calls[user_id] = _user_calls.get(user_id, 0) + 1
+    with _lock:
+        # Increment user counter
+        _user_calls[user_id] = _user_calls.get(user_id, 0) + 1
 
-    # Increment global counter
-    _global_counter[_GLOBAL_KEY] = _global_counter.get(_GLOBAL_KEY, 0) + 1
+        # Increment global counter
+        _global_counter[_GLOBAL_KEY] = _global_counter.get(_GLOBAL_KEY, 0) + 1
 
     counter(f"llm.budget.call.{call_type}")
     logger.debug("Recorded LLM call: user=%s, type=%s", user_id, call_type)
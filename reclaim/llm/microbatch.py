@@ -0,0 +1,170 @@
+"""
+Cross-request micro-batching for Stage 2/3 LLM calls.
+
+Under load many /api/extract requests arrive within milliseconds of each
+other, each issuing its own small Gemini call, and the project's
+requests-per-minute quota runs out long before its token quota. A
+MicroBatcher sits between a pipeline stage and call_llm_async: callers
+submit one item and await its result; items are held for at most
+max_wait_s (or until max_batch_size are pending), dispatched together as one
+packed call, and the results fanned back out to the waiting callers.
+
+Only the event-loop pipeline batches; a batcher binds to the loop it first
+runs on and starts over if a different loop uses it (e.g. in tests).
+
+Metrics (per batcher name):
+    llm.microbatch.<name>.queue_wait  latency samples, submit -> dispatch
+    llm.microbatch.<name>.batches     counter, dispatched batches
+    llm.microbatch.<name>.items       counter, items across all batches
+    llm.microbatch.<name>.full        counter, batches flushed by size
+Fill ratio is items / (batches * max_batch_size); see stats().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Generic, TypeVar
+
+from reclaim.config import LLM_MICROBATCH_MAX_SIZE, LLM_MICROBATCH_MAX_WAIT_MS
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import (
+    counter,
+    get_counter,
+    get_latency_stats,
+    log_event,
+    record_latency,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Pending(Generic[T, R]):
+    """One submitted item waiting for its batch."""
+
+    __slots__ = ("item", "future", "enqueued_at")
+
+    def __init__(self, item: T, future: asyncio.Future[R]):
+        self.item = item
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect concurrent submissions and dispatch them in batches.
+
+    dispatch receives the batch's items in submission order and must return
+    one result per item, in the same order. An exception instance in the
+    returned list fails only that item; dispatch raising fails the batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dispatch: Callable[[list[T]], Awaitable[Sequence[R | BaseException]]],
+        max_batch_size: int = LLM_MICROBATCH_MAX_SIZE,
+        max_wait_s: float = LLM_MICROBATCH_MAX_WAIT_MS / 1000,
+    ):
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_s)
+        self._dispatch = dispatch
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: list[_Pending[T, R]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # Strong references so in-flight dispatch tasks aren't garbage collected
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> R:
+        """Queue item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        pending: _Pending[T, R] = _Pending(item, loop.create_future())
+        self._pending.append(pending)
+
+        if len(self._pending) >= self.max_batch_size:
+            counter(f"llm.microbatch.{self.name}.full")
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+
+        return await pending.future
+
+    def stats(self) -> dict[str, float]:
+        """Batch count, fill ratio and queue wait percentiles so far."""
+        batches = get_counter(f"llm.microbatch.{self.name}.batches")
+        items = get_counter(f"llm.microbatch.{self.name}.items")
+        wait = get_latency_stats(f"llm.microbatch.{self.name}.queue_wait")
+        return {
+            "batches": batches,
+            "items": items,
+            "fill_ratio": items / (batches * self.max_batch_size) if batches else 0.0,
+            "queue_wait_p50_ms": wait["p50"] * 1000,
+            "queue_wait_p95_ms": wait["p95"] * 1000,
+        }
+
+    def _flush(self) -> None:
+        """Hand everything pending to a dispatch task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch or self._loop is None:
+            return
+
+        task = self._loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_Pending[T, R]]) -> None:
+        dispatched_at = time.perf_counter()
+        for pending in batch:
+            record_latency(
+                f"llm.microbatch.{self.name}.queue_wait", dispatched_at - pending.enqueued_at
+            )
+        counter(f"llm.microbatch.{self.name}.batches")
+        counter(f"llm.microbatch.{self.name}.items", len(batch))
+        log_event(
+            "llm.microbatch.dispatch",
+            batcher=self.name,
+            size=len(batch),
+            fill_ratio=round(len(batch) / self.max_batch_size, 3),
+        )
+
+        try:
+            results = await self._dispatch([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"{self.name} batch returned {len(results)} results for {len(batch)} items"
+                )
+        except asyncio.CancelledError:
+            for pending in batch:
+                pending.future.cancel()
+            raise
+        except Exception as e:
+            logger.warning(
+                "Micro-batch dispatch failed (%s, %d items): %s", self.name, len(batch), e
+            )
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results, strict=True):
+            # A caller may have been cancelled (client disconnect) while waiting
+            if pending.future.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
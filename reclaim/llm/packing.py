@@ -0,0 +1,81 @@
+"""Helpers for packing several single-email prompts into one LLM request.
+
+A packed prompt numbers each email ("### Email <n>") and asks for a JSON
+array with one object per email carrying its "index". The stage that packs is
+responsible for matching items back to emails and for falling back to a
+single-email call when an item is missing or fails its validation.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter
+
+logger = get_logger(__name__)
+
+
+def packed_response_schema(item_schema: dict) -> dict:
+    """Array-of-items schema for a single-email object schema, plus "index"."""
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "index": {
+                    "type": "integer",
+                    "description": "Number of the email this item is for (from '### Email <n>')",
+                },
+                **item_schema["properties"],
+            },
+            "required": ["index", *item_schema["required"]],
+            "propertyOrdering": ["index", *item_schema["propertyOrdering"]],
+        },
+    }
+
+
+def build_packed_prompt(prompts: list[str]) -> str:
+    """Number each single-email prompt so answers can be matched by index."""
+    return "\n\n".join(f"### Email {n}\n{prompt}" for n, prompt in enumerate(prompts))
+
+
+def parse_packed_response(
+    response_text: str,
+    count: int,
+    counter_prefix: str,
+    validate: Callable[[dict], bool] | None = None,
+) -> dict[int, dict]:
+    """Map email index -> raw item object; bad or duplicate items are dropped.
+
+    Items that validate() rejects are dropped too, so the caller retries
+    them as single-email calls instead of parsing a malformed verdict.
+    """
+    json_text = response_text.strip()
+    if json_text.startswith("```"):
+        json_text = re.sub(r"^```(?:json)?\n?", "", json_text)
+        json_text = re.sub(r"\n?```$", "", json_text)
+
+    try:
+        data = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        logger.warning("Failed to parse packed %s response: %s", counter_prefix, e)
+        counter(f"returns.{counter_prefix}.packed_parse_error")
+        return {}
+
+    if not isinstance(data, list):
+        counter(f"returns.{counter_prefix}.packed_parse_error")
+        return {}
+
+    parsed: dict[int, dict] = {}
+    for item in data:
+        index = item.get("index") if isinstance(item, dict) else None
+        if not (isinstance(index, int) and 0 <= index < count) or index in parsed:
+            continue
+        if validate is not None and not validate(item):
+            counter(f"returns.{counter_prefix}.packed_item_invalid")
+            continue
+        parsed[index] = item
+    return parsed
@@ -1,9 +1,13 @@
 """Shared LLM call with retry logic.
 
-Provides a single retry-decorated function for calling the Gemini model.
-Both ReturnabilityClassifier (Stage 2) and ReturnFieldExtractor (Stage 3)
-use this function. Each stage wraps it in its own try/except to implement
-its specific final-failure policy (reject vs fallback).
+Provides a retry-decorated function for calling the Gemini model, plus an
+async twin for the event-loop pipeline. Both ReturnabilityClassifier (Stage 2)
+and ReturnFieldExtractor (Stage 3) use these functions. Each stage wraps them
+in its own try/except to implement its specific final-failure policy
+(reject vs fallback).
+
+Concurrent identical calls (same system instruction, prompt and schema) are
+coalesced so they share one upstream call, including its retries.
 
 CODE-003: Retries up to LLM_MAX_RETRIES times with exponential backoff.
 CODE-004: Handles Vertex AI-specific exceptions (DeadlineExceeded, ServiceUnavailable,
@@ -17,11 +21,79 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from reclaim.config import LLM_MAX_RETRIES, LLM_TIMEOUT_SECONDS
 from reclaim.infrastructure.settings import GEMINI_MAX_TOKENS, GEMINI_TEMPERATURE
 from reclaim.llm.gemini import get_gemini_model_with_options
+from reclaim.llm.singleflight import AsyncSingleFlight, SingleFlight, llm_call_key
 from reclaim.observability.logging import get_logger
 from reclaim.observability.telemetry import counter
 
 logger = get_logger(__name__)
 
+_inflight = SingleFlight("llm")
+_inflight_async = AsyncSingleFlight("llm")
+
+
+def _generation_config(response_schema: dict | None) -> dict:
+    """Build generation config with temperature, max tokens and JSON mode."""
+    generation_config = {
+        "temperature": GEMINI_TEMPERATURE,
+        "max_output_tokens": GEMINI_MAX_TOKENS,
+    }
+
+    # Request JSON output when a response schema is provided.
+    # We intentionally omit response_schema from generation_config because
+    # the Vertex AI SDK requires protobuf Schema objects (not raw dicts),
+    # and the enum types vary across SDK versions. The prompt already
+    # specifies the JSON format, and both classifier and extractor have
+    # robust JSON parsing fallbacks.
+    if response_schema is not None:
+        generation_config["response_mime_type"] = "application/json"
+
+    return generation_config
+
+
+def _record_usage(response: object, counter_prefix: str) -> None:
+    """Count prompt/output tokens reported by the SDK for this call."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    counter(f"returns.{counter_prefix}.prompt_tokens", getattr(usage, "prompt_token_count", 0) or 0)
+    counter(
+        f"returns.{counter_prefix}.output_tokens", getattr(usage, "candidates_token_count", 0) or 0
+    )
+
+
+def _translate_llm_error(e: Exception, counter_prefix: str) -> Exception:
+    """Map Vertex AI exceptions onto the retryable builtin types.
+
+    Returns the exception the caller should raise; unknown errors are
+    returned unchanged (not retried).
+    """
+    from google.api_core.exceptions import (
+        DeadlineExceeded,
+        InternalServerError,
+        ResourceExhausted,
+        ServiceUnavailable,
+    )
+
+    if isinstance(e, DeadlineExceeded):
+        counter(f"returns.{counter_prefix}.timeout")
+        logger.warning("LLM call timed out after %ds", LLM_TIMEOUT_SECONDS)
+        return TimeoutError(f"LLM call timed out: {e}")
+    if isinstance(e, ServiceUnavailable):
+        counter(f"returns.{counter_prefix}.service_unavailable")
+        logger.warning("LLM service unavailable, will retry: %s", e)
+        return ConnectionError(f"LLM service unavailable: {e}")
+    if isinstance(e, ResourceExhausted):
+        counter(f"returns.{counter_prefix}.rate_limited")
+        logger.warning("LLM rate limited (429), will retry: %s", e)
+        return OSError(f"LLM rate limited: {e}")
+    if isinstance(e, InternalServerError):
+        counter(f"returns.{counter_prefix}.internal_error")
+        logger.warning("LLM internal error (500), will retry: %s", e)
+        return ConnectionError(f"LLM internal error: {e}")
+
+    logger.error("LLM call failed: %s", e)
+    return e
+
 
 @retry(
     stop=stop_after_attempt(LLM_MAX_RETRIES),
@@ -29,6 +101,28 @@ logger = get_logger(__name__)
     retry=retry_if_exception_type((TimeoutError, ConnectionError, OSError)),
     reraise=True,
 )
+def _call_llm_uncoalesced(
+    prompt: str,
+    counter_prefix: str,
+    system_instruction: str | None,
+    response_schema: dict | None,
+) -> str:
+    """One retried upstream call (see call_llm)."""
+    model = get_gemini_model_with_options(system_instruction=system_instruction)
+
+    try:
+        response = model.generate_content(  # type: ignore[attr-defined]
+            prompt, generation_config=_generation_config(response_schema)
+        )
+        _record_usage(response, counter_prefix)
+        return response.text
+    except Exception as e:
+        translated = _translate_llm_error(e, counter_prefix)
+        if translated is e:
+            raise
+        raise translated from e
+
+
 def call_llm(
     prompt: str,
     counter_prefix: str = "llm",
@@ -37,6 +131,9 @@ def call_llm(
 ) -> str:
     """Call LLM with retry and Vertex AI exception conversion.
 
+    Identical calls already in flight on another thread are joined rather
+    than repeated; every caller gets the same text or the same exception.
+
     Args:
         prompt: The prompt to send to the model.
         counter_prefix: Telemetry counter prefix (e.g., "classifier", "extractor").
@@ -53,49 +150,58 @@ def call_llm(
         OSError: On resource exhausted / rate limited (retryable).
         Exception: On other errors (not retried, caller handles).
     """
-    from google.api_core.exceptions import (
-        DeadlineExceeded,
-        InternalServerError,
-        ResourceExhausted,
-        ServiceUnavailable,
+    return _inflight.do(
+        llm_call_key(prompt, system_instruction, response_schema),
+        lambda: _call_llm_uncoalesced(prompt, counter_prefix, system_instruction, response_schema),
     )
 
-    model = get_gemini_model_with_options(system_instruction=system_instruction)
 
-    # Build generation config with temperature and max tokens
-    generation_config = {
-        "temperature": GEMINI_TEMPERATURE,
-        "max_output_tokens": GEMINI_MAX_TOKENS,
-    }
+@retry(
+    stop=stop_after_attempt(LLM_MAX_RETRIES),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type((TimeoutError, ConnectionError, OSError)),
+    reraise=True,
+)
+async def _call_llm_uncoalesced_async(
+    prompt: str,
+    counter_prefix: str,
+    system_instruction: str | None,
+    response_schema: dict | None,
+) -> str:
+    """One retried upstream call (see call_llm_async).
 
-    # Request JSON output when a response schema is provided.
-    # We intentionally omit response_schema from generation_config because
-    # the Vertex AI SDK requires protobuf Schema objects (not raw dicts),
-    # and the enum types vary across SDK versions. The prompt already
-    # specifies the JSON format, and both classifier and extractor have
-    # robust JSON parsing fallbacks.
-    if response_schema is not None:
-        generation_config["response_mime_type"] = "application/json"
+    tenacity detects the coroutine and backs off with asyncio.sleep, so
+    retries never block the event loop.
+    """
+    model = get_gemini_model_with_options(system_instruction=system_instruction)
 
     try:
-        response = model.generate_content(prompt, generation_config=generation_config)
+        response = await model.generate_content_async(  # type: ignore[attr-defined]
+            prompt, generation_config=_generation_config(response_schema)
+        )
+        _record_usage(response, counter_prefix)
         return response.text
-    except DeadlineExceeded as e:
-        counter(f"returns.{counter_prefix}.timeout")
-        logger.warning("LLM call timed out after %ds", LLM_TIMEOUT_SECONDS)
-        raise TimeoutError(f"LLM call timed out: {e}") from e
-    except ServiceUnavailable as e:
-        counter(f"returns.{counter_prefix}.service_unavailable")
-        logger.warning("LLM service unavailable, will retry: %s", e)
-        raise ConnectionError(f"LLM service unavailable: {e}") from e
-    except ResourceExhausted as e:
-        counter(f"returns.{counter_prefix}.rate_limited")
-        logger.warning("LLM rate limited (429), will retry: %s", e)
-        raise OSError(f"LLM rate limited: {e}") from e
-    except InternalServerError as e:
-        counter(f"returns.{counter_prefix}.internal_error")
-        logger.warning("LLM internal error (500), will retry: %s", e)
-        raise ConnectionError(f"LLM internal error: {e}") from e
     except Exception as e:
-        logger.error("LLM call failed: %s", e)
-        raise
+        translated = _translate_llm_error(e, counter_prefix)
+        if translated is e:
+            raise
+        raise translated from e
+
+
+async def call_llm_async(
+    prompt: str,
+    counter_prefix: str = "llm",
+    system_instruction: str | None = None,
+    response_schema: dict | None = None,
+) -> str:
+    """Async variant of call_llm() built on the SDK's generate_content_async.
+
+    Arguments, return value, exception mapping and coalescing of identical
+    in-flight calls are the same as call_llm().
+    """
+    return await _inflight_async.do(
+        llm_call_key(prompt, system_instruction, response_schema),
+        lambda: _call_llm_uncoalesced_async(
+            prompt, counter_prefix, system_instruction, response_schema
+        ),
+    )
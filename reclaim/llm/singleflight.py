@@ -0,0 +1,117 @@
+"""
+Request coalescing ("singleflight") for identical in-flight LLM calls.
+
+The extension retries and rescans, so the same email often arrives in two or
+three overlapping /api/extract requests (sometimes twice in one batch). While
+one call for a given key is in flight, later callers with the same key wait
+for it and receive its result — or its exception — instead of paying for
+their own upstream call. Nothing is cached: once the call finishes the key is
+released and the next caller starts a fresh one.
+
+SingleFlight serves the thread-pool pipeline, AsyncSingleFlight the event-loop
+pipeline; the two do not share in-flight calls with each other.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from reclaim.observability.telemetry import counter
+
+T = TypeVar("T")
+
+
+def llm_call_key(
+    prompt: str,
+    system_instruction: str | None = None,
+    response_schema: dict | None = None,
+) -> str:
+    """Hash (system instruction, prompt, schema) into a coalescing key."""
+    payload = json.dumps(
+        [system_instruction, prompt, response_schema], sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """One in-flight call shared by its leader and any followers."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Thread-safe coalescing of concurrent calls with the same key."""
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn() unless a call for key is in flight; then share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            counter(f"{self.name}.singleflight.shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Coalescing of concurrent coroutine calls with the same key.
+
+    The shared call runs as its own task and every caller awaits it through
+    asyncio.shield(), so one caller being cancelled (e.g. a client disconnect)
+    does not cancel the upstream call for the others.
+    """
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._tasks: dict[str, asyncio.Task[Any]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() unless a call for key is in flight; then share its outcome."""
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            counter(f"{self.name}.singleflight.shared")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._release, key))
+
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away first
+            task.exception()
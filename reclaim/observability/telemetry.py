@@ -9,8 +9,10 @@ from __future__ import annotations
 
 import contextlib
 import logging
+import threading
 import time
 from collections.abc import Iterator
+from contextvars import ContextVar
 from typing import Any
 
 logger = logging.getLogger("reclaim.telemetry")
@@ -19,6 +21,35 @@ _COUNTERS: dict[str, int] = {}
 _LATENCIES: dict[str, list[float]] = {}
 
 
+class TimingCollector:
+    """Totals of the latencies recorded while a collect_timings() scope is active."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, metric_name: str, seconds: float) -> None:
+        with self._lock:
+            self.totals[metric_name] = self.totals.get(metric_name, 0.0) + seconds
+            self.counts[metric_name] = self.counts.get(metric_name, 0) + 1
+
+    def by_prefix(self, prefix: str) -> dict[str, tuple[float, int]]:
+        """(total seconds, samples) for metrics under prefix, keyed without it."""
+        with self._lock:
+            return {
+                name[len(prefix) :]: (total, self.counts[name])
+                for name, total in self.totals.items()
+                if name.startswith(prefix)
+            }
+
+
+# Collectors of the enclosing collect_timings() scopes (propagates to asyncio tasks)
+_COLLECTORS: ContextVar[tuple[TimingCollector, ...]] = ContextVar(
+    "reclaim_timing_collectors", default=()
+)
+
+
 def _normalize_latency_name(metric_name: str) -> str:
     if metric_name.endswith("_ms"):
         return metric_name
@@ -51,6 +82,11 @@ def counter(name: str, increment: int = 1) -> int:
     return value
 
 
+def get_counter(name: str) -> int:
+    """Current value of an in-memory counter (0 if never incremented)."""
+    return _COUNTERS.get(name, 0)
+
+
 @contextlib.contextmanager
 def time_block(metric_name: str) -> Iterator[None]:
     """
@@ -65,14 +101,44 @@ def time_block(metric_name: str) -> Iterator[None]:
     try:
         yield
     finally:
-        elapsed = time.perf_counter() - start
-        normalized = _normalize_latency_name(metric_name)
-        logger.debug("timing=%s seconds=%.6f", normalized, elapsed)
-
-        # Record latency for percentile tracking
-        if normalized not in _LATENCIES:
-            _LATENCIES[normalized] = []
-        _LATENCIES[normalized].append(elapsed)
+        record_latency(metric_name, time.perf_counter() - start)
+
+
+def record_latency(metric_name: str, seconds: float) -> None:
+    """
+    Record a latency sample measured outside time_block (e.g. a queue wait).
+
+    Side Effects:
+        - Appends to _LATENCIES dict (in-memory state)
+        - Writes to logger (debug level) with timing
+    """
+    normalized = _normalize_latency_name(metric_name)
+    logger.debug("timing=%s seconds=%.6f", normalized, seconds)
+
+    # Record latency for percentile tracking
+    if normalized not in _LATENCIES:
+        _LATENCIES[normalized] = []
+    _LATENCIES[normalized].append(seconds)
+
+    for collector in _COLLECTORS.get():
+        collector.add(normalized, seconds)
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[TimingCollector]:
+    """
+    Additionally total every latency recorded in this context (e.g. one request).
+
+    Scopes nest; a sample counts towards every enclosing collector. Code run
+    in worker threads must be submitted with contextvars.copy_context().run
+    for its samples to be collected.
+    """
+    collector = TimingCollector()
+    token = _COLLECTORS.set((*_COLLECTORS.get(), collector))
+    try:
+        yield collector
+    finally:
+        _COLLECTORS.reset(token)
 
 
 def get_p95(metric_name: str) -> float:
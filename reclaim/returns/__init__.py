@@ -5,6 +5,7 @@ Reclaim Returns module - Return Watch tracking and alerts.
 from reclaim.returns.extractor import (
     ReturnableReceiptExtractor,
     extract_return_card,
+    get_extractor,
 )
 from reclaim.returns.field_extractor import ReturnFieldExtractor
 from reclaim.returns.filters import MerchantDomainFilter
@@ -40,4 +41,5 @@ __all__ = [
     "ExtractionStage",
     "ReturnableReceiptExtractor",
     "extract_return_card",
+    "get_extractor",
 ]
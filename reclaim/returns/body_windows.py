@@ -0,0 +1,150 @@
+"""
+Relevance-windowed body selection for the Stage 3 extractor prompt.
+
+The extractor used to send the first PIPELINE_BODY_TRUNCATION characters of
+the body. For HTML-converted emails that is often navigation, promotions
+and legal text, while the order details sit further down or are cut off.
+
+select_body_windows() splits the body into blocks (paragraphs), scores each
+block by order signals (prices, order numbers, item / delivery / return
+wording, dates) against boilerplate signals, and keeps the best blocks,
+each with its neighbours for context, within a token budget. Kept blocks are
+emitted in document order with a marker where text was skipped. Bodies
+already within budget are returned unchanged.
+
+Combined Stage 2+3 mode builds its prompt through the extractor, so it gets
+the same windows when they are enabled.
+
+Tokens are estimated at CHARS_PER_TOKEN characters per token, which is
+close enough for budgeting English email text.
+"""
+
+from __future__ import annotations
+
+import re
+
+CHARS_PER_TOKEN = 4
+
+# Between kept windows, so the LLM doesn't read two blocks as one
+GAP_MARKER = "[...]"
+# Paragraphs longer than this are scored (and kept) in line groups
+MAX_BLOCK_CHARS = 600
+
+_BLOCK_SPLIT_RE = re.compile(r"\n\s*\n")
+_PRICE_RE = re.compile(r"[$€£]\s?\d[\d,]*(?:\.\d{2})?")
+_ORDER_NUMBER_RE = re.compile(
+    r"\border\s*(?:number|no\.?|#)\s*:?\s*#?\s*[A-Z0-9][A-Z0-9-]{3,}", re.IGNORECASE
+)
+_DATE_RE = re.compile(
+    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.? \d{1,2}\b"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b\d{4}-\d{2}-\d{2}\b",
+    re.IGNORECASE,
+)
+_ORDER_WORDS_RE = re.compile(
+    r"\b(?:items?|qty|quantity|order(?:ed)?|subtotal|total|deliver(?:y|ed)|arriv(?:ing|al)"
+    r"|ship(?:ped|ping|ment)?|estimated|placed|purchase[ds]?|receipt)\b",
+    re.IGNORECASE,
+)
+_RETURN_WORDS_RE = re.compile(
+    r"\b(?:returns?|refund|exchange|within \d+ days|return window)\b", re.IGNORECASE
+)
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:unsubscribe|privacy|terms|conditions|copyright|all rights reserved"
+    r"|preferences|view (?:this email )?in (?:your )?browser|download (?:the|our) app"
+    r"|follow us|shop now|sign up|%\s*off|sale|deals?)\b|©",
+    re.IGNORECASE,
+)
+# "from $29.99", "save $10": prices in promotions, not in the order
+_PROMO_PRICE_RE = re.compile(
+    r"\b(?:from|save|starting at|as low as|under)\s+[$€£]\s?\d", re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count for budgeting (no tokenizer call)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def score_block(block: str) -> float:
+    """Order-detail relevance of one block (higher is more relevant)."""
+    score = (
+        3.0 * len(_ORDER_NUMBER_RE.findall(block))
+        + 2.0 * len(_PRICE_RE.findall(block))
+        + 2.0 * len(_DATE_RE.findall(block))
+        + 2.0 * len(_RETURN_WORDS_RE.findall(block))
+        + 1.0 * len(_ORDER_WORDS_RE.findall(block))
+        - 1.5 * len(_BOILERPLATE_RE.findall(block))
+        - 2.5 * len(_PROMO_PRICE_RE.findall(block))
+    )
+    # Density, so one long promo block can't outscore a short order block
+    return score / (1.0 + len(block) / 400)
+
+
+def split_blocks(body: str) -> list[str]:
+    """Paragraphs, with long ones cut into groups of whole lines."""
+    blocks: list[str] = []
+    for paragraph in _BLOCK_SPLIT_RE.split(body):
+        group = ""
+        for line in paragraph.strip().splitlines():
+            if group and len(group) + len(line) + 1 > MAX_BLOCK_CHARS:
+                blocks.append(group)
+                group = ""
+            group = f"{group}\n{line}" if group else line
+            while len(group) > MAX_BLOCK_CHARS:
+                blocks.append(group[:MAX_BLOCK_CHARS])
+                group = group[MAX_BLOCK_CHARS:]
+        if group.strip():
+            blocks.append(group)
+    return blocks
+
+
+def select_body_windows(body: str, token_budget: int) -> str:
+    """
+    The most order-relevant part of the body within token_budget.
+
+    Blocks are taken best-first, each with its neighbours while they fit,
+    until the budget is spent. Only blocks scoring above zero start a
+    window, blocks scoring below zero are never taken, and repeats of an
+    earlier block score zero.
+    """
+    if estimate_tokens(body) <= token_budget:
+        return body
+
+    blocks = split_blocks(body)
+    # Repeated blocks (templated promo rows, mirrored headers) count once
+    seen: set[str] = set()
+    scores = []
+    for block in blocks:
+        scores.append(score_block(block) if block not in seen else 0.0)
+        seen.add(block)
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    kept: set[int] = set()
+    used = 0
+
+    def take(i: int) -> None:
+        nonlocal used
+        cost = len(blocks[i]) + len(GAP_MARKER) + 2
+        if i not in kept and used + cost <= budget_chars:
+            kept.add(i)
+            used += cost
+
+    for i in sorted(range(len(blocks)), key=lambda i: (-scores[i], i)):
+        if scores[i] <= 0:
+            break
+        take(i)
+        if i not in kept:
+            continue
+        # Neighbours carry labels and item names split from their values
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(blocks) and scores[j] >= 0:
+                take(j)
+
+    if not kept:
+        return body[:budget_chars]
+
+    parts: list[str] = []
+    for i in sorted(kept):
+        if parts and i - 1 not in kept:
+            parts.append(GAP_MARKER)
+        parts.append(blocks[i])
+    return "\n\n".join(parts)
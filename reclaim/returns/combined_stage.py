@@ -0,0 +1,249 @@
+"""
+Module: combined_stage
+Purpose: Single-call Stage 2+3 engine — classify and extract in one Gemini request.
+Dependencies: reclaim.returns.returnability_classifier, reclaim.returns.field_extractor
+
+In the default two-call mode every email that passes the classifier makes a
+second, sequential Gemini round trip for field extraction, doubling latency
+for exactly the emails users care about. CombinedReturnabilityExtractor sends
+one prompt (the Stage 3 prompt) with a merged response schema — the
+returnability verdict plus all extraction fields — and the pipeline branches
+on the verdict locally.
+
+Selected per deployment with RECLAIM_PIPELINE_LLM_MODE=combined. Both modes
+record per-email Stage 2+3 latency (returns.llm_stages.<mode>) and token
+counters; get_llm_mode_report() puts them side by side.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+
+from reclaim.infrastructure.settings import GEMINI_MODEL
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter, get_counter, get_latency_stats, log_event
+from reclaim.returns.field_extractor import (
+    EXTRACTOR_RESPONSE_SCHEMA,
+    EXTRACTOR_SYSTEM_INSTRUCTION,
+    ReturnFieldExtractor,
+)
+from reclaim.returns.returnability_classifier import (
+    CLASSIFIER_RESPONSE_SCHEMA,
+    CLASSIFIER_SYSTEM_INSTRUCTION,
+    PARSE_FALLBACK_REASONS,
+    ReturnabilityClassifier,
+    ReturnabilityResult,
+)
+from reclaim.storage.cache import LLM_RESULT_CACHE, llm_result_key
+
+logger = get_logger(__name__)
+
+LLM_MODE_TWO_CALL = "two_call"
+LLM_MODE_COMBINED = "combined"
+LLM_MODES = (LLM_MODE_TWO_CALL, LLM_MODE_COMBINED)
+
+# LLM counter prefixes whose token counters belong to each mode
+_MODE_COUNTER_PREFIXES = {
+    LLM_MODE_TWO_CALL: ("classifier", "extractor"),
+    LLM_MODE_COMBINED: ("combined",),
+}
+
+
+def _use_llm() -> bool:
+    """Check LLM feature flag at call time (not import time)."""
+    return os.getenv("RECLAIM_USE_LLM", os.getenv("SHOPQ_USE_LLM", "false")).lower() == "true"
+
+
+# Verdict first (reason leads, as in the classifier), then extraction fields
+COMBINED_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **CLASSIFIER_RESPONSE_SCHEMA["properties"],
+        **EXTRACTOR_RESPONSE_SCHEMA["properties"],
+    },
+    "required": CLASSIFIER_RESPONSE_SCHEMA["required"] + EXTRACTOR_RESPONSE_SCHEMA["required"],
+    "propertyOrdering": (
+        CLASSIFIER_RESPONSE_SCHEMA["propertyOrdering"]
+        + EXTRACTOR_RESPONSE_SCHEMA["propertyOrdering"]
+    ),
+}
+
+# Bump when the merged schema or its parsing changes (see CLASSIFIER_SCHEMA_VERSION)
+COMBINED_SCHEMA_VERSION = "1"
+
+COMBINED_SYSTEM_INSTRUCTION = f"""Handle each email in two steps and answer with one JSON object.
+
+# Step 1: Returnability
+
+{CLASSIFIER_SYSTEM_INSTRUCTION}
+
+# Step 2: Field extraction
+
+Only when is_returnable is true: fill in the fields below. When is_returnable
+is false, set merchant_name and item_summary to null and skip the rest.
+
+{EXTRACTOR_SYSTEM_INSTRUCTION}
+
+# Combined output
+Return a single JSON object: reason, is_returnable, confidence, receipt_type,
+followed by the extraction fields."""
+
+
+class CombinedReturnabilityExtractor:
+    """
+    Stage 2+3 in one LLM call.
+
+    Reuses the classifier's and extractor's prompt building and parsing so the
+    two modes only differ in how many round trips they make. Failure policy
+    matches Stage 2: if the call fails the email is rejected.
+    """
+
+    def __init__(
+        self,
+        classifier: ReturnabilityClassifier,
+        field_extractor: ReturnFieldExtractor,
+    ):
+        self.classifier = classifier
+        self.field_extractor = field_extractor
+
+    def classify_and_extract(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None = None,
+    ) -> tuple[ReturnabilityResult, dict]:
+        """
+        Classify an email and, if returnable, extract its LLM fields.
+
+        Returns:
+            (returnability, llm_fields) — llm_fields is {} when the email is
+            not returnable or the LLM is disabled/unavailable.
+
+        Side Effects:
+            - Calls Gemini API once (unless cached)
+            - Increments telemetry counters
+        """
+        if not _use_llm():
+            return self.classifier._llm_disabled_result(), {}
+
+        prompt = self.field_extractor._build_llm_prompt(from_address, subject, body, received_at)
+        cache_key = llm_result_key(prompt, COMBINED_SYSTEM_INSTRUCTION, COMBINED_SCHEMA_VERSION)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        from reclaim.llm.retry import call_llm
+
+        try:
+            self.classifier._log_call(subject)
+            response_text = call_llm(
+                prompt,
+                counter_prefix="combined",
+                system_instruction=COMBINED_SYSTEM_INSTRUCTION,
+                response_schema=COMBINED_RESPONSE_SCHEMA,
+            )
+        except Exception as e:
+            counter("returns.combined.error")
+            return self.classifier._error_result(e), {}
+
+        return self._finish(response_text, cache_key)
+
+    async def classify_and_extract_async(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None = None,
+    ) -> tuple[ReturnabilityResult, dict]:
+        """Async variant of classify_and_extract()."""
+        if not _use_llm():
+            return self.classifier._llm_disabled_result(), {}
+
+        prompt = self.field_extractor._build_llm_prompt(from_address, subject, body, received_at)
+        cache_key = llm_result_key(prompt, COMBINED_SYSTEM_INSTRUCTION, COMBINED_SCHEMA_VERSION)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        from reclaim.llm.retry import call_llm_async
+
+        try:
+            self.classifier._log_call(subject)
+            response_text = await call_llm_async(
+                prompt,
+                counter_prefix="combined",
+                system_instruction=COMBINED_SYSTEM_INSTRUCTION,
+                response_schema=COMBINED_RESPONSE_SCHEMA,
+            )
+        except Exception as e:
+            counter("returns.combined.error")
+            return self.classifier._error_result(e), {}
+
+        return self._finish(response_text, cache_key)
+
+    def _cached_result(self, cache_key: str) -> tuple[ReturnabilityResult, dict] | None:
+        """Return a cached (verdict, fields) pair for this exact prompt, if any."""
+        cached = LLM_RESULT_CACHE.get(cache_key)
+        if isinstance(cached, tuple):
+            counter("returns.combined.cache_hit")
+            returnability, llm_fields = cached
+            return returnability, dict(llm_fields)
+
+        counter("returns.combined.cache_miss")
+        return None
+
+    def _finish(self, response_text: str, cache_key: str) -> tuple[ReturnabilityResult, dict]:
+        """Parse both halves of the merged response and cache them."""
+        # Both parsers validate only their own fields and ignore the rest
+        returnability = self.classifier._parse_response(response_text)
+        llm_fields = (
+            self.field_extractor._parse_llm_response(response_text)
+            if returnability.is_returnable
+            else {}
+        )
+
+        if returnability.reason not in PARSE_FALLBACK_REASONS:
+            LLM_RESULT_CACHE.put(cache_key, (returnability, dict(llm_fields)))
+
+        counter("returns.combined.success")
+        log_event(
+            "returns.combined.result",
+            is_returnable=returnability.is_returnable,
+            receipt_type=returnability.receipt_type.value,
+            confidence=returnability.confidence,
+            has_fields=bool(llm_fields),
+            model=GEMINI_MODEL,
+        )
+        return returnability, llm_fields
+
+
+def get_llm_mode_report() -> dict[str, dict[str, float]]:
+    """
+    Side-by-side Stage 2+3 latency and token usage per LLM mode.
+
+    Latency is per email that reached Stage 2 (cache hits included); tokens
+    are averaged over the same emails. Only modes that have run in this
+    process have samples.
+    """
+    report: dict[str, dict[str, float]] = {}
+    for mode in LLM_MODES:
+        latency = get_latency_stats(f"returns.llm_stages.{mode}")
+        emails = latency["count"]
+        prompt_tokens = sum(
+            get_counter(f"returns.{prefix}.prompt_tokens")
+            for prefix in _MODE_COUNTER_PREFIXES[mode]
+        )
+        output_tokens = sum(
+            get_counter(f"returns.{prefix}.output_tokens")
+            for prefix in _MODE_COUNTER_PREFIXES[mode]
+        )
+        report[mode] = {
+            "emails": emails,
+            "latency_p50_ms": latency["p50"] * 1000,
+            "latency_p95_ms": latency["p95"] * 1000,
+            "prompt_tokens_per_email": prompt_tokens / emails if emails else 0.0,
+            "output_tokens_per_email": output_tokens / emails if emails else 0.0,
+        }
+    return report
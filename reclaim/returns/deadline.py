@@ -0,0 +1,46 @@
+"""
+Module: deadline
+Purpose: Time budget for one extraction request, passed down the pipeline.
+Dependencies: reclaim.config
+
+The tenacity retries in call_llm can add more than 10 s per email, enough for
+a batch to outlive its client's or proxy's timeout. The route derives a
+Deadline for the request; before each LLM call the pipeline asks whether the
+remaining budget still covers one (EXTRACT_LLM_RESERVE_S), and emails that
+can't be covered are marked degraded: classified ones fall back to rules-only
+extraction, unclassified ones are returned without a card. The extension
+retries degraded emails on its next scan.
+"""
+
+from __future__ import annotations
+
+import time
+
+from reclaim.config import EXTRACT_LLM_RESERVE_S
+
+
+class Deadline:
+    """A point in time (monotonic clock) by which results must be returned."""
+
+    __slots__ = ("expires_at", "llm_reserve_s")
+
+    def __init__(self, expires_at: float, llm_reserve_s: float = EXTRACT_LLM_RESERVE_S):
+        self.expires_at = expires_at
+        self.llm_reserve_s = llm_reserve_s
+
+    @classmethod
+    def after(cls, seconds: float, llm_reserve_s: float = EXTRACT_LLM_RESERVE_S) -> Deadline:
+        """Deadline `seconds` from now."""
+        return cls(time.monotonic() + seconds, llm_reserve_s)
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def allows_llm_call(self) -> bool:
+        """True if enough budget remains to start another LLM call."""
+        return self.remaining() >= self.llm_reserve_s
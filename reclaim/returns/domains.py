@@ -0,0 +1,191 @@
+"""
+Sender domain resolution shared by Stage 1 and merchant-rule lookups.
+
+DomainResolver turns a raw From header ("Amazon <ship-confirm@amazon.com>")
+into the merchant domain the pipeline keys on ("amazon.com"). The same few
+thousand senders repeat across every user's mailbox, so results are memoized
+on the raw header in a bounded LRU cache.
+
+On a miss, the host's labels are walked right to left through a suffix trie
+built once from filter_data.py and merchant_rules.yaml. One walk finds:
+- the longest multi-label public suffix (MULTI_PART_PUBLIC_SUFFIXES), so the
+  registrable domain keeps one label more (amazon.co.uk, not co.uk)
+- shipping/returns services (SHIPPING_SERVICE_DOMAINS), whose first label
+  names the merchant (bananarepublic.narvar.com -> bananarepublic.com)
+- merchant aliases (``aliases:`` under a merchant in merchant_rules.yaml),
+  which map another domain and its subdomains onto the merchant's
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from cachetools import LRUCache
+
+from reclaim.config import DOMAIN_RESOLVER_CACHE_MAX
+from reclaim.returns.filter_data import MULTI_PART_PUBLIC_SUFFIXES, SHIPPING_SERVICE_DOMAINS
+
+_ANGLE_ADDR_RE = re.compile(r"<([^>]+)>")
+
+# Trie node keys: any-one-label children, and what ends at the node (labels
+# are split on ".", so "." can't be one)
+_WILDCARD = "*"
+_DATA = "."
+
+
+class _TrieData:
+    """What ends at a suffix-trie node."""
+
+    __slots__ = ("public_suffix", "shipping_service", "alias")
+
+    def __init__(self) -> None:
+        self.public_suffix = False
+        self.shipping_service = False
+        self.alias: str | None = None
+
+
+class DomainResolver:
+    """
+    Resolve From headers to merchant domains, memoized per raw header.
+
+    Thread-safe: batch extraction resolves senders from worker threads.
+    """
+
+    def __init__(
+        self,
+        merchant_rules: dict[str, Any] | None = None,
+        cache_size: int = DOMAIN_RESOLVER_CACHE_MAX,
+    ):
+        """
+        Build the suffix trie.
+
+        Args:
+            merchant_rules: Parsed merchant_rules.yaml (source of aliases)
+            cache_size: Max From headers memoized
+        """
+        self._trie: dict[str, Any] = {}
+        for suffix in MULTI_PART_PUBLIC_SUFFIXES:
+            self._node_data(suffix).public_suffix = True
+        for service in SHIPPING_SERVICE_DOMAINS:
+            self._node_data(service).shipping_service = True
+
+        self.aliases: dict[str, str] = {}
+        merchants = (merchant_rules or {}).get("merchants", {}) or {}
+        for domain, rule in merchants.items():
+            for alias in (rule or {}).get("aliases", None) or ():
+                alias = alias.lower().strip()
+                self.aliases[alias] = domain
+                self._node_data(alias).alias = domain
+
+        self._cache: LRUCache[str, str] = LRUCache(maxsize=max(1, cache_size))
+        # cachetools caches are not thread-safe
+        self._lock = threading.Lock()
+
+    def _node_data(self, domain: str) -> _TrieData:
+        node = self._trie
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        if _DATA not in node:
+            node[_DATA] = _TrieData()
+        return node[_DATA]
+
+    def resolve(self, from_address: str) -> str:
+        """
+        Merchant domain for a From header.
+
+        Handles formats:
+        - "noreply@amazon.com" → "amazon.com"
+        - "Amazon <noreply@amazon.com>" → "amazon.com"
+        - "ship-confirm@amazon.com" → "amazon.com"
+        - "bananarepublic@bananarepublic.narvar.com" → "bananarepublic.com" (shipping service)
+        """
+        with self._lock:
+            domain = self._cache.get(from_address)
+        if domain is None:
+            domain = self._resolve_uncached(from_address)
+            with self._lock:
+                self._cache[from_address] = domain
+        return domain
+
+    def resolve_many(self, from_addresses: Iterable[str]) -> list[str]:
+        """resolve() for many headers: each distinct header resolved once, one lock round-trip."""
+        from_addresses = list(from_addresses)
+        distinct: dict[str, str | None] = dict.fromkeys(from_addresses)
+        with self._lock:
+            for from_address in distinct:
+                distinct[from_address] = self._cache.get(from_address)
+
+        resolved = {
+            from_address: domain for from_address, domain in distinct.items() if domain is not None
+        }
+        misses = {
+            from_address: self._resolve_uncached(from_address)
+            for from_address in distinct
+            if from_address not in resolved
+        }
+        if misses:
+            resolved.update(misses)
+            with self._lock:
+                for from_address, domain in misses.items():
+                    self._cache[from_address] = domain
+        return [resolved[from_address] for from_address in from_addresses]
+
+    def canonical(self, domain: str) -> str:
+        """Merchant domain an already-resolved domain is an alias of (or itself)."""
+        return self.aliases.get(domain, domain)
+
+    def _resolve_uncached(self, from_address: str) -> str:
+        # Extract email from "Name <email>" format
+        match = _ANGLE_ADDR_RE.search(from_address)
+        if match:
+            from_address = match.group(1)
+
+        # Extract domain part
+        if "@" in from_address:
+            host = from_address.split("@")[-1].lower().strip()
+        else:
+            host = from_address.lower().strip()
+        labels = host.split(".")
+
+        # One right-to-left walk; wildcard and exact branches can both match
+        suffix_labels = 1
+        shipping_labels = 0
+        alias: str | None = None
+        nodes = [self._trie]
+        for depth, label in enumerate(reversed(labels), start=1):
+            nodes = [
+                child
+                for node in nodes
+                for child in (node.get(label), node.get(_WILDCARD))
+                if child is not None
+            ]
+            if not nodes:
+                break
+            for node in nodes:
+                data = node.get(_DATA)
+                if data is None:
+                    continue
+                if data.public_suffix:
+                    suffix_labels = depth
+                if data.shipping_service:
+                    shipping_labels = depth
+                if data.alias is not None:
+                    alias = data.alias
+
+        if alias is not None:
+            return alias
+
+        # Shipping services: the first label is the merchant
+        if shipping_labels and len(labels) > shipping_labels:
+            merchant_label = labels[0]
+            if merchant_label and len(merchant_label) > 2:
+                return self.canonical(f"{merchant_label}.com")
+
+        # Registrable domain: the public suffix plus one label
+        # e.g., "ship.amazon.com" → "amazon.com", "mail.amazon.co.uk" → "amazon.co.uk"
+        if len(labels) > suffix_labels + 1:
+            host = ".".join(labels[-(suffix_labels + 1) :])
+        return self.canonical(host)
@@ -3,6 +3,7 @@ Returnable Receipt Extractor - Main orchestrator for the 3-stage pipeline.
 
 Coordinates:
 1. MerchantDomainFilter (Stage 1) - Fast rule-based pre-filter
+   (optional Stage 1.5: local model settles confident cases without the LLM)
 2. ReturnabilityClassifier (Stage 2) - LLM-based returnability check
 3. ReturnFieldExtractor (Stage 3) - Hybrid LLM + rules field extraction
 
@@ -11,25 +12,64 @@ Entry point: ReturnableReceiptExtractor.extract_from_email()
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import re
+import threading
 import uuid
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager
 from datetime import UTC, datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-import yaml
-
-from reclaim.config import PIPELINE_MIN_BODY_CHARS
+from reclaim.config import (
+    CLASSIFIER_PACK_SIZE,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_WORKERS,
+    LOCAL_MODEL_ACCEPT_P,
+    LOCAL_MODEL_REJECT_P,
+    PIPELINE_HTML_TEXT_MAX_CHARS,
+    PIPELINE_LLM_MODE,
+    PIPELINE_MIN_BODY_CHARS,
+)
 from reclaim.infrastructure.llm_budget import check_budget, record_llm_call
 from reclaim.observability.logging import get_logger
-from reclaim.observability.telemetry import counter, log_event
+from reclaim.observability.telemetry import (
+    TimingCollector,
+    collect_timings,
+    counter,
+    log_event,
+    time_block,
+)
+from reclaim.returns.combined_stage import (
+    LLM_MODE_COMBINED,
+    LLM_MODES,
+    CombinedReturnabilityExtractor,
+)
+from reclaim.returns.deadline import Deadline
+from reclaim.returns.domains import DomainResolver
 from reclaim.returns.field_extractor import ReturnFieldExtractor
 from reclaim.returns.filters import MerchantDomainFilter
+from reclaim.returns.local_model import get_local_model
+from reclaim.returns.merchant_rules import (
+    DEFAULT_MERCHANT_RULES_PATH,
+    get_merchant_rules_store,
+    load_merchant_rules,
+)
 from reclaim.returns.models import ReturnCard, ReturnConfidence
 from reclaim.returns.returnability_classifier import (
     ReturnabilityClassifier,
+    ReturnabilityResult,
+)
+from reclaim.returns.types import (
+    ExtractedFields,
+    ExtractionResult,
+    ExtractionStage,
+    FilterResult,
 )
-from reclaim.returns.types import ExtractedFields, ExtractionResult, ExtractionStage
 from reclaim.utils.html import html_to_text
 from reclaim.utils.redaction import redact, redact_subject
 
@@ -40,6 +80,27 @@ logger = get_logger(__name__)
 # links with no actual content — all real content is in the HTML.
 _MIN_USEFUL_BODY_CHARS = PIPELINE_MIN_BODY_CHARS
 
+# time_block metric prefix for per-stage timings ("returns.stage.classifier", ...)
+STAGE_TIMING_PREFIX = "returns.stage."
+
+
+def _stage(name: str) -> AbstractContextManager[None]:
+    """Time one pipeline stage (histogram per stage, collected per request)."""
+    return time_block(f"{STAGE_TIMING_PREFIX}{name}")
+
+
+def _out_of_time(deadline: Deadline | None) -> bool:
+    """True if a deadline is set and can no longer cover an LLM call."""
+    if deadline is None or deadline.allows_llm_call():
+        return False
+    counter("returns.extraction.deadline_skip_llm")
+    return True
+
+
+def stage_timings(timings: TimingCollector) -> dict[str, tuple[float, int]]:
+    """Per-stage (total seconds, calls) from a collect_timings() scope."""
+    return timings.by_prefix(STAGE_TIMING_PREFIX)
+
 
 def _is_body_boilerplate(body: str) -> bool:
     """Check if body text is empty or just boilerplate (URLs, separators)."""
@@ -90,6 +151,44 @@ _STOP_WORDS = frozenset(
 # Minimum word length to consider meaningful
 _MIN_WORD_LEN = 3
 
+# Item summaries that are just generic email phrases echoing the subject line
+_GENERIC_ITEM_SUMMARIES = frozenset(
+    {
+        # Order confirmation phrases
+        "thanks for your order",
+        "thank you for your order",
+        "your order has been placed",
+        "order confirmation",
+        "your order",
+        # Delivery notification phrases
+        "package has been delivered",
+        "your package has been delivered",
+        "your package was delivered",
+        "your delivery is complete",
+        "delivery notification",
+        "delivered",
+        # Shipping notification phrases
+        "your order has shipped",
+        "your order has been shipped",
+        "your package is on the way",
+        "out for delivery",
+        "shipped",
+        # Additional delivery/shipping variants
+        "in transit",
+        "on the way",
+        "order received",
+        # Post-prefix-stripped variants (fallback extractor strips
+        # "Your ", "Order ", "Shipping ", "Delivery " prefixes)
+        "has shipped",
+        "has been shipped",
+        "has been delivered",
+        "was delivered",
+        "has been placed",
+        "is on the way",
+        "confirmation",
+    }
+)
+
 
 _ORDER_KEYWORDS = {
     "order confirmation",
@@ -180,38 +279,61 @@ class ReturnableReceiptExtractor:
         "we have issued your refund",
     ]
 
-    def __init__(self, merchant_rules_path: Path | None = None):
+    def __init__(
+        self,
+        merchant_rules_path: Path | None = None,
+        merchant_rules: dict | None = None,
+        llm_mode: str | None = None,
+    ):
         """
         Initialize extractor with merchant rules.
 
         Args:
             merchant_rules_path: Path to merchant_rules.yaml
+            merchant_rules: Already-parsed rules (skips reading the file).
+                            The same dict is shared with the domain filter.
+            llm_mode: "two_call" or "combined" Stage 2+3 engine
+                      (default: PIPELINE_LLM_MODE)
         """
-        if merchant_rules_path is None:
-            merchant_rules_path = (
-                Path(__file__).parent.parent.parent / "config" / "merchant_rules.yaml"
-            )
-
-        self.merchant_rules = self._load_merchant_rules(merchant_rules_path)
+        self.llm_mode = llm_mode or PIPELINE_LLM_MODE
+        if self.llm_mode not in LLM_MODES:
+            raise ValueError(f"Unknown LLM mode {self.llm_mode!r}; expected one of {LLM_MODES}")
 
-        # Initialize pipeline stages
-        self.domain_filter = MerchantDomainFilter(merchant_rules_path)
-        self.returnability_classifier = ReturnabilityClassifier()
-        self.field_extractor = ReturnFieldExtractor(self.merchant_rules)
+        if merchant_rules_path is None:
+            merchant_rules_path = DEFAULT_MERCHANT_RULES_PATH
+
+        if merchant_rules is None:
+            merchant_rules = self._load_merchant_rules(merchant_rules_path)
+        self.merchant_rules = merchant_rules
+
+        # Initialize pipeline stages (sharing one sender-domain resolver)
+        self.domain_resolver = DomainResolver(self.merchant_rules)
+        self.domain_filter = MerchantDomainFilter(
+            merchant_rules_path,
+            merchant_rules=self.merchant_rules,
+            domain_resolver=self.domain_resolver,
+        )
+        # Stage 1.5: confident local verdicts skip the classifier (None when disabled)
+        self.local_model = get_local_model()
+        self.returnability_classifier = ReturnabilityClassifier(
+            domain_resolver=self.domain_resolver
+        )
+        self.field_extractor = ReturnFieldExtractor(
+            self.merchant_rules, domain_resolver=self.domain_resolver
+        )
+        self.combined_stage = CombinedReturnabilityExtractor(
+            self.returnability_classifier, self.field_extractor
+        )
 
         logger.info(
-            "ReturnableReceiptExtractor initialized with %d merchant rules",
+            "ReturnableReceiptExtractor initialized with %d merchant rules (llm_mode=%s)",
             len(self.merchant_rules.get("merchants", {})),
+            self.llm_mode,
         )
 
     def _load_merchant_rules(self, path: Path) -> dict:
         """Load merchant rules from YAML."""
-        if not path.exists():
-            logger.warning("Merchant rules not found at %s", path)
-            return {"merchants": {}}
-
-        with open(path) as f:
-            return yaml.safe_load(f)
+        return load_merchant_rules(path)
 
     def extract_from_email(
         self,
@@ -222,6 +344,10 @@ class ReturnableReceiptExtractor:
         body: str,
         received_at: datetime | None = None,
         body_html: str | None = None,
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        working_body: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
     ) -> ExtractionResult:
         """
         Extract return card from email if it's a returnable purchase.
@@ -236,20 +362,341 @@ class ReturnableReceiptExtractor:
             body: Email body text
             received_at: When email was received
             body_html: Raw HTML body (used as fallback when body is empty)
+            returnability: Stage 2 verdict already obtained by the batch
+                           pre-pass (skips the classifier call)
+            deadline: Request time budget; LLM calls it can't cover are
+                      replaced by rules-only extraction (result.degraded)
+            working_body: Text the batch pre-pass already picked from body /
+                          body_html (skips the HTML-to-text conversion)
+            on_verdict: Called with the Stage 2 verdict once the email passes
+                        it, so a caller cut off by the deadline can still
+                        extract it rules-only (two-call mode only)
 
         Returns:
             ExtractionResult with success=True and card if returnable,
             success=False with rejection_reason otherwise.
 
         Side Effects:
-            - Calls Gemini API (2 calls for returnable emails)
+            - Calls Gemini API (2 calls for returnable emails, 1 in combined mode)
             - Logs extraction events
             - Increments telemetry counters
         """
-        # Convert HTML body to text when plain-text body is empty or boilerplate
-        if body_html and _is_body_boilerplate(body):
-            body = html_to_text(body_html)
-            logger.info("Converted HTML body to text (%d chars)", len(body))
+        body = self._prepare_body(body, body_html, subject, from_address, working_body)
+
+        # Stage 1 + budget check (free)
+        filter_result, rejection = self._run_filter(user_id, from_address, subject, body)
+        if rejection is not None:
+            return rejection
+        assert filter_result is not None
+
+        with time_block(f"returns.llm_stages.{self.llm_mode}"):
+            if self.llm_mode == LLM_MODE_COMBINED:
+                return self._run_combined(
+                    user_id,
+                    email_id,
+                    filter_result,
+                    from_address,
+                    subject,
+                    body,
+                    received_at,
+                    deadline,
+                    body_html,
+                )
+            return self._run_two_call(
+                user_id,
+                email_id,
+                filter_result,
+                from_address,
+                subject,
+                body,
+                received_at,
+                returnability,
+                deadline,
+                body_html,
+                on_verdict,
+            )
+
+    def _run_two_call(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None,
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        body_html: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
+    ) -> ExtractionResult:
+        """Stage 2 and Stage 3 as two sequential LLM calls."""
+        llm_call: str | None = "classifier"
+        if returnability is None:
+            returnability = self._local_verdict(filter_result, from_address, subject, body)
+            if returnability is not None:
+                llm_call = None
+
+        if returnability is None and _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id, email_id, filter_result, None, from_address, subject, body, received_at
+            )
+
+        # Stage 2: Returnability Classifier (~$0.0001), unless pre-classified
+        if returnability is None:
+            with _stage("classifier"):
+                returnability = self.returnability_classifier.classify(
+                    from_address=from_address,
+                    subject=subject,
+                    snippet=body[:2000] if body else "",
+                )
+        rejection = self._check_returnability(
+            user_id, filter_result, returnability, llm_call=llm_call
+        )
+        if rejection is not None:
+            return rejection
+        if on_verdict is not None:
+            on_verdict(returnability)
+
+        if _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id,
+                email_id,
+                filter_result,
+                returnability,
+                from_address,
+                subject,
+                body,
+                received_at,
+            )
+
+        # Stage 3: Field Extraction (~$0.0002)
+        with _stage("extractor"):
+            fields = self.field_extractor.extract(
+                from_address=from_address,
+                subject=subject,
+                body=body,
+                merchant_domain=filter_result.domain,
+                received_at=received_at,
+                body_html=body_html,
+            )
+        return self._finish_extraction(
+            user_id, email_id, filter_result, returnability, fields, received_at
+        )
+
+    def _run_combined(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None,
+        deadline: Deadline | None = None,
+        body_html: str | None = None,
+    ) -> ExtractionResult:
+        """Stage 2 and Stage 3 from a single LLM call, branching on the verdict."""
+        # Confident local rejects skip the call; accepts still need its fields
+        local = self._local_verdict(filter_result, from_address, subject, body)
+        if local is not None and not local.is_returnable:
+            rejection = self._check_returnability(user_id, filter_result, local, llm_call=None)
+            assert rejection is not None
+            return rejection
+
+        if _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id, email_id, filter_result, None, from_address, subject, body, received_at
+            )
+
+        with _stage("combined"):
+            returnability, llm_fields = self.combined_stage.classify_and_extract(
+                from_address, subject, body, received_at
+            )
+        rejection = self._check_returnability(
+            user_id, filter_result, returnability, llm_call="combined"
+        )
+        if rejection is not None:
+            return rejection
+
+        fields = self.field_extractor.extract_from_llm_fields(
+            from_address, subject, body, filter_result.domain, received_at, llm_fields, body_html
+        )
+        return self._finish_extraction(
+            user_id, email_id, filter_result, returnability, fields, received_at, llm_call=None
+        )
+
+    async def extract_from_email_async(
+        self,
+        user_id: str,
+        email_id: str,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None = None,
+        body_html: str | None = None,
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        working_body: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
+    ) -> ExtractionResult:
+        """Async variant of extract_from_email().
+
+        Runs the same stages and policies, but awaits the classifier and
+        extractor LLM calls so the event loop stays free between them.
+        """
+        body = self._prepare_body(body, body_html, subject, from_address, working_body)
+
+        filter_result, rejection = self._run_filter(user_id, from_address, subject, body)
+        if rejection is not None:
+            return rejection
+        assert filter_result is not None
+
+        with time_block(f"returns.llm_stages.{self.llm_mode}"):
+            if self.llm_mode == LLM_MODE_COMBINED:
+                return await self._run_combined_async(
+                    user_id,
+                    email_id,
+                    filter_result,
+                    from_address,
+                    subject,
+                    body,
+                    received_at,
+                    deadline,
+                    body_html,
+                )
+            return await self._run_two_call_async(
+                user_id,
+                email_id,
+                filter_result,
+                from_address,
+                subject,
+                body,
+                received_at,
+                returnability,
+                deadline,
+                body_html,
+                on_verdict,
+            )
+
+    async def _run_two_call_async(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None,
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        body_html: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
+    ) -> ExtractionResult:
+        """Async variant of _run_two_call()."""
+        llm_call: str | None = "classifier"
+        if returnability is None:
+            returnability = self._local_verdict(filter_result, from_address, subject, body)
+            if returnability is not None:
+                llm_call = None
+
+        if returnability is None and _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id, email_id, filter_result, None, from_address, subject, body, received_at
+            )
+
+        if returnability is None:
+            with _stage("classifier"):
+                returnability = await self.returnability_classifier.classify_async(
+                    from_address=from_address,
+                    subject=subject,
+                    snippet=body[:2000] if body else "",
+                )
+        rejection = self._check_returnability(
+            user_id, filter_result, returnability, llm_call=llm_call
+        )
+        if rejection is not None:
+            return rejection
+        if on_verdict is not None:
+            on_verdict(returnability)
+
+        if _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id,
+                email_id,
+                filter_result,
+                returnability,
+                from_address,
+                subject,
+                body,
+                received_at,
+            )
+
+        with _stage("extractor"):
+            fields = await self.field_extractor.extract_async(
+                from_address=from_address,
+                subject=subject,
+                body=body,
+                merchant_domain=filter_result.domain,
+                received_at=received_at,
+                body_html=body_html,
+            )
+        return self._finish_extraction(
+            user_id, email_id, filter_result, returnability, fields, received_at
+        )
+
+    async def _run_combined_async(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None,
+        deadline: Deadline | None = None,
+        body_html: str | None = None,
+    ) -> ExtractionResult:
+        """Async variant of _run_combined()."""
+        # Confident local rejects skip the call; accepts still need its fields
+        local = self._local_verdict(filter_result, from_address, subject, body)
+        if local is not None and not local.is_returnable:
+            rejection = self._check_returnability(user_id, filter_result, local, llm_call=None)
+            assert rejection is not None
+            return rejection
+
+        if _out_of_time(deadline):
+            return self._degraded_extraction(
+                user_id, email_id, filter_result, None, from_address, subject, body, received_at
+            )
+
+        with _stage("combined"):
+            returnability, llm_fields = await self.combined_stage.classify_and_extract_async(
+                from_address, subject, body, received_at
+            )
+        rejection = self._check_returnability(
+            user_id, filter_result, returnability, llm_call="combined"
+        )
+        if rejection is not None:
+            return rejection
+
+        fields = self.field_extractor.extract_from_llm_fields(
+            from_address, subject, body, filter_result.domain, received_at, llm_fields, body_html
+        )
+        return self._finish_extraction(
+            user_id, email_id, filter_result, returnability, fields, received_at, llm_call=None
+        )
+
+    def _prepare_body(
+        self,
+        body: str,
+        body_html: str | None,
+        subject: str,
+        from_address: str,
+        working_body: str | None = None,
+    ) -> str:
+        """Pick the working body text and log the start of extraction."""
+        body = working_body if working_body is not None else self._working_body(body, body_html)
 
         counter("returns.extraction.started")
         # SEC-016: Redact PII from logging
@@ -258,15 +705,35 @@ class ReturnableReceiptExtractor:
             redact_subject(subject),
             redact(from_address),
         )
+        return body
+
+    @staticmethod
+    def _working_body(body: str, body_html: str | None) -> str:
+        """Convert the HTML body to text when the plain-text body is empty or boilerplate."""
+        if body_html and _is_body_boilerplate(body):
+            with _stage("html_to_text"):
+                body = html_to_text(body_html, max_chars=PIPELINE_HTML_TEXT_MAX_CHARS)
+            logger.info("Converted HTML body to text (%d chars)", len(body))
+        return body
+
+    def _run_filter(
+        self, user_id: str, from_address: str, subject: str, body: str
+    ) -> tuple[FilterResult | None, ExtractionResult | None]:
+        """Run Stage 1 and the LLM budget check.
 
+        Returns:
+            (filter_result, None) when the email should proceed to the LLM,
+            (filter_result, rejection) otherwise.
+        """
         # =========================================================
         # Stage 1: Domain Filter (FREE)
         # =========================================================
-        filter_result = self.domain_filter.filter(
-            from_address=from_address,
-            subject=subject,
-            snippet=body[:2000] if body else "",
-        )
+        with _stage("filter"):
+            filter_result = self.domain_filter.filter(
+                from_address=from_address,
+                subject=subject,
+                snippet=body[:2000] if body else "",
+            )
 
         if not filter_result.is_candidate:
             counter("returns.extraction.rejected_filter")
@@ -279,7 +746,7 @@ class ReturnableReceiptExtractor:
                 reason=filter_result.reason,
                 domain=filter_result.domain,
             )
-            return ExtractionResult.rejected_at_filter(filter_result)
+            return filter_result, ExtractionResult.rejected_at_filter(filter_result)
 
         counter("returns.extraction.passed_filter")
         logger.info(
@@ -300,21 +767,37 @@ class ReturnableReceiptExtractor:
                 user_calls=budget_status.user_calls_today,
                 global_calls=budget_status.global_calls_today,
             )
-            return ExtractionResult.rejected_budget_exceeded(
+            return filter_result, ExtractionResult.rejected_budget_exceeded(
                 filter_result, budget_status.reason or ""
             )
 
-        # =========================================================
-        # Stage 2: Returnability Classifier (~$0.0001)
-        # =========================================================
-        returnability = self.returnability_classifier.classify(
-            from_address=from_address,
-            subject=subject,
-            snippet=body[:2000] if body else "",
-        )
+        return filter_result, None
+
+    def _local_verdict(
+        self, filter_result: FilterResult, from_address: str, subject: str, body: str
+    ) -> ReturnabilityResult | None:
+        """Stage 1.5: the local model's verdict when it is confident, else None."""
+        if self.local_model is None:
+            return None
+        with _stage("local_model"):
+            return self.local_model.verdict(
+                filter_result.domain, from_address, subject, body[:2000] if body else ""
+            )
 
-        # SCALE-001: Record classifier LLM call
-        record_llm_call(user_id, "classifier")
+    def _check_returnability(
+        self,
+        user_id: str,
+        filter_result: FilterResult,
+        returnability: ReturnabilityResult,
+        llm_call: str | None = "classifier",
+    ) -> ExtractionResult | None:
+        """Record the Stage 2 call and return a rejection if not returnable.
+
+        llm_call is None when the verdict came from the local model.
+        """
+        # SCALE-001: Record classifier (or combined) LLM call
+        if llm_call is not None:
+            record_llm_call(user_id, llm_call)
 
         if not returnability.is_returnable:
             counter("returns.extraction.rejected_classifier")
@@ -336,20 +819,22 @@ class ReturnableReceiptExtractor:
             "STAGE 2 PASSED BY LLM: type=%s -> proceeding to extraction",
             returnability.receipt_type.value,
         )
+        return None
 
-        # =========================================================
-        # Stage 3: Field Extraction (~$0.0002)
-        # =========================================================
-        fields = self.field_extractor.extract(
-            from_address=from_address,
-            subject=subject,
-            body=body,
-            merchant_domain=filter_result.domain,
-            received_at=received_at,
-        )
-
-        # SCALE-001: Record extractor LLM call
-        record_llm_call(user_id, "extractor")
+    def _finish_extraction(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        returnability: ReturnabilityResult,
+        fields: ExtractedFields,
+        received_at: datetime | None,
+        llm_call: str | None = "extractor",
+    ) -> ExtractionResult:
+        """Record the Stage 3 call, build the card and reject empty cards."""
+        # SCALE-001: Record extractor LLM call (none in combined mode)
+        if llm_call is not None:
+            record_llm_call(user_id, llm_call)
 
         counter("returns.extraction.passed_extractor")
 
@@ -365,44 +850,10 @@ class ReturnableReceiptExtractor:
 
         # Reject cards with no identifiable content (no item and no order number,
         # or item_summary is just a generic email phrase echoing the subject line)
-        _generic = frozenset(
-            {
-                # Order confirmation phrases
-                "thanks for your order",
-                "thank you for your order",
-                "your order has been placed",
-                "order confirmation",
-                "your order",
-                # Delivery notification phrases
-                "package has been delivered",
-                "your package has been delivered",
-                "your package was delivered",
-                "your delivery is complete",
-                "delivery notification",
-                "delivered",
-                # Shipping notification phrases
-                "your order has shipped",
-                "your order has been shipped",
-                "your package is on the way",
-                "out for delivery",
-                "shipped",
-                # Additional delivery/shipping variants
-                "in transit",
-                "on the way",
-                "order received",
-                # Post-prefix-stripped variants (fallback extractor strips
-                # "Your ", "Order ", "Shipping ", "Delivery " prefixes)
-                "has shipped",
-                "has been shipped",
-                "has been delivered",
-                "was delivered",
-                "has been placed",
-                "is on the way",
-                "confirmation",
-            }
-        )
         item_text = (card.item_summary or "").strip().rstrip(".!").lower()
-        if not card.order_number and (not card.item_summary or item_text in _generic):
+        if not card.order_number and (
+            not card.item_summary or item_text in _GENERIC_ITEM_SUMMARIES
+        ):
             counter("returns.extraction.rejected_empty_card")
             logger.info(
                 "EMPTY CARD REJECTED: merchant=%s - no item_summary or order_number",
@@ -432,6 +883,80 @@ class ReturnableReceiptExtractor:
             fields=fields,
         )
 
+    def _degraded_extraction(
+        self,
+        user_id: str,
+        email_id: str,
+        filter_result: FilterResult,
+        returnability: ReturnabilityResult | None,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None,
+    ) -> ExtractionResult:
+        """Rules-only extraction for an email the request deadline can't cover.
+
+        Skips whichever LLM calls are left. A Stage 1 candidate that never got
+        a Stage 2 verdict is held back without a card (most candidates are
+        not returnable); one the classifier accepted is extracted by rules.
+        Either way the result is marked degraded.
+        """
+        counter("returns.extraction.degraded")
+        if returnability is None:
+            counter("returns.extraction.degraded_unclassified")
+            logger.info("DEADLINE: domain=%s -> held back unclassified", filter_result.domain)
+            return ExtractionResult.unclassified_at_deadline(filter_result)
+
+        logger.info("DEADLINE: domain=%s -> rules-only extraction", filter_result.domain)
+
+        fields = self.field_extractor.extract_from_llm_fields(
+            from_address, subject, body, filter_result.domain, received_at, {}
+        )
+        result = self._finish_extraction(
+            user_id, email_id, filter_result, returnability, fields, received_at, llm_call=None
+        )
+        result.degraded = True
+        return result
+
+    def _rules_only(
+        self,
+        user_id: str,
+        email: dict[str, Any],
+        working_body: str | None = None,
+        returnability: ReturnabilityResult | None = None,
+    ) -> ExtractionResult:
+        """Degraded result for an email whose processing was cut off by the deadline.
+
+        returnability is the Stage 2 verdict the email had reached, if any.
+        """
+        try:
+            from_address = email.get("from", "")
+            subject = email.get("subject", "")
+            body = (
+                working_body
+                if working_body is not None
+                else self._working_body(email.get("body", ""), email.get("body_html"))
+            )
+            filter_result = self.domain_filter.filter(
+                from_address, subject, body[:2000] if body else ""
+            )
+            if not filter_result.is_candidate:
+                return ExtractionResult.rejected_at_filter(filter_result)
+            if returnability is not None and not returnability.is_returnable:
+                return ExtractionResult.rejected_at_classifier(filter_result, returnability)
+            return self._degraded_extraction(
+                user_id,
+                email["id"],
+                filter_result,
+                returnability,
+                from_address,
+                subject,
+                body,
+                email.get("received_at"),
+            )
+        except Exception as e:
+            return self._error_result(email, e)
+
     def _build_return_card(
         self,
         user_id: str,
@@ -473,43 +998,45 @@ class ReturnableReceiptExtractor:
             Set of order number strings found in cancellation emails.
         """
         cancelled: set[str] = set()
-
         for email in emails:
-            subject = (email.get("subject") or "").lower()
-            body = (email.get("body") or "").lower()
+            cancelled.update(self._cancelled_order_numbers(email))
+        return cancelled
 
-            is_cancellation = False
+    def _cancelled_order_numbers(self, email: dict[str, Any]) -> list[str]:
+        """Order numbers cancelled by this email ([] if it isn't a cancellation)."""
+        subject = (email.get("subject") or "").lower()
+        body = (email.get("body") or "").lower()
 
-            # Check subject for cancellation signals
-            for keyword in self._CANCELLATION_SUBJECT_KEYWORDS:
-                if keyword in subject:
-                    is_cancellation = True
-                    break
+        is_cancellation = False
 
-            # Check body for cancellation signals (only if subject didn't match)
-            if not is_cancellation:
-                for keyword in self._CANCELLATION_BODY_KEYWORDS:
-                    if keyword in body:
-                        is_cancellation = True
-                        break
+        # Check subject for cancellation signals
+        for keyword in self._CANCELLATION_SUBJECT_KEYWORDS:
+            if keyword in subject:
+                is_cancellation = True
+                break
 
-            if not is_cancellation:
-                continue
+        # Check body for cancellation signals (only if subject didn't match)
+        if not is_cancellation:
+            for keyword in self._CANCELLATION_BODY_KEYWORDS:
+                if keyword in body:
+                    is_cancellation = True
+                    break
 
-            # Extract order numbers from the cancellation email (use original case)
-            raw_subject = email.get("subject") or ""
-            raw_body = email.get("body") or ""
-            order_numbers = self._AMAZON_ORDER_RE.findall(raw_subject + " " + raw_body)
+        if not is_cancellation:
+            return []
 
-            if order_numbers:
-                cancelled.update(order_numbers)
-                logger.info(
-                    "Cancellation detected: email_id=%s orders=%s",
-                    email.get("id", "unknown"),
-                    order_numbers,
-                )
+        # Extract order numbers from the cancellation email (use original case)
+        raw_subject = email.get("subject") or ""
+        raw_body = email.get("body") or ""
+        order_numbers = self._AMAZON_ORDER_RE.findall(raw_subject + " " + raw_body)
 
-        return cancelled
+        if order_numbers:
+            logger.info(
+                "Cancellation detected: email_id=%s orders=%s",
+                email.get("id", "unknown"),
+                order_numbers,
+            )
+        return order_numbers
 
     def _suppress_cancelled_cards(
         self,
@@ -549,14 +1076,274 @@ class ReturnableReceiptExtractor:
                 suppressed.append(result)
         return suppressed
 
+    def _process_one(
+        self,
+        user_id: str,
+        email: dict[str, Any],
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        working_body: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
+    ) -> ExtractionResult:
+        """Run a single email dict through the pipeline, converting errors to results."""
+        try:
+            return self.extract_from_email(
+                user_id=user_id,
+                email_id=email["id"],
+                from_address=email.get("from", ""),
+                subject=email.get("subject", ""),
+                body=email.get("body", ""),
+                received_at=email.get("received_at"),
+                body_html=email.get("body_html"),
+                returnability=returnability,
+                deadline=deadline,
+                working_body=working_body,
+                on_verdict=on_verdict,
+            )
+
+        except Exception as e:
+            return self._error_result(email, e)
+
+    async def _process_one_async(
+        self,
+        user_id: str,
+        email: dict[str, Any],
+        returnability: ReturnabilityResult | None = None,
+        deadline: Deadline | None = None,
+        working_body: str | None = None,
+        on_verdict: Callable[[ReturnabilityResult], None] | None = None,
+    ) -> ExtractionResult:
+        """Async variant of _process_one()."""
+        try:
+            return await self.extract_from_email_async(
+                user_id=user_id,
+                email_id=email["id"],
+                from_address=email.get("from", ""),
+                subject=email.get("subject", ""),
+                body=email.get("body", ""),
+                received_at=email.get("received_at"),
+                body_html=email.get("body_html"),
+                returnability=returnability,
+                deadline=deadline,
+                working_body=working_body,
+                on_verdict=on_verdict,
+            )
+
+        except Exception as e:
+            return self._error_result(email, e)
+
+    @staticmethod
+    def _error_result(email: dict[str, Any], e: Exception) -> ExtractionResult:
+        """Convert an unexpected per-email failure into an error result."""
+        logger.error("Failed to process email %s: %s", email.get("id"), e)
+        counter("returns.extraction.error")
+        return ExtractionResult(
+            success=False,
+            rejection_reason=f"error:{str(e)[:100]}",
+            stage_reached=ExtractionStage.ERROR,
+        )
+
+    def _packing_candidates(
+        self, user_id: str, emails: list[dict[str, Any]], deadline: Deadline | None = None
+    ) -> tuple[list[tuple[int, tuple[str, str, str]]], list[str] | None]:
+        """Emails that will reach the Stage 2 LLM, as (index, classifier inputs).
+
+        Candidates are empty when packing does not apply: combined mode,
+        packing disabled, fewer than two candidates, no time left for an LLM
+        call, or the user is already over budget (the per-email path then
+        rejects as usual).
+
+        Returns:
+            (candidates, working_bodies) — working_bodies holds every email's
+            _working_body() once screening had to compute them, so the
+            per-email pass doesn't convert the same HTML again; None when
+            packing was ruled out before that.
+        """
+        if self.llm_mode == LLM_MODE_COMBINED or CLASSIFIER_PACK_SIZE < 2 or len(emails) < 2:
+            return [], None
+        if deadline is not None and not deadline.allows_llm_call():
+            return [], None
+        if not check_budget(user_id).is_allowed:
+            return [], None
+
+        bodies = [
+            self._working_body(email.get("body", ""), email.get("body_html")) for email in emails
+        ]
+        inputs = []
+        for email, body in zip(emails, bodies, strict=True):
+            snippet = body[:2000] if body else ""
+            inputs.append((email.get("from", ""), email.get("subject", ""), snippet))
+
+        # Stage 1 is pure and cheap; the per-email pass repeats it for its own telemetry
+        from_addresses, subjects, snippets = zip(*inputs, strict=True)
+        screened = self.domain_filter.filter_batch(from_addresses, subjects, snippets)
+        candidates = [
+            (index, classifier_inputs)
+            for index, (classifier_inputs, is_candidate) in enumerate(
+                zip(inputs, screened.is_candidate, strict=True)
+            )
+            if is_candidate
+        ]
+        # Emails the local model decides never reach the classifier
+        if self.local_model is not None:
+            candidates = [
+                (index, classifier_inputs)
+                for index, classifier_inputs in candidates
+                if LOCAL_MODEL_REJECT_P
+                < self.local_model.predict_proba(screened.domain[index], *classifier_inputs)
+                < LOCAL_MODEL_ACCEPT_P
+            ]
+
+        return (candidates if len(candidates) >= 2 else []), bodies
+
+    @staticmethod
+    def _packs(
+        candidates: list[tuple[int, tuple[str, str, str]]],
+    ) -> list[list[tuple[int, tuple[str, str, str]]]]:
+        return [
+            candidates[i : i + CLASSIFIER_PACK_SIZE]
+            for i in range(0, len(candidates), CLASSIFIER_PACK_SIZE)
+        ]
+
+    def _preclassify(
+        self,
+        user_id: str,
+        emails: list[dict[str, Any]],
+        workers: int,
+        deadline: Deadline | None = None,
+    ) -> tuple[dict[int, ReturnabilityResult], list[str] | None]:
+        """Stage 2 for a whole batch in packed LLM calls, keyed by email index.
+
+        Returns the verdicts along with the working bodies screening computed
+        (see _packing_candidates). With a thread pool, packs still running at
+        the deadline are abandoned (see _preclassify_async).
+        """
+        candidates, bodies = self._packing_candidates(user_id, emails, deadline)
+        packs = self._packs(candidates)
+        if not packs:
+            return {}, bodies
+
+        def _classify(pack: list[tuple[int, tuple[str, str, str]]]) -> list[ReturnabilityResult]:
+            with _stage("classifier"):
+                return self.returnability_classifier.classify_packed([item for _, item in pack])
+
+        verdicts: dict[int, ReturnabilityResult] = {}
+        # A lone pack runs inline unless it must be abandonable at the deadline
+        if workers == 1 or (len(packs) == 1 and deadline is None):
+            for pack in packs:
+                try:
+                    pack_verdicts = _classify(pack)
+                except Exception as e:
+                    self._packed_error(e)
+                else:
+                    self._add_pack_verdicts(verdicts, pack, pack_verdicts)
+            return verdicts, bodies
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(workers, len(packs)), thread_name_prefix="reclaim-classify"
+        )
+        try:
+            # Run in copies of this context so stage timings reach the request
+            futures = [
+                pool.submit(contextvars.copy_context().run, _classify, pack) for pack in packs
+            ]
+            # Packs finished in time keep their verdicts even if others miss the deadline
+            for pack, future in zip(packs, futures, strict=True):
+                try:
+                    pack_verdicts = future.result(
+                        timeout=deadline.remaining() if deadline is not None else None
+                    )
+                except TimeoutError:
+                    # Its emails go down the per-email path, which degrades them
+                    counter("returns.extraction.deadline_exceeded")
+                except Exception as e:
+                    self._packed_error(e)
+                else:
+                    self._add_pack_verdicts(verdicts, pack, pack_verdicts)
+        finally:
+            pool.shutdown(wait=deadline is None, cancel_futures=True)
+        return verdicts, bodies
+
+    @staticmethod
+    def _add_pack_verdicts(
+        verdicts: dict[int, ReturnabilityResult],
+        pack: list[tuple[int, tuple[str, str, str]]],
+        pack_verdicts: list[ReturnabilityResult],
+    ) -> None:
+        for (index, _), verdict in zip(pack, pack_verdicts, strict=True):
+            verdicts[index] = verdict
+
+    @staticmethod
+    def _packed_error(e: Exception) -> None:
+        """Log a failed pack; never fail the batch, its emails get per-email Stage 2."""
+        logger.error("Packed classification failed, classifying per email: %s", e)
+        counter("returns.classifier.packed_error")
+
+    async def _preclassify_async(
+        self,
+        user_id: str,
+        emails: list[dict[str, Any]],
+        max_concurrency: int,
+        deadline: Deadline | None = None,
+    ) -> tuple[dict[int, ReturnabilityResult], list[str] | None]:
+        """Async variant of _preclassify(); packs are classified concurrently.
+
+        Packs still running at the deadline are abandoned; their emails then
+        go down the per-email path, which degrades them.
+        """
+        candidates, bodies = self._packing_candidates(user_id, emails, deadline)
+        packs = self._packs(candidates)
+        if not packs:
+            return {}, bodies
+
+        limit = asyncio.Semaphore(max_concurrency)
+
+        async def _classify(
+            pack: list[tuple[int, tuple[str, str, str]]],
+        ) -> list[ReturnabilityResult]:
+            async with limit:
+                with _stage("classifier"):
+                    return await self.returnability_classifier.classify_packed_async(
+                        [item for _, item in pack]
+                    )
+
+        tasks = [asyncio.ensure_future(_classify(pack)) for pack in packs]
+        done, pending = await asyncio.wait(
+            tasks, timeout=deadline.remaining() if deadline is not None else None
+        )
+        # Packs finished in time keep their verdicts even if others miss the deadline
+        for task in pending:
+            task.cancel()
+        if pending:
+            counter("returns.extraction.deadline_exceeded")
+
+        verdicts: dict[int, ReturnabilityResult] = {}
+        for pack, task in zip(packs, tasks, strict=True):
+            if task not in done:
+                continue
+            try:
+                pack_verdicts = task.result()
+            except Exception as e:
+                self._packed_error(e)
+            else:
+                self._add_pack_verdicts(verdicts, pack, pack_verdicts)
+        return verdicts, bodies
+
     def process_email_batch(
         self,
         user_id: str,
         emails: list[dict[str, Any]],
+        max_workers: int | None = None,
+        deadline: Deadline | None = None,
     ) -> list[ExtractionResult]:
         """
         Process a batch of emails and deduplicate results.
 
+        Emails are processed concurrently on a bounded thread pool so the
+        classifier and extractor LLM calls for different emails overlap.
+        Per-email results keep input order; dedup and cancellation
+        suppression run once over the whole batch afterwards.
+
         Args:
             user_id: User who owns these emails
             emails: List of email dicts with keys:
@@ -566,44 +1353,270 @@ class ReturnableReceiptExtractor:
                     - body: Body text
                     - body_html: Optional HTML body (fallback when body is empty)
                     - received_at: Optional datetime
+            max_workers: Max emails in flight at once (default LLM_MAX_WORKERS).
+                         1 processes emails sequentially on the calling thread.
+            deadline: Request time budget. No LLM call starts once it can't be
+                      covered; with a thread pool, emails still unfinished at
+                      the deadline are returned rules-only (degraded).
 
         Returns:
             List of ExtractionResult for each email (deduplicated)
         """
-        results = []
+        workers = max(1, min(max_workers or LLM_MAX_WORKERS, len(emails) or 1))
+
+        with collect_timings() as timings:
+            # Stage 2 for all candidates up front, CLASSIFIER_PACK_SIZE emails per call;
+            # emails that pass Stage 2 later add their verdicts (see _result_by_deadline)
+            verdicts, bodies = self._preclassify(user_id, emails, workers, deadline)
+            working_bodies: list[str | None] = list(bodies) if bodies else [None] * len(emails)
+
+            if workers == 1:
+                results = [
+                    self._process_one(user_id, email, verdicts.get(i), deadline, working_bodies[i])
+                    for i, email in enumerate(emails)
+                ]
+            else:
+                counter("returns.extraction.batch_parallel")
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reclaim-extract")
+                try:
+                    # Futures in submission order, so results line up with emails; each
+                    # runs in a copy of this context so its stage timings are collected
+                    futures = [
+                        pool.submit(
+                            contextvars.copy_context().run,
+                            self._process_one,
+                            user_id,
+                            email,
+                            verdicts.get(i),
+                            deadline,
+                            working_bodies[i],
+                            partial(verdicts.__setitem__, i),
+                        )
+                        for i, email in enumerate(emails)
+                    ]
+                    results = [
+                        self._result_by_deadline(
+                            future,
+                            user_id,
+                            email,
+                            deadline,
+                            working_bodies[i],
+                            partial(verdicts.get, i),
+                        )
+                        for i, (future, email) in enumerate(zip(futures, emails, strict=True))
+                    ]
+                finally:
+                    # Past the deadline, don't wait for calls still in flight
+                    pool.shutdown(wait=deadline is None, cancel_futures=True)
+
+            finalized = self.finalize_batch(user_id, emails, results)
+
+        self._log_stage_timings(len(emails), timings)
+        return finalized
+
+    def _result_by_deadline(
+        self,
+        future: Future[ExtractionResult],
+        user_id: str,
+        email: dict[str, Any],
+        deadline: Deadline | None,
+        working_body: str | None = None,
+        verdict: Callable[[], ReturnabilityResult | None] | None = None,
+    ) -> ExtractionResult:
+        """Wait for one email's result, degrading it if the deadline passes first.
 
-        for email in emails:
+        verdict returns the Stage 2 verdict the email has reached so far, so
+        one cut off during Stage 3 is still extracted rules-only.
+        """
+        try:
+            return future.result(timeout=deadline.remaining() if deadline is not None else None)
+        except TimeoutError:
+            counter("returns.extraction.deadline_exceeded")
+            return self._rules_only(
+                user_id, email, working_body, verdict() if verdict is not None else None
+            )
+
+    async def process_email_batch_async(
+        self,
+        user_id: str,
+        emails: list[dict[str, Any]],
+        max_concurrency: int | None = None,
+        deadline: Deadline | None = None,
+    ) -> list[ExtractionResult]:
+        """
+        Async variant of process_email_batch() for use inside the event loop.
+
+        Emails run as coroutines with at most ``max_concurrency`` in flight
+        (default LLM_MAX_CONCURRENCY), so a single worker can interleave many
+        LLM calls across requests without blocking health checks. Results
+        keep input order and go through the same dedup/cancellation passes.
+        """
+        results: list[ExtractionResult | None] = [None] * len(emails)
+        with collect_timings() as timings:
+            async for index, result in self.iter_email_batch_async(
+                user_id, emails, max_concurrency, deadline
+            ):
+                results[index] = result
+
+            finalized = self.finalize_batch(user_id, emails, [r for r in results if r is not None])
+
+        self._log_stage_timings(len(emails), timings)
+        return finalized
+
+    @staticmethod
+    def _log_stage_timings(emails: int, timings: TimingCollector) -> None:
+        """One event per batch with each stage's total time and call count."""
+        log_event(
+            "returns.extraction.stage_timings",
+            emails=emails,
+            **{
+                stage: {"ms": round(total * 1000, 1), "calls": calls}
+                for stage, (total, calls) in stage_timings(timings).items()
+            },
+        )
+
+    async def iter_email_batch_async(
+        self,
+        user_id: str,
+        emails: list[dict[str, Any]],
+        max_concurrency: int | None = None,
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[tuple[int, ExtractionResult]]:
+        """
+        Yield (input_index, result) for each email as soon as it finishes.
+
+        Per-email results only — callers that need the batch-level dedup and
+        cancellation passes run finalize_batch() over the collected results.
+        Pending emails are cancelled if the consumer stops iterating early.
+        With a deadline, emails still queued or waiting on the LLM when it
+        passes are cancelled and yielded rules-only (degraded).
+        """
+        concurrency = max(1, max_concurrency or LLM_MAX_CONCURRENCY)
+        limit = asyncio.Semaphore(concurrency)
+
+        # Stage 2 for all candidates up front, CLASSIFIER_PACK_SIZE emails per call;
+        # emails that pass Stage 2 later add their verdicts for the deadline path
+        verdicts, bodies = await self._preclassify_async(user_id, emails, concurrency, deadline)
+        working_bodies: list[str | None] = list(bodies) if bodies else [None] * len(emails)
+
+        async def _process(index: int, email: dict[str, Any]) -> ExtractionResult:
+            async with limit:
+                return await self._process_one_async(
+                    user_id,
+                    email,
+                    verdicts.get(index),
+                    deadline,
+                    working_bodies[index],
+                    partial(verdicts.__setitem__, index),
+                )
+
+        async def _bounded(index: int, email: dict[str, Any]) -> tuple[int, ExtractionResult]:
+            if deadline is None:
+                return index, await _process(index, email)
             try:
-                result = self.extract_from_email(
-                    user_id=user_id,
-                    email_id=email["id"],
-                    from_address=email.get("from", ""),
-                    subject=email.get("subject", ""),
-                    body=email.get("body", ""),
-                    received_at=email.get("received_at"),
-                    body_html=email.get("body_html"),
+                return index, await asyncio.wait_for(
+                    _process(index, email), timeout=deadline.remaining()
+                )
+            except TimeoutError:
+                counter("returns.extraction.deadline_exceeded")
+                return index, self._rules_only(
+                    user_id, email, working_bodies[index], verdicts.get(index)
                 )
-                results.append(result)
 
-            except Exception as e:
-                logger.error("Failed to process email %s: %s", email.get("id"), e)
-                counter("returns.extraction.error")
-                # Create error result
-                results.append(
-                    ExtractionResult(
-                        success=False,
-                        rejection_reason=f"error:{str(e)[:100]}",
-                        stage_reached=ExtractionStage.ERROR,
+        tasks = [asyncio.ensure_future(_bounded(i, email)) for i, email in enumerate(emails)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def process_email_stream_async(
+        self,
+        user_id: str,
+        emails: AsyncIterator[dict[str, Any]],
+        max_concurrency: int | None = None,
+        deadline: Deadline | None = None,
+    ) -> list[ExtractionResult]:
+        """
+        Variant of process_email_batch_async() for emails that arrive one by one.
+
+        The next email is only pulled from ``emails`` once one of the
+        ``max_concurrency`` slots is free, and each email's dict (body
+        included) is dropped as soon as its result is in; only its id,
+        subject and cancelled order numbers are kept for the batch
+        post-passes. With an incremental request parser behind ``emails``,
+        memory is bounded by the emails in flight rather than the batch.
+
+        Stage 2 packing needs the whole batch up front, so it is skipped;
+        cross-request micro-batching still applies.
+        """
+        concurrency = max(1, max_concurrency or LLM_MAX_CONCURRENCY)
+        limit = asyncio.Semaphore(concurrency)
+        # What finalize_batch needs once the bodies are gone
+        stubs: list[dict[str, Any]] = []
+        cancelled_orders: set[str] = set()
+        tasks: list[asyncio.Future[ExtractionResult]] = []
+
+        async def _process(email: dict[str, Any]) -> ExtractionResult:
+            try:
+                if deadline is None:
+                    return await self._process_one_async(user_id, email)
+                verdicts: list[ReturnabilityResult] = []
+                try:
+                    return await asyncio.wait_for(
+                        self._process_one_async(
+                            user_id, email, deadline=deadline, on_verdict=verdicts.append
+                        ),
+                        timeout=deadline.remaining(),
                     )
-                )
+                except TimeoutError:
+                    counter("returns.extraction.deadline_exceeded")
+                    return self._rules_only(user_id, email, None, next(iter(verdicts), None))
+            finally:
+                limit.release()
+
+        with collect_timings() as timings:
+            try:
+                async for email in emails:
+                    # Backpressure: don't read further until a slot frees up
+                    await limit.acquire()
+                    stubs.append({"id": email["id"], "subject": email.get("subject", "")})
+                    cancelled_orders.update(self._cancelled_order_numbers(email))
+                    tasks.append(asyncio.ensure_future(_process(email)))
+                results = list(await asyncio.gather(*tasks))
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            finalized = self.finalize_batch(user_id, stubs, results, cancelled_orders)
+
+        self._log_stage_timings(len(stubs), timings)
+        return finalized
+
+    def finalize_batch(
+        self,
+        user_id: str,
+        emails: list[dict[str, Any]],
+        results: list[ExtractionResult],
+        cancelled_orders: set[str] | None = None,
+    ) -> list[ExtractionResult]:
+        """Batch-level post-passes: dedup, cancellation suppression, link ordering.
 
+        cancelled_orders is passed by callers that have already released the
+        email bodies (see process_email_stream_async); emails then only need
+        "id" and "subject".
+        """
         # Deduplicate successful results
-        results = self._deduplicate_results(results)
+        with _stage("dedup"):
+            results = self._deduplicate_results(results)
 
         # Cross-email cancellation suppression (free, deterministic)
-        cancelled_orders = self._detect_cancelled_orders(emails)
-        if cancelled_orders:
-            results = self._suppress_cancelled_cards(results, cancelled_orders)
+        with _stage("cancellation"):
+            if cancelled_orders is None:
+                cancelled_orders = self._detect_cancelled_orders(emails)
+            if cancelled_orders:
+                results = self._suppress_cancelled_cards(results, cancelled_orders)
 
         # Sort source_email_ids: order confirmation first, then unknown, then shipping
         subject_by_id = {e["id"]: e.get("subject", "") for e in emails}
@@ -836,6 +1849,43 @@ class ReturnableReceiptExtractor:
         return non_successful + deduped + still_ungrouped
 
 
+# Process-wide pipeline, rebuilt only when merchant_rules.yaml changes.
+# Each instance is treated as immutable: a rules change builds a new
+# extractor and swaps the reference, so in-flight requests keep theirs.
+_shared_extractor: tuple[str, ReturnableReceiptExtractor] | None = None
+_shared_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> ReturnableReceiptExtractor:
+    """
+    Get the shared ReturnableReceiptExtractor for this process.
+
+    Built once (at API startup) from the merchant rules snapshot, and rebuilt
+    atomically when the rules file's content hash changes.
+    """
+    global _shared_extractor
+    snapshot = get_merchant_rules_store().current()
+
+    shared = _shared_extractor
+    if shared is not None and shared[0] == snapshot.digest:
+        return shared[1]
+
+    with _shared_extractor_lock:
+        shared = _shared_extractor
+        if shared is None or shared[0] != snapshot.digest:
+            shared = (snapshot.digest, ReturnableReceiptExtractor(merchant_rules=snapshot.rules))
+            _shared_extractor = shared
+            counter("returns.extractor.shared_built")
+        return shared[1]
+
+
+def reset_extractor() -> None:
+    """Drop the shared extractor (useful for tests)."""
+    global _shared_extractor
+    with _shared_extractor_lock:
+        _shared_extractor = None
+
+
 # Convenience function for single email extraction
 def extract_return_card(
     user_id: str,
@@ -847,12 +1897,12 @@ def extract_return_card(
     """
     Extract return card from a single email.
 
-    Convenience wrapper that creates extractor and returns just the card.
+    Convenience wrapper around the shared extractor that returns just the card.
 
     Returns:
         ReturnCard if email is returnable purchase, None otherwise.
     """
-    extractor = ReturnableReceiptExtractor()
+    extractor = get_extractor()
     result = extractor.extract_from_email(
         user_id=user_id,
         email_id=email_id,
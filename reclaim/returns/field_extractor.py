@@ -11,25 +11,38 @@ Cost: ~$0.0002 per email (Gemini Flash)
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
+from contextlib import AbstractContextManager, nullcontext
 from datetime import datetime, timedelta
+from typing import Any
 
 from pydantic import BaseModel
 from pydantic import Field as PydanticField
 
 from reclaim.config import (
+    EXTRACTOR_BODY_TOKEN_BUDGET,
+    EXTRACTOR_BODY_WINDOWS_ENABLED,
+    LLM_MICROBATCH_ENABLED,
     PIPELINE_BODY_TRUNCATION,
     PIPELINE_DATE_WINDOW_DAYS,
     PIPELINE_DEFAULT_RETURN_DAYS,
     PIPELINE_ORDER_NUM_MAX_LEN,
     PIPELINE_ORDER_NUM_MIN_LEN,
 )
+from reclaim.llm.microbatch import MicroBatcher
+from reclaim.llm.packing import build_packed_prompt, packed_response_schema, parse_packed_response
 from reclaim.observability.logging import get_logger
-from reclaim.observability.telemetry import counter, log_event
+from reclaim.observability.telemetry import counter, log_event, time_block
+from reclaim.returns.body_windows import estimate_tokens, select_body_windows
+from reclaim.returns.domains import DomainResolver
+from reclaim.returns.merchant_parsers import get_merchant_parser
 from reclaim.returns.models import ReturnConfidence
+from reclaim.returns.structured_markup import is_complete, markup_fields
 from reclaim.returns.types import ExtractedFields
+from reclaim.storage.cache import LLM_RESULT_CACHE, llm_result_key
 from reclaim.utils.redaction import redact_pii, redact_subject
 
 logger = get_logger(__name__)
@@ -67,7 +80,7 @@ class LLMExtractionSchema(BaseModel):
 
 
 # Gemini structured output schema
-EXTRACTOR_RESPONSE_SCHEMA = {
+EXTRACTOR_RESPONSE_SCHEMA: dict[str, Any] = {
     "type": "object",
     "properties": {
         "merchant_name": {
@@ -122,13 +135,25 @@ EXTRACTOR_RESPONSE_SCHEMA = {
     },
     "required": ["merchant_name", "item_summary"],
     "propertyOrdering": [
-        "merchant_name", "item_summary", "order_number", "amount", "currency",
-        "order_date", "delivery_date", "explicit_return_by", "return_window_days",
+        "merchant_name",
+        "item_summary",
+        "order_number",
+        "amount",
+        "currency",
+        "order_date",
+        "delivery_date",
+        "explicit_return_by",
+        "return_window_days",
         "return_policy_quote",
     ],
 }
 
 
+# Bump when the response schema or its parsing changes, so cached
+# extractions from the old format are not reused.
+EXTRACTOR_SCHEMA_VERSION = "1"
+
+
 # System instruction — cached by Gemini, reduces per-call latency.
 EXTRACTOR_SYSTEM_INSTRUCTION = """You extract structured purchase details from order/shipping emails.
 
@@ -174,6 +199,20 @@ Extraction:
 ## Output format
 Extract all available fields. Use null for any field not found in the email."""
 
+# Several emails per call (cross-request micro-batching)
+PACKED_EXTRACTOR_RESPONSE_SCHEMA = packed_response_schema(EXTRACTOR_RESPONSE_SCHEMA)
+
+PACKED_EXTRACTOR_SYSTEM_INSTRUCTION = (
+    EXTRACTOR_SYSTEM_INSTRUCTION
+    + """
+
+## Multiple emails
+The message may contain several emails, each introduced by "### Email <n>".
+Extract fields for each email independently, using its own "Date this email
+was sent". Return a JSON array with exactly one object per email, with "index"
+set to that email's <n>."""
+)
+
 
 class ReturnFieldExtractor:
     """
@@ -214,15 +253,35 @@ From: {from_address}
 Body:
 {body}"""
 
-    def __init__(self, merchant_rules: dict | None = None):
+    def __init__(
+        self,
+        merchant_rules: dict | None = None,
+        microbatch: bool = LLM_MICROBATCH_ENABLED,
+        domain_resolver: DomainResolver | None = None,
+        body_token_budget: int | None = (
+            EXTRACTOR_BODY_TOKEN_BUDGET if EXTRACTOR_BODY_WINDOWS_ENABLED else None
+        ),
+    ):
         """
         Initialize extractor with merchant rules.
 
         Args:
             merchant_rules: Dict from merchant_rules.yaml with return windows
+            microbatch: Queue async LLM extractions from concurrent requests
+                        into packed calls (see reclaim.llm.microbatch)
+            domain_resolver: Shared with Stage 1 so merchant aliases resolve
+                             the same way (built from merchant_rules if None)
+            body_token_budget: Send the most order-relevant body blocks within
+                               this many tokens (see reclaim.returns.body_windows)
+                               instead of the first PIPELINE_BODY_TRUNCATION chars
         """
         self.merchant_rules = merchant_rules or {}
+        self.body_token_budget = body_token_budget
+        self.domain_resolver = domain_resolver or DomainResolver(self.merchant_rules)
         # CODE-011: Model is now obtained from shared singleton
+        self._batcher: MicroBatcher[tuple[str, str], dict] | None = (
+            MicroBatcher("extractor", self._dispatch_batch) if microbatch else None
+        )
 
     def _call_llm_with_retry(
         self,
@@ -243,6 +302,23 @@ Body:
             response_schema=response_schema,
         )
 
+    async def _call_llm_with_retry_async(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        response_schema: dict | None = None,
+        counter_prefix: str = "extractor",
+    ) -> str:
+        """Async twin of _call_llm_with_retry() (delegates to call_llm_async)."""
+        from reclaim.llm.retry import call_llm_async
+
+        return await call_llm_async(
+            prompt,
+            counter_prefix=counter_prefix,
+            system_instruction=system_instruction,
+            response_schema=response_schema,
+        )
+
     # Common garbage values the LLM or regex may extract as order numbers
     _GARBAGE_ORDER_WORDS = frozenset(
         {
@@ -278,7 +354,11 @@ Body:
 
         cleaned = order_num.strip().strip("-").strip()
 
-        if not cleaned or len(cleaned) < PIPELINE_ORDER_NUM_MIN_LEN or len(cleaned) > PIPELINE_ORDER_NUM_MAX_LEN:
+        if (
+            not cleaned
+            or len(cleaned) < PIPELINE_ORDER_NUM_MIN_LEN
+            or len(cleaned) > PIPELINE_ORDER_NUM_MAX_LEN
+        ):
             return None
 
         # Reject if it's a common word
@@ -298,6 +378,7 @@ Body:
         body: str,
         merchant_domain: str,
         received_at: datetime | None = None,
+        body_html: str | None = None,
     ) -> ExtractedFields:
         """
         Extract all fields from a purchase email.
@@ -308,6 +389,7 @@ Body:
             body: Email body text
             merchant_domain: Sender domain (for merchant rule lookup)
             received_at: When the email was received (fallback anchor date)
+            body_html: Raw HTML body, read for schema.org order markup
 
         Returns:
             ExtractedFields with all available data
@@ -319,10 +401,106 @@ Body:
         # Start with rules-based extraction
         rules_fields = self._extract_with_rules(body, subject)
 
+        # Complete schema.org order markup needs no LLM; partial markup
+        # overrides the LLM's answer for the fields it states
+        markup = self._markup_fields(body_html)
+        if is_complete(markup):
+            counter("returns.extractor.markup_complete")
+            return self._merge_fields(
+                from_address,
+                subject,
+                body,
+                merchant_domain,
+                received_at,
+                rules_fields,
+                markup,
+                method="markup",
+            )
+
+        # Known merchant layouts are parsed deterministically, skipping the LLM
+        parser_domain, parsed_fields = self._parse_merchant_layout(subject, body, merchant_domain)
+        if parsed_fields is not None:
+            return self._merge_fields(
+                from_address,
+                subject,
+                body,
+                merchant_domain,
+                received_at,
+                rules_fields,
+                {**parsed_fields, **markup},
+                method="parser",
+            )
+
         # LLM extraction for complex fields
         if _use_llm():
             try:
-                llm_fields = self._extract_with_llm(from_address, subject, body, received_at)
+                with self._time_llm(parser_domain):
+                    llm_fields = self._extract_with_llm(from_address, subject, body, received_at)
+                counter("returns.extractor.llm_success")
+            except Exception as e:
+                logger.warning("LLM extraction failed, using rules only: %s", e)
+                counter("returns.extractor.llm_error")
+                llm_fields = {}
+        else:
+            llm_fields = {}
+            counter("returns.extractor.llm_disabled")
+
+        return self._merge_fields(
+            from_address,
+            subject,
+            body,
+            merchant_domain,
+            received_at,
+            rules_fields,
+            {**llm_fields, **markup},
+            method="markup" if markup and not llm_fields else None,
+        )
+
+    async def extract_async(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        merchant_domain: str,
+        received_at: datetime | None = None,
+        body_html: str | None = None,
+    ) -> ExtractedFields:
+        """Async variant of extract(); awaits the Gemini call instead of blocking."""
+        rules_fields = self._extract_with_rules(body, subject)
+
+        markup = self._markup_fields(body_html)
+        if is_complete(markup):
+            counter("returns.extractor.markup_complete")
+            return self._merge_fields(
+                from_address,
+                subject,
+                body,
+                merchant_domain,
+                received_at,
+                rules_fields,
+                markup,
+                method="markup",
+            )
+
+        parser_domain, parsed_fields = self._parse_merchant_layout(subject, body, merchant_domain)
+        if parsed_fields is not None:
+            return self._merge_fields(
+                from_address,
+                subject,
+                body,
+                merchant_domain,
+                received_at,
+                rules_fields,
+                {**parsed_fields, **markup},
+                method="parser",
+            )
+
+        if _use_llm():
+            try:
+                with self._time_llm(parser_domain):
+                    llm_fields = await self._extract_with_llm_async(
+                        from_address, subject, body, received_at
+                    )
                 counter("returns.extractor.llm_success")
             except Exception as e:
                 logger.warning("LLM extraction failed, using rules only: %s", e)
@@ -332,6 +510,63 @@ Body:
             llm_fields = {}
             counter("returns.extractor.llm_disabled")
 
+        return self._merge_fields(
+            from_address,
+            subject,
+            body,
+            merchant_domain,
+            received_at,
+            rules_fields,
+            {**llm_fields, **markup},
+            method="markup" if markup and not llm_fields else None,
+        )
+
+    def extract_from_llm_fields(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        merchant_domain: str,
+        received_at: datetime | None,
+        llm_fields: dict,
+        body_html: str | None = None,
+    ) -> ExtractedFields:
+        """Like extract(), but with LLM fields already obtained elsewhere.
+
+        Used by the combined Stage 2+3 engine, whose single call returns the
+        extraction fields alongside the returnability verdict. Schema.org
+        markup in body_html still takes precedence over those fields.
+        """
+        rules_fields = self._extract_with_rules(body, subject)
+        markup = self._markup_fields(body_html)
+        return self._merge_fields(
+            from_address,
+            subject,
+            body,
+            merchant_domain,
+            received_at,
+            rules_fields,
+            {**llm_fields, **markup},
+            method="markup" if markup and not llm_fields else None,
+        )
+
+    def _merge_fields(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        merchant_domain: str,
+        received_at: datetime | None,
+        rules_fields: dict,
+        llm_fields: dict,
+        method: str | None = None,
+    ) -> ExtractedFields:
+        """Merge rules and LLM output into ExtractedFields and compute return_by_date.
+
+        llm_fields may also come from a merchant parser (method="parser") or
+        schema.org markup (method="markup"); otherwise the method is
+        "hybrid" with LLM fields and "rules" without.
+        """
         # Merge results (LLM takes precedence for text fields)
         merchant = llm_fields.get("merchant_name") or self._guess_merchant(from_address, subject)
         item_summary = llm_fields.get("item_summary") or self._extract_item_summary(subject, body)
@@ -379,7 +614,7 @@ Body:
             return_portal_link=rules_fields.get("return_portal_link"),
             tracking_link=rules_fields.get("tracking_link"),
             evidence_snippet=evidence,
-            extraction_method="hybrid" if llm_fields else "rules",
+            extraction_method=method or ("hybrid" if llm_fields else "rules"),
         )
 
         log_event(
@@ -392,6 +627,54 @@ Body:
 
         return result
 
+    @staticmethod
+    def _markup_fields(body_html: str | None) -> dict:
+        """Fields stated by schema.org order markup in the HTML body, if any.
+
+        Complete markup is counted (markup_complete) by the callers that skip
+        the LLM on it, so get_parser_report()'s skip share stays accurate.
+        """
+        if not body_html:
+            return {}
+
+        with time_block("returns.extractor.markup"):
+            fields = markup_fields(body_html)
+        if fields and not is_complete(fields):
+            counter("returns.extractor.markup_partial")
+        return fields
+
+    def _parse_merchant_layout(
+        self, subject: str, body: str, merchant_domain: str
+    ) -> tuple[str | None, dict | None]:
+        """
+        Fields from the merchant's registered parser (see merchant_parsers).
+
+        Returns:
+            (canonical domain if a parser is registered for it, parsed
+            fields or None when there is no parser or no confident parse)
+        """
+        domain = self.domain_resolver.canonical(merchant_domain.lower())
+        parser = get_merchant_parser(domain)
+        if parser is None:
+            return None, None
+
+        with time_block(f"returns.extractor.parser.{domain}"):
+            fields = parser.parse(subject, body)
+        if fields is None:
+            counter(f"returns.extractor.parser.{domain}.fallback")
+            return domain, None
+
+        counter("returns.extractor.parser_hit")
+        counter(f"returns.extractor.parser.{domain}.parsed")
+        return domain, fields
+
+    @staticmethod
+    def _time_llm(parser_domain: str | None) -> AbstractContextManager[None]:
+        """Per-merchant LLM latency for merchants with a parser (the saving it offers)."""
+        if parser_domain is None:
+            return nullcontext()
+        return time_block(f"returns.extractor.llm.{parser_domain}")
+
     def _extract_with_rules(self, body: str, subject: str) -> dict:
         """Extract fields using regex patterns."""
         text = f"{subject}\n{body}".lower()
@@ -428,7 +711,112 @@ Body:
         received_at: datetime | None = None,
     ) -> dict:
         """Extract fields using LLM."""
+        prompt = self._build_llm_prompt(from_address, subject, body, received_at)
+
+        cache_key = llm_result_key(prompt, EXTRACTOR_SYSTEM_INSTRUCTION, EXTRACTOR_SCHEMA_VERSION)
+        cached = self._cached_llm_fields(cache_key)
+        if cached is not None:
+            return cached
+
+        # Call LLM with retry, system instruction, and structured output
+        response_text = self._call_llm_with_retry(
+            prompt,
+            system_instruction=EXTRACTOR_SYSTEM_INSTRUCTION,
+            response_schema=EXTRACTOR_RESPONSE_SCHEMA,
+        )
+
+        return self._handle_llm_response(response_text, cache_key)
+
+    async def _extract_with_llm_async(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None = None,
+    ) -> dict:
+        """Async variant of _extract_with_llm()."""
+        prompt = self._build_llm_prompt(from_address, subject, body, received_at)
+
+        cache_key = llm_result_key(prompt, EXTRACTOR_SYSTEM_INSTRUCTION, EXTRACTOR_SCHEMA_VERSION)
+        cached = self._cached_llm_fields(cache_key)
+        if cached is not None:
+            return cached
+
+        if self._batcher is not None:
+            return await self._batcher.submit((prompt, cache_key))
+
+        return await self._extract_prompt_async(prompt, cache_key)
+
+    async def _extract_prompt_async(self, prompt: str, cache_key: str) -> dict:
+        """One single-email LLM extraction for an already-built prompt."""
+        response_text = await self._call_llm_with_retry_async(
+            prompt,
+            system_instruction=EXTRACTOR_SYSTEM_INSTRUCTION,
+            response_schema=EXTRACTOR_RESPONSE_SCHEMA,
+        )
+
+        return self._handle_llm_response(response_text, cache_key)
+
+    async def _dispatch_batch(self, items: list[tuple[str, str]]) -> list[dict | BaseException]:
+        """
+        Micro-batcher dispatch: one packed call for (prompt, cache_key) items.
+
+        A failed packed call fails every item (each caller then falls back to
+        rules, as for a failed single call). Items missing from the packed
+        answer are retried as single calls.
+        """
+        if len(items) == 1:
+            return [await self._extract_prompt_async(*items[0])]
+
+        counter("returns.extractor.packed_calls")
+        counter("returns.extractor.packed_items", len(items))
+        response_text = await self._call_llm_with_retry_async(
+            build_packed_prompt([prompt for prompt, _ in items]),
+            system_instruction=PACKED_EXTRACTOR_SYSTEM_INSTRUCTION,
+            response_schema=PACKED_EXTRACTOR_RESPONSE_SCHEMA,
+            counter_prefix="extractor_packed",
+        )
+
+        parsed = parse_packed_response(response_text, len(items), "extractor")
+        results: list[dict | BaseException] = []
+        fallback: list[int] = []
+        for i, (_, cache_key) in enumerate(items):
+            fields = (
+                self._handle_llm_response(json.dumps(parsed[i]), cache_key) if i in parsed else {}
+            )
+            if not fields:
+                counter("returns.extractor.packed_fallback")
+                fallback.append(i)
+            results.append(fields)
+
+        singles = await asyncio.gather(
+            *(self._extract_prompt_async(*items[i]) for i in fallback), return_exceptions=True
+        )
+        for i, result in zip(fallback, singles, strict=True):
+            results[i] = result
+
+        return results
+
+    def _build_llm_prompt(
+        self,
+        from_address: str,
+        subject: str,
+        body: str,
+        received_at: datetime | None = None,
+    ) -> str:
+        """Build the redacted, sanitized extraction prompt for one email."""
         body_truncated = body[:PIPELINE_BODY_TRUNCATION] if body else ""
+        if body and self.body_token_budget is not None:
+            # Savings are measured against the head truncation it replaces
+            body_windowed = select_body_windows(body, self.body_token_budget)
+            sent = estimate_tokens(body_windowed)
+            counter("returns.extractor.prompt_body_tokens", sent)
+            counter(
+                "returns.extractor.prompt_body_tokens_saved",
+                max(0, estimate_tokens(body_truncated) - sent),
+            )
+            body_truncated = body_windowed
+        body_limit = max(PIPELINE_BODY_TRUNCATION, len(body_truncated))
 
         # LOG: What we're sending to LLM (for validation)
         # SEC-016: Redact PII from logging
@@ -441,27 +829,34 @@ Body:
         # NOTE: Body content not logged to prevent PII exposure
 
         # Privacy: Redact PII from body before sending to Gemini
-        body_redacted = redact_pii(body_truncated, max_length=PIPELINE_BODY_TRUNCATION)
+        body_redacted = redact_pii(body_truncated, max_length=body_limit)
 
         # Use the email's received date as "today" so the LLM correctly interprets
         # relative dates like "Delivered today" or "Arriving tomorrow"
         context_date = received_at or datetime.now()
-        prompt = self.EXTRACTION_PROMPT.format(
+        return self.EXTRACTION_PROMPT.format(
             today=context_date.strftime("%Y-%m-%d"),
             subject=self._sanitize(subject, 200),
             from_address=self._sanitize(from_address, 100),
-            body=self._sanitize(body_redacted, PIPELINE_BODY_TRUNCATION),
+            body=self._sanitize(body_redacted, body_limit),
         )
 
-        # Call LLM with retry, system instruction, and structured output
-        response_text = self._call_llm_with_retry(
-            prompt,
-            system_instruction=EXTRACTOR_SYSTEM_INSTRUCTION,
-            response_schema=EXTRACTOR_RESPONSE_SCHEMA,
-        )
+    def _cached_llm_fields(self, cache_key: str) -> dict | None:
+        """Return cached LLM fields for this exact prompt, if any (as a copy)."""
+        cached = LLM_RESULT_CACHE.get(cache_key)
+        if isinstance(cached, dict):
+            counter("returns.extractor.cache_hit")
+            return dict(cached)
+
+        counter("returns.extractor.cache_miss")
+        return None
 
-        # Parse JSON response
+    def _handle_llm_response(self, response_text: str, cache_key: str) -> dict:
+        """Parse the extractor response, cache it and log what came back."""
         result = self._parse_llm_response(response_text)
+        if result:
+            # Empty means the response failed to parse — retry on the next scan
+            LLM_RESULT_CACHE.put(cache_key, dict(result))
 
         # LOG: What LLM returned (for validation)
         logger.info(
@@ -563,7 +958,9 @@ Body:
 
         # P3: Use merchant rules as fallback
         merchants = self.merchant_rules.get("merchants", {})
-        rule = merchants.get(merchant_domain) or merchants.get("_default")
+        rule = merchants.get(self.domain_resolver.canonical(merchant_domain)) or merchants.get(
+            "_default"
+        )
 
         if rule:
             days = rule.get("days", PIPELINE_DEFAULT_RETURN_DAYS)
@@ -335,3 +335,31 @@ SHIPPING_SERVICE_DOMAINS: set[str] = {
     "loop.com",
     "happyreturns.com",
 }
+
+# ---------------------------------------------------------------------------
+# Multi-label public suffixes — the registrable domain is one label more
+# e.g., amazon.co.uk stays amazon.co.uk, not co.uk
+# "*" matches any one label ("co.*" covers co.uk, co.jp, co.nz, ...)
+# ---------------------------------------------------------------------------
+
+MULTI_PART_PUBLIC_SUFFIXES: set[str] = {
+    # Generic second-level labels under country codes
+    "co.*",
+    "com.*",
+    "org.*",
+    "net.*",
+    # Country-specific second levels not covered above
+    "ac.uk",
+    "gov.uk",
+    "ltd.uk",
+    "me.uk",
+    "plc.uk",
+    "ne.jp",
+    "or.jp",
+    "gov.au",
+    "edu.au",
+    "ac.nz",
+    "gen.nz",
+    "ac.in",
+    "gob.mx",
+}
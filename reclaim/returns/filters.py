@@ -10,25 +10,42 @@ Expected pass-through rate: 30-40% of emails
 
 from __future__ import annotations
 
-import re
+from collections.abc import Sequence
 from pathlib import Path
 
-import yaml
-
 from reclaim.observability.logging import get_logger
+from reclaim.returns.domains import DomainResolver
 from reclaim.returns.filter_data import (
     DEFAULT_BLOCKLIST,
     DELIVERY_KEYWORDS,
     GROCERY_PERISHABLE_PATTERNS,
     NON_PURCHASE_KEYWORDS,
     PURCHASE_CONFIRMATION_KEYWORDS,
-    SHIPPING_SERVICE_DOMAINS,
     SURVEY_SUBJECT_KEYWORDS,
 )
-from reclaim.returns.types import FilterResult
+from reclaim.returns.merchant_rules import DEFAULT_MERCHANT_RULES_PATH, load_merchant_rules
+from reclaim.returns.types import BatchFilterResult, FilterResult
+from reclaim.utils.keywords import KeywordMatcher
 
 logger = get_logger(__name__)
 
+# Every keyword table, matched in one pass over subject + snippet
+_KEYWORDS = KeywordMatcher(
+    GROCERY_PERISHABLE_PATTERNS
+    | set(SURVEY_SUBJECT_KEYWORDS)
+    | PURCHASE_CONFIRMATION_KEYWORDS
+    | DELIVERY_KEYWORDS
+    | NON_PURCHASE_KEYWORDS
+)
+# When several grocery or survey keywords hit, the one reported is the first
+# in table iteration order, as when each was checked in turn
+_GROCERY_RANK = {pattern: i for i, pattern in enumerate(GROCERY_PERISHABLE_PATTERNS)}
+_SURVEY_RANK = {keyword: i for i, keyword in enumerate(SURVEY_SUBJECT_KEYWORDS)}
+
+# filter_batch() scans this many emails' text at a time, bounding the copies
+# it holds while still sharing repeated template lines across the chunk
+_BATCH_SCAN_CHUNK = 10_000
+
 
 class MerchantDomainFilter:
     """
@@ -42,24 +59,33 @@ class MerchantDomainFilter:
     Keyword/domain constants live in filter_data.py.
     """
 
-    def __init__(self, merchant_rules_path: Path | None = None):
+    def __init__(
+        self,
+        merchant_rules_path: Path | None = None,
+        merchant_rules: dict | None = None,
+        domain_resolver: DomainResolver | None = None,
+    ):
         """
         Initialize filter with merchant rules.
 
         Args:
             merchant_rules_path: Path to merchant_rules.yaml.
                                  If None, uses default location.
+            merchant_rules: Already-parsed rules (skips reading the file).
+            domain_resolver: Sender domain resolver, shared with Stage 3's
+                             merchant-rule lookup (built from the rules if None).
         """
         if merchant_rules_path is None:
-            merchant_rules_path = (
-                Path(__file__).parent.parent.parent / "config" / "merchant_rules.yaml"
-            )
+            merchant_rules_path = DEFAULT_MERCHANT_RULES_PATH
 
         # CODE-009: Copy to instance to prevent cross-worker state issues
         self.blocklist: set[str] = set(DEFAULT_BLOCKLIST)
 
-        self.merchant_rules = self._load_merchant_rules(merchant_rules_path)
+        if merchant_rules is None:
+            merchant_rules = self._load_merchant_rules(merchant_rules_path)
+        self.merchant_rules = merchant_rules
         self.allowlist = self._build_allowlist()
+        self.domain_resolver = domain_resolver or DomainResolver(self.merchant_rules)
 
         logger.info(
             "MerchantDomainFilter initialized: %d allowlist, %d blocklist",
@@ -69,12 +95,7 @@ class MerchantDomainFilter:
 
     def _load_merchant_rules(self, path: Path) -> dict:
         """Load merchant rules from YAML config."""
-        if not path.exists():
-            logger.warning("Merchant rules not found at %s, using empty rules", path)
-            return {"merchants": {}}
-
-        with open(path) as f:
-            return yaml.safe_load(f)
+        return load_merchant_rules(path)
 
     def _build_allowlist(self) -> set[str]:
         """Build allowlist from merchant_rules.yaml."""
@@ -96,28 +117,82 @@ class MerchantDomainFilter:
             False if definitely not returnable.
         """
         domain = self._extract_domain(from_address)
-        text_lower = f"{subject} {snippet}".lower()
+        found = _KEYWORDS.scan(f"{subject} {snippet}".lower())
+        return self._decide(domain, subject, snippet, found)
+
+    def filter_batch(
+        self,
+        from_addresses: Sequence[str],
+        subjects: Sequence[str],
+        snippets: Sequence[str],
+    ) -> BatchFilterResult:
+        """
+        filter() over columns of emails, for backfills and batch pre-passes.
 
+        Each distinct sender is resolved once, and keyword hits are scored by
+        walking each email's hits rather than the keyword tables. Results are
+        identical to calling filter() per email.
+
+        Args:
+            from_addresses: Email senders
+            subjects: Subject lines, aligned with from_addresses
+            snippets: Body snippets, aligned with from_addresses
+
+        Returns:
+            BatchFilterResult with one entry per email, in input order
+        """
+        if not len(from_addresses) == len(subjects) == len(snippets):
+            raise ValueError("filter_batch columns must have the same length")
+
+        domains = self.domain_resolver.resolve_many(from_addresses)
+        result = BatchFilterResult(domain=domains)
+        for chunk in range(0, len(domains), _BATCH_SCAN_CHUNK):
+            rows = slice(chunk, chunk + _BATCH_SCAN_CHUNK)
+            scans = _KEYWORDS.scan_many(
+                f"{subject} {snippet}".lower()
+                for subject, snippet in zip(subjects[rows], snippets[rows], strict=True)
+            )
+            for domain, subject, snippet, found in zip(
+                domains[rows], subjects[rows], snippets[rows], scans, strict=True
+            ):
+                decision = self._decide(domain, subject, snippet, found)
+                result.is_candidate.append(decision.is_candidate)
+                result.reason.append(decision.reason)
+                result.match_type.append(decision.match_type)
+        return result
+
+    def _decide(
+        self, domain: str, subject: str, snippet: str, found: dict[str, int]
+    ) -> FilterResult:
+        """Apply the Stage 1 rules to a resolved domain and its keyword scan."""
         # Check grocery/perishable patterns first (never returnable, even from allowlisted domains)
-        for pattern in GROCERY_PERISHABLE_PATTERNS:
-            if pattern in text_lower:
-                return FilterResult(
-                    is_candidate=False,
-                    reason=f"grocery_food:{pattern}",
-                    domain=domain,
-                    match_type="blocklist",
-                )
+        pattern = min(
+            (kw for kw in found if kw in _GROCERY_RANK), key=_GROCERY_RANK.__getitem__, default=None
+        )
+        if pattern is not None:
+            return FilterResult(
+                is_candidate=False,
+                reason=f"grocery_food:{pattern}",
+                domain=domain,
+                match_type="blocklist",
+            )
 
         # Check survey/feedback subject keywords (free rejection)
-        subject_lower = subject.lower()
-        for keyword in SURVEY_SUBJECT_KEYWORDS:
-            if keyword in subject_lower:
-                return FilterResult(
-                    is_candidate=False,
-                    reason=f"survey_feedback:{keyword}",
-                    domain=domain,
-                    match_type="blocklist",
-                )
+        # The scanned text starts with the subject, so a keyword is in the
+        # subject when its first occurrence ends within it
+        subject_len = len(subject.lower())
+        keyword = min(
+            (kw for kw in found if kw in _SURVEY_RANK and found[kw] + len(kw) <= subject_len),
+            key=_SURVEY_RANK.__getitem__,
+            default=None,
+        )
+        if keyword is not None:
+            return FilterResult(
+                is_candidate=False,
+                reason=f"survey_feedback:{keyword}",
+                domain=domain,
+                match_type="blocklist",
+            )
 
         # Check blocklist first (fast reject)
         if domain in self.blocklist:
@@ -138,67 +213,40 @@ class MerchantDomainFilter:
             )
 
         # Unknown domain - use keyword heuristics
-        return self._check_heuristics(domain, subject, snippet)
+        return self._check_heuristics(domain, subject, snippet, found)
 
     def _extract_domain(self, from_address: str) -> str:
         """
-        Extract domain from email address.
+        Extract merchant domain from email address.
 
         Handles formats:
         - "noreply@amazon.com" → "amazon.com"
         - "Amazon <noreply@amazon.com>" → "amazon.com"
         - "ship-confirm@amazon.com" → "amazon.com"
         - "bananarepublic@bananarepublic.narvar.com" → "bananarepublic.com" (shipping service)
+
+        Memoized per From header; see reclaim.returns.domains.
         """
-        # Extract email from "Name <email>" format
-        match = re.search(r"<([^>]+)>", from_address)
-        if match:
-            from_address = match.group(1)
-
-        # Extract domain part
-        if "@" in from_address:
-            domain = from_address.split("@")[-1].lower().strip()
-        else:
-            domain = from_address.lower().strip()
-
-        # Handle subdomains
-        parts = domain.split(".")
-
-        # Check for shipping service domains (narvar, returnly, etc.)
-        # e.g., "bananarepublic.narvar.com" -> "bananarepublic.com"
-        if len(parts) >= 3:
-            base_domain = ".".join(parts[-2:])
-            if base_domain in SHIPPING_SERVICE_DOMAINS:
-                # Use subdomain as merchant (e.g., bananarepublic.narvar.com -> bananarepublic.com)
-                merchant_subdomain = parts[0]
-                if merchant_subdomain and len(merchant_subdomain) > 2:
-                    return f"{merchant_subdomain}.com"
-
-        # Standard subdomain handling - keep only last two parts
-        # e.g., "ship.amazon.com" → "amazon.com"
-        if len(parts) > 2:
-            # Keep last two parts unless it's a known TLD pattern
-            # e.g., "co.uk", "com.au"
-            if parts[-2] in ("co", "com", "org", "net"):
-                domain = ".".join(parts[-3:])
-            else:
-                domain = ".".join(parts[-2:])
-
-        return domain
-
-    def _check_heuristics(self, domain: str, subject: str, snippet: str) -> FilterResult:
+        return self.domain_resolver.resolve(from_address)
+
+    def _check_heuristics(
+        self, domain: str, subject: str, snippet: str, found: dict[str, int] | None = None
+    ) -> FilterResult:
         """
         Use keyword heuristics for unknown domains.
 
         Philosophy: Be PERMISSIVE. Delivery signals are GOOD (means there's a purchase).
         Let the LLM decide what's returnable vs perishable.
+
+        found is the keyword scan of subject + snippet, if filter() already ran it.
         """
-        text = f"{subject} {snippet}".lower()
+        if found is None:
+            found = _KEYWORDS.scan(f"{subject} {snippet}".lower())
 
-        # Count keyword matches
-        purchase_score = sum(1 for kw in PURCHASE_CONFIRMATION_KEYWORDS if kw in text)
-        delivery_score = sum(1 for kw in DELIVERY_KEYWORDS if kw in text)
-        non_purchase_score = sum(1 for kw in NON_PURCHASE_KEYWORDS if kw in text)
+        # Count keyword matches (distinct keywords, not occurrences)
+        purchase_score = sum(1 for kw in found if kw in PURCHASE_CONFIRMATION_KEYWORDS)
+        delivery_score = sum(1 for kw in found if kw in DELIVERY_KEYWORDS)
+        non_purchase_score = sum(1 for kw in found if kw in NON_PURCHASE_KEYWORDS)
 
         # NEW LOGIC: Be permissive - delivery/shipping signals are GOOD
         # Let the LLM decide what's returnable
@@ -253,6 +301,7 @@ class MerchantDomainFilter:
             Returns None if no rules loaded.
         """
         merchants = self.merchant_rules.get("merchants", {})
+        domain = self.domain_resolver.canonical(domain)
 
         if domain in merchants:
             return merchants[domain]
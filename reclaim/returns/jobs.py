@@ -0,0 +1,269 @@
+"""
+Module: jobs
+Purpose: Background extraction jobs for batches too large for one HTTP request.
+Dependencies: reclaim.returns.extractor
+
+A job is submitted with a batch of emails and runs on a bounded pool of
+worker coroutines in this process. Clients poll (or stream) progress by job
+id, so the batch duration is no longer tied to a single request that a
+client or proxy may time out — and LLM spend is not thrown away when one does.
+
+The queue has a fixed depth; submit() raises JobQueueFullError rather than
+buffering unbounded email bodies in memory. Each user may also have at most
+EXTRACT_JOB_USER_MAX jobs queued or running (JobUserLimitError), so one user
+can't fill the queue and lock everyone else out. Finished jobs are kept for
+EXTRACT_JOB_TTL_S and then dropped. Jobs do not survive a process restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import StrEnum
+from functools import lru_cache
+from typing import Any
+
+from reclaim.config import (
+    EXTRACT_JOB_QUEUE_MAX,
+    EXTRACT_JOB_TTL_S,
+    EXTRACT_JOB_USER_MAX,
+    EXTRACT_JOB_WORKERS,
+)
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter, log_event
+from reclaim.returns.types import ExtractionResult
+
+logger = get_logger(__name__)
+
+
+class JobStatus(StrEnum):
+    """Lifecycle of an extraction job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue is at its depth limit."""
+
+
+class JobUserLimitError(Exception):
+    """Raised when a user already has their maximum of queued or running jobs."""
+
+
+@dataclass
+class ExtractionJob:
+    """One submitted batch and its progress."""
+
+    id: str
+    user_id: str
+    emails: list[dict[str, Any]]
+    email_ids: list[str]
+    total: int
+    status: JobStatus = JobStatus.QUEUED
+    # (batch index, result) in completion order, appended as emails finish
+    progress: list[tuple[int, ExtractionResult]] = field(default_factory=list)
+    # Final results after dedup / cancellation suppression
+    results: list[ExtractionResult] | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def completed(self) -> int:
+        return len(self.progress)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def _notify(self) -> None:
+        """Wake watchers and re-arm for the next change."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def next_change(self) -> asyncio.Event:
+        """Event set by the next change to progress or status.
+
+        Take it before reading progress, then pass it to wait_for_change():
+        a change made in between has already set it, so it isn't missed.
+        """
+        return self._changed
+
+    async def wait_for_change(self, changed: asyncio.Event | None = None) -> None:
+        """Block until progress is made or the job finishes.
+
+        changed is an event from next_change(); defaults to the current one.
+        """
+        if not self.done:
+            await (changed or self._changed).wait()
+
+
+class ExtractionJobManager:
+    """
+    Bounded in-process job queue drained by a fixed number of worker tasks.
+
+    Workers are started lazily on the first submit() so they bind to the
+    serving event loop. Each job runs the async pipeline with its usual
+    per-batch LLM concurrency; the worker count bounds how many batches run
+    at once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = EXTRACT_JOB_WORKERS,
+        max_queue_depth: int = EXTRACT_JOB_QUEUE_MAX,
+        ttl_s: float = EXTRACT_JOB_TTL_S,
+        max_jobs_per_user: int = EXTRACT_JOB_USER_MAX,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.max_jobs_per_user = max(1, max_jobs_per_user)
+        self.ttl_s = ttl_s
+        self._jobs: dict[str, ExtractionJob] = {}
+        self._queue: asyncio.Queue[ExtractionJob] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    def submit(self, user_id: str, emails: list[dict[str, Any]]) -> ExtractionJob:
+        """Queue a batch for background extraction.
+
+        Raises:
+            JobUserLimitError: If the user already has max_jobs_per_user jobs
+                queued or running.
+            JobQueueFullError: If max_queue_depth jobs are already waiting.
+        """
+        self._prune()
+        if self.active_jobs(user_id) >= self.max_jobs_per_user:
+            counter("returns.jobs.rejected_user_limit")
+            raise JobUserLimitError(
+                f"User already has {self.max_jobs_per_user} extraction jobs queued or running"
+            )
+
+        self._ensure_workers()
+        assert self._queue is not None
+
+        job = ExtractionJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            emails=emails,
+            email_ids=[email.get("id", "") for email in emails],
+            total=len(emails),
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            counter("returns.jobs.rejected_queue_full")
+            raise JobQueueFullError(
+                f"Extraction job queue is full ({self.max_queue_depth} waiting)"
+            ) from None
+
+        self._jobs[job.id] = job
+        counter("returns.jobs.submitted")
+        log_event(
+            "returns.jobs.submitted",
+            job_id=job.id,
+            emails=job.total,
+            queue_depth=self._queue.qsize(),
+        )
+        return job
+
+    def get(self, job_id: str, user_id: str) -> ExtractionJob | None:
+        """Look up a job; other users' jobs are indistinguishable from missing ones."""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def active_jobs(self, user_id: str) -> int:
+        """Number of the user's jobs that are queued or running."""
+        return sum(1 for job in self._jobs.values() if job.user_id == user_id and not job.done)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def shutdown(self) -> None:
+        """Cancel the workers (queued and running jobs are abandoned)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"reclaim-job-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: ExtractionJob) -> None:
+        """Run one job through the shared pipeline, recording progress."""
+        from reclaim.returns.extractor import get_extractor
+
+        job.status = JobStatus.RUNNING
+        job._notify()
+        started = time.monotonic()
+
+        try:
+            extractor = get_extractor()
+            async for index, result in extractor.iter_email_batch_async(job.user_id, job.emails):
+                job.progress.append((index, result))
+                job._notify()
+
+            ordered = [result for _, result in sorted(job.progress, key=lambda p: p[0])]
+            job.results = extractor.finalize_batch(job.user_id, job.emails, ordered)
+            job.status = JobStatus.COMPLETED
+            counter("returns.jobs.completed")
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = "Failed to extract email batch"
+            counter("returns.jobs.failed")
+            logger.error("Extraction job %s failed: %s", job.id, e, exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            # Bodies can be up to 500 KB each; don't hold them for the TTL
+            job.emails = []
+            job._notify()
+            log_event(
+                "returns.jobs.finished",
+                job_id=job.id,
+                status=job.status.value,
+                emails=job.total,
+                duration_ms=round((time.monotonic() - started) * 1000),
+            )
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl_s
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+@lru_cache(maxsize=1)
+def get_job_manager() -> ExtractionJobManager:
+    """Get the process-wide extraction job manager."""
+    return ExtractionJobManager()
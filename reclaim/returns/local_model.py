@@ -0,0 +1,219 @@
+"""
+Local returnability model between Stage 1 and the Stage 2 LLM classifier.
+
+A logistic regression over hashed n-grams of the sender, subject and snippet
+(the same inputs the classifier sees). Most emails that pass Stage 1 are
+either obvious product orders or obvious non-purchases; when the model is
+confident either way its verdict is used directly and the Gemini call is
+skipped. Only the uncertain band between the reject and accept thresholds
+goes to the LLM.
+
+Features are hashed with crc32 into a fixed number of buckets, so the model
+file holds only the non-zero weights and needs no vocabulary. Weights are
+trained offline (tests/eval/train_local_model.py) from the eval fixtures and
+logged classifier verdicts, and written to config/returnability_model.json.
+Pure Python: scoring an email is one dict lookup per feature.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+import zlib
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+from reclaim.config import (
+    LOCAL_MODEL_ACCEPT_P,
+    LOCAL_MODEL_ENABLED,
+    LOCAL_MODEL_PATH,
+    LOCAL_MODEL_REJECT_P,
+)
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter
+from reclaim.returns.returnability_classifier import ReceiptType, ReturnabilityResult
+
+logger = get_logger(__name__)
+
+DEFAULT_LOCAL_MODEL_PATH = (
+    Path(__file__).parent.parent.parent / "config" / "returnability_model.json"
+)
+
+# Bump when feature extraction changes; models trained on other versions are ignored
+FEATURE_VERSION = 1
+DEFAULT_BUCKETS = 1 << 18
+
+# Reason prefix on verdicts the local model made (no LLM call behind them)
+LOCAL_MODEL_REASON = "local_model"
+
+_TOKEN_RE = re.compile(r"[a-z0-9$%]+")
+_DIGITS_RE = re.compile(r"\d+")
+_LOCAL_PART_RE = re.compile(r"([^<\s@]+)@")
+
+
+def _tokens(text: str) -> list[str]:
+    # Order numbers, prices and dates differ per email; only their shape matters
+    return _DIGITS_RE.sub("0", " ".join(_TOKEN_RE.findall(text.lower()))).split()
+
+
+def feature_names(domain: str, from_address: str, subject: str, snippet: str) -> set[str]:
+    """
+    Namespaced unigram and bigram features for one email.
+
+    Args:
+        domain: Merchant domain from Stage 1 (FilterResult.domain)
+        from_address: Raw From header (its local part is a feature)
+        subject: Email subject
+        snippet: Body preview as sent to the classifier
+    """
+    features = {f"d:{domain}"}
+    match = _LOCAL_PART_RE.search(from_address)
+    if match:
+        features.add(f"l:{_DIGITS_RE.sub('0', match.group(1).lower())}")
+
+    for namespace, text in (("s", subject), ("b", snippet)):
+        tokens = _tokens(text)
+        features.update(f"{namespace}:{token}" for token in tokens)
+        features.update(f"{namespace}2:{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False))
+    return features
+
+
+def hash_features(names: Iterable[str], buckets: int) -> list[int]:
+    """Bucket index per feature name (crc32, stable across processes)."""
+    return sorted({zlib.crc32(name.encode()) % buckets for name in names})
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+class LocalReturnabilityModel:
+    """Hashed n-gram logistic regression: P(email is a returnable purchase)."""
+
+    def __init__(
+        self, weights: dict[int, float], bias: float = 0.0, buckets: int = DEFAULT_BUCKETS
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.buckets = buckets
+
+    def features(self, domain: str, from_address: str, subject: str, snippet: str) -> list[int]:
+        return hash_features(feature_names(domain, from_address, subject, snippet), self.buckets)
+
+    def _score(self, indices: list[int]) -> float:
+        weights = self.weights
+        return _sigmoid(self.bias + sum(weights.get(i, 0.0) for i in indices))
+
+    def predict_proba(self, domain: str, from_address: str, subject: str, snippet: str) -> float:
+        """Probability the email is a returnable purchase."""
+        return self._score(self.features(domain, from_address, subject, snippet))
+
+    def verdict(
+        self,
+        domain: str,
+        from_address: str,
+        subject: str,
+        snippet: str,
+        accept_p: float = LOCAL_MODEL_ACCEPT_P,
+        reject_p: float = LOCAL_MODEL_REJECT_P,
+    ) -> ReturnabilityResult | None:
+        """
+        Local Stage 2 verdict, or None when the email should go to the LLM.
+
+        Returns:
+            returnable at P >= accept_p, not returnable at P <= reject_p,
+            None in between
+        """
+        p = self.predict_proba(domain, from_address, subject, snippet)
+        if p >= accept_p:
+            counter("returns.local_model.accepted")
+            return ReturnabilityResult.returnable(f"{LOCAL_MODEL_REASON}:p={p:.3f}", confidence=p)
+        if p <= reject_p:
+            counter("returns.local_model.rejected")
+            return ReturnabilityResult(
+                is_returnable=False,
+                confidence=1.0 - p,
+                reason=f"{LOCAL_MODEL_REASON}:p={p:.3f}",
+                receipt_type=ReceiptType.UNKNOWN,
+            )
+        counter("returns.local_model.uncertain")
+        return None
+
+    @classmethod
+    def train(
+        cls,
+        examples: list[tuple[list[int], bool]],
+        buckets: int = DEFAULT_BUCKETS,
+        epochs: int = 30,
+        learning_rate: float = 0.2,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> LocalReturnabilityModel:
+        """
+        Fit by SGD on log loss with L2 regularization.
+
+        Args:
+            examples: (hashed feature indices, is_returnable) per email
+            buckets: Hash space the indices were computed for
+        """
+        weights: dict[int, float] = {}
+        bias = 0.0
+        order = list(range(len(examples)))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for i in order:
+                indices, label = examples[i]
+                p = _sigmoid(bias + sum(weights.get(j, 0.0) for j in indices))
+                gradient = p - (1.0 if label else 0.0)
+                bias -= rate * gradient
+                for j in indices:
+                    w = weights.get(j, 0.0)
+                    weights[j] = w - rate * (gradient + l2 * w)
+        return cls({j: w for j, w in weights.items() if abs(w) > 1e-6}, bias, buckets)
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "feature_version": FEATURE_VERSION,
+            "buckets": self.buckets,
+            "bias": round(self.bias, 6),
+            "weights": {str(j): round(w, 6) for j, w in sorted(self.weights.items())},
+        }
+        path.write_text(json.dumps(payload, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> LocalReturnabilityModel:
+        payload = json.loads(path.read_text())
+        if payload.get("feature_version") != FEATURE_VERSION:
+            raise ValueError(
+                f"Model feature version {payload.get('feature_version')} != {FEATURE_VERSION}"
+            )
+        return cls(
+            {int(j): float(w) for j, w in payload["weights"].items()},
+            float(payload["bias"]),
+            int(payload["buckets"]),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_local_model() -> LocalReturnabilityModel | None:
+    """The configured local model, or None when disabled or unavailable."""
+    if not LOCAL_MODEL_ENABLED:
+        return None
+
+    path = Path(LOCAL_MODEL_PATH) if LOCAL_MODEL_PATH else DEFAULT_LOCAL_MODEL_PATH
+    try:
+        model = LocalReturnabilityModel.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Local returnability model not loaded from %s: %s", path, e)
+        return None
+
+    logger.info("Local returnability model loaded: %d weights from %s", len(model.weights), path)
+    return model
@@ -0,0 +1,268 @@
+"""
+Deterministic Stage 3 parsers for high-volume merchants.
+
+Order, shipping and delivery emails from the largest merchants in
+merchant_rules.yaml come from a few fixed layouts. For those merchants
+ReturnFieldExtractor asks the parser registered for the sender domain
+before calling Gemini: a parse that finds the order number, the items and
+an order or delivery date is used as the extraction result, and anything
+less falls back to the LLM.
+
+Each parser is a hand-maintained set of patterns for its merchant's
+layouts, returning the same fields the LLM extraction does, so the result
+goes through the same merge and return-by computation. Patterns run on the
+working body (plain text, or HTML converted to text).
+
+get_parser_report() summarizes, per merchant, how many extractions skipped
+the LLM and the latency that saved.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+from reclaim.observability.telemetry import get_counter, get_latency_stats
+
+# Dates as merchants print them: "January 20, 2026", "Jan 20, 2026", "01/15/2026"
+DATE = r"([A-Z][a-z]{2,8}\.? \d{1,2}, \d{4}|\d{1,2}/\d{1,2}/\d{4})"
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%b. %d, %Y", "%m/%d/%Y")
+
+PRICE_LINE = r"\$[\d,]+\.\d{2}"
+
+_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Item name on the line before its price, skipping "Qty: 1" / "Sold by: ..." lines
+_ITEM_BEFORE_PRICE = re.compile(
+    rf"^(?!.*\b(?:total|subtotal|tax|shipping|refund)\b)([^\n:$]*[A-Za-z][^\n:$]*)\n"
+    rf"(?:(?:Qty|Sold by|Fulfilled by)\b[^\n]*\n)*{PRICE_LINE}[ \t]*$",
+    re.MULTILINE,
+)
+# "1x Stand Mixer", "2 x Samsung TV"
+_ITEM_QUANTITY_PREFIX = re.compile(r"^\d+ ?x (.+)$", re.MULTILINE)
+_QUANTITY_PREFIX = re.compile(r"^\d+ ?x ")
+
+_TOTAL = re.compile(rf"^(?:order )?total:\s*({PRICE_LINE})", _FLAGS)
+_EXPLICIT_RETURN_BY = re.compile(rf"^.*\breturn\b.*\bby {DATE}.*$", _FLAGS)
+_RETURN_WINDOW = re.compile(r"^.*\breturn.*\bwithin (\d{1,3}) days.*$", _FLAGS)
+
+
+def parse_date(text: str) -> str | None:
+    """A merchant-printed date as YYYY-MM-DD, or None."""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _first(patterns: tuple[re.Pattern[str], ...], text: str) -> str | None:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _compile(*patterns: str) -> tuple[re.Pattern[str], ...]:
+    return tuple(re.compile(p, _FLAGS) for p in patterns)
+
+
+@dataclass(frozen=True)
+class MerchantParser:
+    """
+    Field patterns for one merchant's order, shipping and delivery layouts.
+
+    Each field's patterns are tried in order and the first match wins
+    (group 1). Items are collected from every match of every item pattern.
+    """
+
+    merchant_name: str
+    domain: str
+    order_number: tuple[re.Pattern[str], ...]
+    order_date: tuple[re.Pattern[str], ...] = ()
+    delivery_date: tuple[re.Pattern[str], ...] = ()
+    items: tuple[re.Pattern[str], ...] = (_ITEM_BEFORE_PRICE, _ITEM_QUANTITY_PREFIX)
+
+    def parse(self, subject: str, body: str) -> dict | None:
+        """
+        Extraction fields (LLMExtractionSchema shape), or None if not confident.
+
+        Confident means the order number, at least one item and an order or
+        delivery date were all found.
+        """
+        text = f"{subject}\n{body}"
+        order_number = _first(self.order_number, text)
+
+        items: list[str] = []
+        for pattern in self.items:
+            for match in pattern.finditer(body):
+                item = _QUANTITY_PREFIX.sub("", match.group(1).strip())
+                if item and item not in items:
+                    items.append(item)
+
+        order_date = _first(self.order_date, body)
+        delivery_date = _first(self.delivery_date, body)
+        order_date = parse_date(order_date) if order_date else None
+        delivery_date = parse_date(delivery_date) if delivery_date else None
+
+        if not order_number or not items or not (order_date or delivery_date):
+            return None
+
+        total = _TOTAL.search(body)
+        explicit = _EXPLICIT_RETURN_BY.search(body)
+        window = _RETURN_WINDOW.search(body)
+        quote = explicit or window
+
+        item_summary = items[0]
+        if len(items) > 1:
+            more = len(items) - 1
+            item_summary += f" and {more} more item{'s' if more > 1 else ''}"
+
+        return {
+            "merchant_name": self.merchant_name,
+            "item_summary": item_summary,
+            "order_number": order_number,
+            "amount": float(total.group(1)[1:].replace(",", "")) if total else None,
+            "currency": "USD",
+            "order_date": order_date,
+            "delivery_date": delivery_date,
+            "explicit_return_by": parse_date(explicit.group(1)) if explicit else None,
+            "return_window_days": int(window.group(1)) if window else None,
+            "return_policy_quote": quote.group(0).strip() if quote else None,
+        }
+
+
+MERCHANT_PARSERS: dict[str, MerchantParser] = {
+    parser.domain: parser
+    for parser in (
+        MerchantParser(
+            merchant_name="Amazon",
+            domain="amazon.com",
+            order_number=_compile(r"order\s*#\s*(\d{3}-\d{7}-\d{7})"),
+            order_date=_compile(rf"^order date: {DATE}"),
+            delivery_date=_compile(
+                rf"^(?:arriving|delivered|estimated delivery:) {DATE}",
+            ),
+            items=(
+                _ITEM_BEFORE_PRICE,
+                # Shipped / delivered layouts list items without prices
+                *_compile(
+                    r"^(?!arriving|delivered|your |order |track )([^\n:]{3,})\n\n"
+                    r"(?:shipped with|order #)"
+                ),
+            ),
+        ),
+        MerchantParser(
+            merchant_name="Target",
+            domain="target.com",
+            order_number=_compile(r"order number: (\d{6,})", r"order #(\d{6,})"),
+            order_date=_compile(rf"^placed on {DATE}"),
+            delivery_date=_compile(
+                rf"^estimated (?:arrival|delivery): {DATE}", rf"^delivered (?:on )?{DATE}"
+            ),
+            items=(
+                _ITEM_BEFORE_PRICE,
+                _ITEM_QUANTITY_PREFIX,
+                *_compile(r"^your items\n([^\n:]{3,})$"),
+            ),
+        ),
+        MerchantParser(
+            merchant_name="Walmart",
+            domain="walmart.com",
+            order_number=_compile(r"order # ?(\d{7,}-\d{5,})"),
+            order_date=_compile(rf"^order date: {DATE}"),
+            delivery_date=_compile(rf"^arriving by {DATE}", rf"^delivered on {DATE}"),
+            items=(
+                _ITEM_QUANTITY_PREFIX,
+                _ITEM_BEFORE_PRICE,
+                *_compile(r"^order # ?[\d-]+\n\n([^\n:]{3,})\n\ndelivered"),
+            ),
+        ),
+        MerchantParser(
+            merchant_name="Best Buy",
+            domain="bestbuy.com",
+            order_number=_compile(r"order number:\s*(BBY\d{2}-\d{6,})", r"#(BBY\d{2}-\d{6,})"),
+            order_date=_compile(rf"^ordered: {DATE}"),
+            delivery_date=_compile(
+                rf"^estimated delivery:\s*{DATE}", rf"^delivered (?:on )?{DATE}"
+            ),
+        ),
+        MerchantParser(
+            merchant_name="Nike",
+            domain="nike.com",
+            order_number=_compile(r"order number: (C\d{6,})", r"order #(C\d{6,})"),
+            order_date=_compile(rf"^order date: {DATE}"),
+            delivery_date=_compile(rf"^estimated delivery:?\s*{DATE}"),
+        ),
+        MerchantParser(
+            merchant_name="Costco",
+            domain="costco.com",
+            order_number=_compile(r"order #: ?(\d{6,})"),
+            order_date=_compile(rf"^date: {DATE}"),
+            delivery_date=_compile(rf"^estimated delivery: {DATE}"),
+        ),
+        MerchantParser(
+            merchant_name="Nordstrom",
+            domain="nordstrom.com",
+            order_number=_compile(r"order #(\d{6,})"),
+            order_date=_compile(rf"^date: {DATE}"),
+            delivery_date=_compile(rf"^estimated arrival: {DATE}"),
+        ),
+    )
+}
+
+
+def get_merchant_parser(merchant_domain: str) -> MerchantParser | None:
+    """The parser registered for a (canonical) merchant domain, if any."""
+    return MERCHANT_PARSERS.get(merchant_domain)
+
+
+def get_parser_report() -> dict[str, dict[str, float]]:
+    """
+    Per-merchant share of Stage 3 extractions that skipped the LLM.
+
+    saved_ms_per_parse is the merchant's median LLM extraction latency
+    (from its fallbacks) minus its median parse latency; saved_ms_total
+    multiplies it by the parses. Only merchants with a registered parser
+    are reported, plus an "all" row over every Stage 3 extraction (complete
+    schema.org markup also skips the LLM, see structured_markup).
+    """
+    report: dict[str, dict[str, float]] = {}
+    for domain in MERCHANT_PARSERS:
+        parsed = get_counter(f"returns.extractor.parser.{domain}.parsed")
+        fell_back = get_counter(f"returns.extractor.parser.{domain}.fallback")
+        if not parsed + fell_back:
+            continue
+        parser_ms = get_latency_stats(f"returns.extractor.parser.{domain}")["p50"] * 1000
+        llm = get_latency_stats(f"returns.extractor.llm.{domain}")
+        saved = llm["p50"] * 1000 - parser_ms if llm["count"] else 0.0
+        report[domain] = {
+            "parsed": parsed,
+            "fell_back": fell_back,
+            "skip_share": parsed / (parsed + fell_back),
+            "parser_p50_ms": parser_ms,
+            "llm_p50_ms": llm["p50"] * 1000,
+            "saved_ms_per_parse": saved,
+            "saved_ms_total": saved * parsed,
+        }
+
+    parsed = get_counter("returns.extractor.parser_hit")
+    markup = get_counter("returns.extractor.markup_complete")
+    extractions = (
+        parsed
+        + markup
+        + sum(
+            get_counter(f"returns.extractor.{outcome}")
+            for outcome in ("llm_success", "llm_error", "llm_disabled")
+        )
+    )
+    report["all"] = {
+        "extractions": extractions,
+        "parsed": parsed,
+        "markup": markup,
+        "skip_share": (parsed + markup) / extractions if extractions else 0.0,
+    }
+    return report
@@ -0,0 +1,139 @@
+"""
+Module: merchant_rules
+Purpose: Load config/merchant_rules.yaml once per process and hot-reload on change.
+Dependencies: yaml
+
+The pipeline used to re-parse merchant_rules.yaml on every request (once in
+ReturnableReceiptExtractor, once in MerchantDomainFilter). MerchantRulesStore
+keeps the parsed rules as an immutable snapshot and only re-reads the file when
+its mtime changes, and only re-parses when the content hash changes. Swaps are
+a single reference assignment, so readers always see a complete rule set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from reclaim.config import MERCHANT_RULES_RELOAD_INTERVAL_S
+from reclaim.observability.logging import get_logger
+from reclaim.observability.telemetry import counter, log_event
+
+logger = get_logger(__name__)
+
+DEFAULT_MERCHANT_RULES_PATH = Path(__file__).parent.parent.parent / "config" / "merchant_rules.yaml"
+
+
+def load_merchant_rules(path: Path) -> dict[str, Any]:
+    """Load merchant rules from YAML, returning empty rules if the file is missing."""
+    if not path.exists():
+        logger.warning("Merchant rules not found at %s, using empty rules", path)
+        return {"merchants": {}}
+
+    with open(path) as f:
+        return yaml.safe_load(f) or {"merchants": {}}
+
+
+@dataclass(frozen=True)
+class MerchantRulesSnapshot:
+    """One parsed version of merchant_rules.yaml."""
+
+    rules: dict[str, Any]
+    digest: str  # sha256 of file bytes ("" when the file is missing)
+    mtime_ns: int  # 0 when the file is missing
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.digest)
+
+
+class MerchantRulesStore:
+    """
+    Process-wide holder for the current merchant rules.
+
+    current() is cheap: at most one os.stat() per check interval. The file is
+    re-read only when its mtime changes and re-parsed only when its content
+    hash changes. A file that fails to parse keeps the previous snapshot.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        check_interval_s: float = MERCHANT_RULES_RELOAD_INTERVAL_S,
+    ):
+        self.path = path or DEFAULT_MERCHANT_RULES_PATH
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._snapshot = self._read_snapshot()
+
+    def current(self) -> MerchantRulesSnapshot:
+        """Return the current snapshot, reloading it if the file changed."""
+        if time.monotonic() - self._last_check < self.check_interval_s:
+            return self._snapshot
+
+        with self._lock:
+            if time.monotonic() - self._last_check >= self.check_interval_s:
+                self._last_check = time.monotonic()
+                self._maybe_reload()
+            return self._snapshot
+
+    def _maybe_reload(self) -> None:
+        """Swap in a new snapshot if the file's mtime and content changed."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = 0
+
+        if mtime_ns == self._snapshot.mtime_ns:
+            return
+
+        try:
+            snapshot = self._read_snapshot()
+        except (OSError, yaml.YAMLError) as e:
+            counter("returns.merchant_rules.reload_error")
+            logger.error("Failed to reload merchant rules from %s: %s", self.path, e)
+            return
+
+        if snapshot.digest == self._snapshot.digest:
+            # Touched but unchanged — remember the new mtime, keep the old rules
+            self._snapshot = MerchantRulesSnapshot(
+                rules=self._snapshot.rules, digest=self._snapshot.digest, mtime_ns=mtime_ns
+            )
+            return
+
+        self._snapshot = snapshot
+        counter("returns.merchant_rules.reloaded")
+        log_event(
+            "returns.merchant_rules.reloaded",
+            digest=snapshot.digest[:12],
+            merchants=len(snapshot.rules.get("merchants", {})),
+        )
+
+    def _read_snapshot(self) -> MerchantRulesSnapshot:
+        """Read and parse the rules file into a snapshot."""
+        if not self.path.exists():
+            logger.warning("Merchant rules not found at %s, using empty rules", self.path)
+            return MerchantRulesSnapshot(rules={"merchants": {}}, digest="", mtime_ns=0)
+
+        mtime_ns = self.path.stat().st_mtime_ns
+        raw = self.path.read_bytes()
+        rules = yaml.safe_load(raw) or {"merchants": {}}
+        return MerchantRulesSnapshot(
+            rules=rules,
+            digest=hashlib.sha256(raw).hexdigest(),
+            mtime_ns=mtime_ns,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_merchant_rules_store() -> MerchantRulesStore:
+    """Get the process-wide store for the default merchant_rules.yaml."""
+    return MerchantRulesStore()
@@ -10,17 +10,26 @@ Expected rejection rate: 60-70% of candidates
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel, Field
 
+from reclaim.config import LLM_MICROBATCH_ENABLED, TEMPLATE_CACHE_ENABLED
 from reclaim.infrastructure.settings import GEMINI_MODEL
+from reclaim.llm.microbatch import MicroBatcher
+from reclaim.llm.packing import build_packed_prompt, packed_response_schema, parse_packed_response
 from reclaim.observability.logging import get_logger
 from reclaim.observability.telemetry import counter, log_event
+from reclaim.returns.domains import DomainResolver
+from reclaim.returns.templates import TEMPLATE_VERDICT_CACHE, template_fingerprint
+from reclaim.storage.cache import LLM_RESULT_CACHE, llm_result_key
 from reclaim.utils.redaction import redact_subject
 
 logger = get_logger(__name__)
@@ -92,7 +101,7 @@ class ReturnabilitySchema(BaseModel):
 
 # Gemini structured output schema — reason comes first to encourage
 # chain-of-thought reasoning before the classification decision.
-CLASSIFIER_RESPONSE_SCHEMA = {
+CLASSIFIER_RESPONSE_SCHEMA: dict[str, Any] = {
     "type": "object",
     "properties": {
         "reason": {
@@ -126,6 +135,16 @@ CLASSIFIER_RESPONSE_SCHEMA = {
     "propertyOrdering": ["reason", "is_returnable", "confidence", "receipt_type"],
 }
 
+# Bump when the response schema or its parsing changes, so cached
+# classifications from the old format are not reused.
+CLASSIFIER_SCHEMA_VERSION = "1"
+
+# Reasons _parse_response() uses when the response did not parse. These are
+# never cached, so the next scan gets a fresh LLM answer.
+PARSE_FALLBACK_REASONS = frozenset({"parsed_from_text", "parse_error_fallback"})
+# Reason prefix of the rejection _error_result() returns when the call fails
+LLM_ERROR_REASON = "llm_error_reject"
+
 
 # System instruction — cached by Gemini, reduces per-call latency.
 CLASSIFIER_SYSTEM_INSTRUCTION = """You classify email receipts and confirmations.
@@ -226,6 +245,21 @@ Classification:
 Write the reason field first — explain your reasoning before giving the classification."""
 
 
+# Packed mode: several emails per request, one verdict per email keyed by its
+# index. Amortizes per-request overhead and the system instruction above.
+PACKED_CLASSIFIER_RESPONSE_SCHEMA = packed_response_schema(CLASSIFIER_RESPONSE_SCHEMA)
+
+PACKED_CLASSIFIER_SYSTEM_INSTRUCTION = (
+    CLASSIFIER_SYSTEM_INSTRUCTION
+    + """
+
+## Multiple emails
+The message may contain several emails, each introduced by "### Email <n>".
+Classify each email independently. Return a JSON array with exactly one object
+per email, with "index" set to that email's <n>."""
+)
+
+
 class ReturnabilityClassifier:
     """
     LLM-based classifier for purchase returnability.
@@ -239,16 +273,35 @@ class ReturnabilityClassifier:
 From: {from_address}
 Snippet: {snippet}"""
 
-    def __init__(self):
-        """Initialize classifier with Gemini model."""
+    def __init__(
+        self,
+        microbatch: bool = LLM_MICROBATCH_ENABLED,
+        template_cache: bool = TEMPLATE_CACHE_ENABLED,
+        domain_resolver: DomainResolver | None = None,
+    ):
+        """Initialize classifier with Gemini model.
+
+        Args:
+            microbatch: Queue async classify calls from concurrent requests
+                        into packed calls (see reclaim.llm.microbatch)
+            template_cache: Reuse verdicts across emails from the same sender
+                            template (see reclaim.returns.templates)
+            domain_resolver: Sender domain resolver for template fingerprints,
+                             shared with Stage 1
+        """
+        self._templates = TEMPLATE_VERDICT_CACHE if template_cache else None
+        self.domain_resolver = domain_resolver or DomainResolver()
         # CODE-011: Model is now obtained from shared singleton
-        pass
+        self._batcher: MicroBatcher[tuple[str, str, str], ReturnabilityResult] | None = (
+            MicroBatcher("classifier", self._dispatch_batch) if microbatch else None
+        )
 
     def _call_llm_with_retry(
         self,
         prompt: str,
         system_instruction: str | None = None,
         response_schema: dict | None = None,
+        counter_prefix: str = "classifier",
     ) -> str:
         """Call LLM with retry logic and timeout.
 
@@ -258,7 +311,24 @@ Snippet: {snippet}"""
 
         return call_llm(
             prompt,
-            counter_prefix="classifier",
+            counter_prefix=counter_prefix,
+            system_instruction=system_instruction,
+            response_schema=response_schema,
+        )
+
+    async def _call_llm_with_retry_async(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        response_schema: dict | None = None,
+        counter_prefix: str = "classifier",
+    ) -> str:
+        """Async twin of _call_llm_with_retry() (delegates to call_llm_async)."""
+        from reclaim.llm.retry import call_llm_async
+
+        return await call_llm_async(
+            prompt,
+            counter_prefix=counter_prefix,
             system_instruction=system_instruction,
             response_schema=response_schema,
         )
@@ -287,63 +357,343 @@ Snippet: {snippet}"""
         """
         # Check feature flag
         if not _use_llm():
-            counter("returns.classifier.llm_disabled")
-            logger.warning(
-                "LLM DISABLED: RECLAIM_USE_LLM=%s - returning default returnable",
-                os.getenv("RECLAIM_USE_LLM", os.getenv("SHOPQ_USE_LLM", "not_set")),
-            )
-            # Conservative default: assume returnable if LLM disabled
-            return ReturnabilityResult.returnable(
-                reason="llm_disabled_default",
-                confidence=0.5,
-            )
+            return self._llm_disabled_result()
 
         # Build prompt
         prompt = self._build_prompt(from_address, subject, snippet)
 
+        cache_key = llm_result_key(prompt, CLASSIFIER_SYSTEM_INSTRUCTION, CLASSIFIER_SCHEMA_VERSION)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        template_key = self._template_key(from_address, subject, snippet)
+        template_verdict = self._template_result(template_key)
+        if template_verdict is not None:
+            return template_verdict
+
+        result = self._classify_prompt(prompt, cache_key, subject)
+        self._observe_template(template_key, result)
+        return result
+
+    def _classify_prompt(self, prompt: str, cache_key: str, subject: str) -> ReturnabilityResult:
+        """Single-email LLM call for an already built (and cache-missed) prompt."""
         try:
             # Call LLM with retry and timeout (CODE-003, CODE-004)
-            # SEC-016: Redact PII from logging
-            logger.info(
-                "LLM CLASSIFIER: Calling %s for subject='%s'", GEMINI_MODEL, redact_subject(subject)
-            )
+            self._log_call(subject)
             response_text = self._call_llm_with_retry(
                 prompt,
                 system_instruction=CLASSIFIER_SYSTEM_INSTRUCTION,
                 response_schema=CLASSIFIER_RESPONSE_SCHEMA,
             )
+            return self._finish(response_text, cache_key)
+
+        except Exception as e:
+            return self._error_result(e)
 
-            # Parse response
-            result = self._parse_response(response_text)
+    async def classify_async(
+        self,
+        from_address: str,
+        subject: str,
+        snippet: str,
+    ) -> ReturnabilityResult:
+        """Async variant of classify() for the event-loop pipeline.
 
-            counter("returns.classifier.success")
-            logger.info(
-                "LLM CLASSIFIER RESULT: is_returnable=%s, type=%s, reason='%s'",
-                result.is_returnable,
-                result.receipt_type.value,
-                result.reason,
+        Same prompt, parsing and failure policy; the Gemini call is awaited
+        so many classifications can be in flight on one worker.
+        """
+        if not _use_llm():
+            return self._llm_disabled_result()
+
+        prompt = self._build_prompt(from_address, subject, snippet)
+
+        cache_key = llm_result_key(prompt, CLASSIFIER_SYSTEM_INSTRUCTION, CLASSIFIER_SCHEMA_VERSION)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        template_key = self._template_key(from_address, subject, snippet)
+        template_verdict = self._template_result(template_key)
+        if template_verdict is not None:
+            return template_verdict
+
+        if self._batcher is not None:
+            result = await self._batcher.submit((prompt, cache_key, subject))
+        else:
+            result = await self._classify_prompt_async(prompt, cache_key, subject)
+        self._observe_template(template_key, result)
+        return result
+
+    async def _classify_prompt_async(
+        self, prompt: str, cache_key: str, subject: str
+    ) -> ReturnabilityResult:
+        """Async variant of _classify_prompt()."""
+        try:
+            self._log_call(subject)
+            response_text = await self._call_llm_with_retry_async(
+                prompt,
+                system_instruction=CLASSIFIER_SYSTEM_INSTRUCTION,
+                response_schema=CLASSIFIER_RESPONSE_SCHEMA,
             )
-            log_event(
-                "returns.classifier.result",
-                is_returnable=result.is_returnable,
-                receipt_type=result.receipt_type.value,
-                confidence=result.confidence,
-                model=GEMINI_MODEL,
+            return self._finish(response_text, cache_key)
+
+        except Exception as e:
+            return self._error_result(e)
+
+    def classify_packed(self, emails: Sequence[tuple[str, str, str]]) -> list[ReturnabilityResult]:
+        """
+        Classify several emails in one LLM request.
+
+        Args:
+            emails: (from_address, subject, snippet) per email, at most
+                    CLASSIFIER_PACK_SIZE for a useful prompt size
+
+        Returns:
+            One ReturnabilityResult per email, in input order.
+
+        Cached emails (exact prompt or sender template) are answered from
+        the cache and left out of the packed prompt. Items the packed
+        response is missing or that fail to parse fall back to a
+        single-email classify call. If the packed call itself
+        fails, every pending email gets the usual LLM-error rejection.
+
+        Side Effects:
+            - Calls Gemini API once for the pack, plus once per fallback item
+            - Increments telemetry counters
+        """
+        if not _use_llm():
+            return [self._llm_disabled_result() for _ in emails]
+
+        prompts, keys, template_keys, results, pending = self._prepare_pack(emails)
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = self._classify_prompt(prompts[i], keys[i], emails[i][1])
+        elif pending:
+            try:
+                self._log_packed_call(len(pending))
+                response_text = self._call_llm_with_retry(
+                    build_packed_prompt([prompts[i] for i in pending]),
+                    system_instruction=PACKED_CLASSIFIER_SYSTEM_INSTRUCTION,
+                    response_schema=PACKED_CLASSIFIER_RESPONSE_SCHEMA,
+                    counter_prefix="classifier_packed",
+                )
+            except Exception as e:
+                for i in pending:
+                    results[i] = self._error_result(e)
+            else:
+                parsed = parse_packed_response(
+                    response_text, len(pending), "classifier", self._is_valid_item
+                )
+                for slot, i in enumerate(pending):
+                    if slot in parsed:
+                        results[i] = self._finish_packed_item(parsed[slot], keys[i])
+                    else:
+                        counter("returns.classifier.packed_fallback")
+                        results[i] = self._classify_prompt(prompts[i], keys[i], emails[i][1])
+
+        for i in pending:
+            self._observe_template(template_keys[i], results[i])
+        return [r for r in results if r is not None]
+
+    async def classify_packed_async(
+        self, emails: Sequence[tuple[str, str, str]]
+    ) -> list[ReturnabilityResult]:
+        """Async variant of classify_packed(); fallback items run concurrently."""
+        if not _use_llm():
+            return [self._llm_disabled_result() for _ in emails]
+
+        prompts, keys, template_keys, results, pending = self._prepare_pack(emails)
+        if pending:
+            fresh = await self._classify_uncached_async(
+                [prompts[i] for i in pending],
+                [keys[i] for i in pending],
+                [emails[i][1] for i in pending],
             )
+            for i, result in zip(pending, fresh, strict=True):
+                results[i] = result
+                self._observe_template(template_keys[i], result)
 
-            return result
+        return [r for r in results if r is not None]
 
-        except Exception as e:
-            counter("returns.classifier.error")
-            logger.error("LLM CLASSIFIER ERROR: %s (model=%s)", e, GEMINI_MODEL)
-            log_event("returns.classifier.error", error=str(e), model=GEMINI_MODEL)
-
-            # REJECT on LLM failure - don't let unclassified emails through
-            # This prevents garbage from polluting the list when LLM is broken
-            return ReturnabilityResult.not_returnable(
-                reason=f"llm_error_reject: {str(e)[:50]}",
-                receipt_type=ReceiptType.UNKNOWN,
+    async def _classify_uncached_async(
+        self, prompts: list[str], keys: list[str], subjects: list[str]
+    ) -> list[ReturnabilityResult]:
+        """Classify already-built prompts that missed the cache, packed when >1.
+
+        Also the dispatch function of the cross-request micro-batcher.
+        """
+        if len(prompts) == 1:
+            return [await self._classify_prompt_async(prompts[0], keys[0], subjects[0])]
+
+        try:
+            self._log_packed_call(len(prompts))
+            response_text = await self._call_llm_with_retry_async(
+                build_packed_prompt(prompts),
+                system_instruction=PACKED_CLASSIFIER_SYSTEM_INSTRUCTION,
+                response_schema=PACKED_CLASSIFIER_RESPONSE_SCHEMA,
+                counter_prefix="classifier_packed",
             )
+        except Exception as e:
+            return [self._error_result(e) for _ in prompts]
+
+        parsed = parse_packed_response(
+            response_text, len(prompts), "classifier", self._is_valid_item
+        )
+        results: list[ReturnabilityResult | None] = [None] * len(prompts)
+        fallback: list[int] = []
+        for i, key in enumerate(keys):
+            if i in parsed:
+                results[i] = self._finish_packed_item(parsed[i], key)
+            else:
+                counter("returns.classifier.packed_fallback")
+                fallback.append(i)
+
+        singles = await asyncio.gather(
+            *(self._classify_prompt_async(prompts[i], keys[i], subjects[i]) for i in fallback)
+        )
+        for i, result in zip(fallback, singles, strict=True):
+            results[i] = result
+
+        return [r for r in results if r is not None]
+
+    async def _dispatch_batch(self, items: list[tuple[str, str, str]]) -> list[ReturnabilityResult]:
+        """Micro-batcher dispatch: (prompt, cache_key, subject) per queued call."""
+        return await self._classify_uncached_async(
+            [prompt for prompt, _, _ in items],
+            [key for _, key, _ in items],
+            [subject for _, _, subject in items],
+        )
+
+    def _prepare_pack(
+        self, emails: Sequence[tuple[str, str, str]]
+    ) -> tuple[list[str], list[str], list[str | None], list[ReturnabilityResult | None], list[int]]:
+        """Build per-email prompts/cache keys and answer what the caches can.
+
+        Returns:
+            (prompts, cache_keys, template_keys, results, pending) — results
+            holds cached verdicts (None elsewhere); pending lists the indexes
+            still to classify.
+        """
+        prompts = [self._build_prompt(*email) for email in emails]
+        keys = [
+            llm_result_key(prompt, CLASSIFIER_SYSTEM_INSTRUCTION, CLASSIFIER_SCHEMA_VERSION)
+            for prompt in prompts
+        ]
+        template_keys = [self._template_key(*email) for email in emails]
+        results = [
+            self._cached_result(key) or self._template_result(template_key)
+            for key, template_key in zip(keys, template_keys, strict=True)
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        return prompts, keys, template_keys, results, pending
+
+    def _log_packed_call(self, count: int) -> None:
+        counter("returns.classifier.packed_calls")
+        counter("returns.classifier.packed_items", count)
+        logger.info("LLM CLASSIFIER: Calling %s for %d packed emails", GEMINI_MODEL, count)
+
+    @staticmethod
+    def _is_valid_item(item: dict) -> bool:
+        """Whether a packed item would parse cleanly as a single-email response."""
+        try:
+            ReceiptType(ReturnabilitySchema.model_validate(item).receipt_type)
+        except ValueError:
+            return False
+        return True
+
+    def _finish_packed_item(self, item: dict, cache_key: str) -> ReturnabilityResult:
+        """Parse one packed verdict like a single-email response."""
+        return self._finish(json.dumps(item), cache_key)
+
+    def _llm_disabled_result(self) -> ReturnabilityResult:
+        """Conservative default when the LLM feature flag is off."""
+        counter("returns.classifier.llm_disabled")
+        logger.warning(
+            "LLM DISABLED: RECLAIM_USE_LLM=%s - returning default returnable",
+            os.getenv("RECLAIM_USE_LLM", os.getenv("SHOPQ_USE_LLM", "not_set")),
+        )
+        # Conservative default: assume returnable if LLM disabled
+        return ReturnabilityResult.returnable(
+            reason="llm_disabled_default",
+            confidence=0.5,
+        )
+
+    def _log_call(self, subject: str) -> None:
+        """Log an outgoing classifier call.
+
+        SEC-016: Redact PII from logging
+        """
+        logger.info(
+            "LLM CLASSIFIER: Calling %s for subject='%s'", GEMINI_MODEL, redact_subject(subject)
+        )
+
+    def _cached_result(self, cache_key: str) -> ReturnabilityResult | None:
+        """Return a cached classification for this exact prompt, if any."""
+        cached = LLM_RESULT_CACHE.get(cache_key)
+        if isinstance(cached, ReturnabilityResult):
+            counter("returns.classifier.cache_hit")
+            return cached
+
+        counter("returns.classifier.cache_miss")
+        return None
+
+    def _template_key(self, from_address: str, subject: str, snippet: str) -> str | None:
+        """Sender-template fingerprint, or None when the template cache is off."""
+        if self._templates is None:
+            return None
+        return template_fingerprint(self.domain_resolver.resolve(from_address), subject, snippet)
+
+    def _template_result(self, template_key: str | None) -> ReturnabilityResult | None:
+        """Verdict cached for the email's sender template, if it may be served."""
+        if template_key is None or self._templates is None:
+            return None
+        return self._templates.lookup(template_key)
+
+    def _observe_template(
+        self, template_key: str | None, result: ReturnabilityResult | None
+    ) -> None:
+        """Teach the template cache an LLM verdict (not parse fallbacks or errors)."""
+        if template_key is None or result is None or self._templates is None:
+            return
+        if result.reason in PARSE_FALLBACK_REASONS or result.reason.startswith(LLM_ERROR_REASON):
+            return
+        self._templates.observe(template_key, result)
+
+    def _finish(self, response_text: str, cache_key: str) -> ReturnabilityResult:
+        """Parse a raw classifier response, cache it and record success telemetry."""
+        result = self._parse_response(response_text)
+        if result.reason not in PARSE_FALLBACK_REASONS:
+            LLM_RESULT_CACHE.put(cache_key, result)
+
+        counter("returns.classifier.success")
+        logger.info(
+            "LLM CLASSIFIER RESULT: is_returnable=%s, type=%s, reason='%s'",
+            result.is_returnable,
+            result.receipt_type.value,
+            result.reason,
+        )
+        log_event(
+            "returns.classifier.result",
+            is_returnable=result.is_returnable,
+            receipt_type=result.receipt_type.value,
+            confidence=result.confidence,
+            model=GEMINI_MODEL,
+        )
+
+        return result
+
+    def _error_result(self, e: Exception) -> ReturnabilityResult:
+        """Final-failure policy: reject the email when the LLM call fails."""
+        counter("returns.classifier.error")
+        logger.error("LLM CLASSIFIER ERROR: %s (model=%s)", e, GEMINI_MODEL)
+        log_event("returns.classifier.error", error=str(e), model=GEMINI_MODEL)
+
+        # REJECT on LLM failure - don't let unclassified emails through
+        # This prevents garbage from polluting the list when LLM is broken
+        return ReturnabilityResult.not_returnable(
+            reason=f"{LLM_ERROR_REASON}: {str(e)[:50]}",
+            receipt_type=ReceiptType.UNKNOWN,
+        )
 
     def _build_prompt(self, from_address: str, subject: str, snippet: str) -> str:
         """Build classification prompt with sanitized inputs."""
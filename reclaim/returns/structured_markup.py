@@ -0,0 +1,276 @@
+"""
+Stage 3 fields from schema.org Order / ParcelDelivery markup in HTML bodies.
+
+Many retailers embed Gmail-compatible schema.org markup in their order and
+shipping emails, either as JSON-LD (<script type="application/ld+json">)
+or as microdata (itemscope / itemtype / itemprop attributes). html_to_text
+drops both, and the LLM then re-derives the same order number, items and
+dates from the visible text.
+
+markup_fields() reads that markup from body_html into the LLM extraction
+shape (LLMExtractionSchema keys). ReturnFieldExtractor uses it directly when
+it is complete (is_complete()), and otherwise lets it override the LLM's
+answer for the fields it does have.
+
+JSON-LD blocks are found with a regex; the HTML is only parsed (stdlib
+HTMLParser) when it contains microdata, so emails without markup cost one
+substring scan.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Any
+
+from reclaim.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+_JSON_LD_RE = re.compile(
+    r"<script[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_ITEMSCOPE_RE = re.compile(r"\bitemscope\b", re.IGNORECASE)
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_AMOUNT_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+# Elements that never have an end tag
+_VOID_TAGS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "param", "source", "track", "wbr",
+    }
+)  # fmt: skip
+
+# Attributes holding a microdata property value, by precedence
+_VALUE_ATTRS = ("content", "datetime", "href", "src", "value")
+
+# Fields a markup extraction needs before Stage 3 skips the LLM; one of the
+# two dates is enough to anchor the return window
+REQUIRED_FIELDS = ("merchant_name", "item_summary", "order_number")
+DATE_FIELDS = ("order_date", "delivery_date")
+
+
+class _MicrodataCollector(HTMLParser):
+    """Collect top-level microdata items as JSON-LD-shaped dicts."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.items: list[dict[str, Any]] = []
+        # Open elements: (tag, item it opened, (item, prop, text) it is capturing)
+        self._stack: list[tuple[str, dict | None, tuple[dict, str, list[str]] | None]] = []
+
+    def _current_item(self) -> dict | None:
+        for _, item, _ in reversed(self._stack):
+            if item is not None:
+                return item
+        return None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr = {name.lower(): value or "" for name, value in attrs}
+        parent = self._current_item()
+        prop = attr.get("itemprop", "").strip()
+
+        item = None
+        if "itemscope" in attr:
+            item = {"@type": attr.get("itemtype", "").rstrip("/").rsplit("/", 1)[-1]}
+            if prop and parent is not None:
+                _add_property(parent, prop, item)
+            else:
+                self.items.append(item)
+
+        capture: tuple[dict, str, list[str]] | None = None
+        if prop and item is None and parent is not None:
+            value = next((attr[a] for a in _VALUE_ATTRS if a in attr), None)
+            if value is not None:
+                _add_property(parent, prop, value.strip())
+            elif tag not in _VOID_TAGS:
+                capture = (parent, prop, [])
+
+        if tag not in _VOID_TAGS:
+            self._stack.append((tag, item, capture))
+
+    def handle_endtag(self, tag: str) -> None:
+        # Lenient about unclosed tags: pop back to the matching open tag
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                for _, _, capture in reversed(self._stack[i:]):
+                    if capture is not None:
+                        parent, prop, text = capture
+                        _add_property(parent, prop, " ".join("".join(text).split()))
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        for _, _, capture in self._stack:
+            if capture is not None:
+                capture[2].append(data)
+
+
+def _add_property(item: dict, prop: str, value: Any) -> None:
+    """Set a property, turning repeated properties into lists."""
+    for name in prop.split():
+        if name not in item:
+            item[name] = value
+        elif isinstance(item[name], list):
+            item[name].append(value)
+        else:
+            item[name] = [item[name], value]
+
+
+def extract_markup(html: str) -> list[dict[str, Any]]:
+    """Top-level schema.org nodes from JSON-LD blocks and microdata."""
+    nodes: list[dict[str, Any]] = []
+    for block in _JSON_LD_RE.findall(html):
+        try:
+            data = json.loads(block.strip())
+        except ValueError:
+            logger.debug("Skipping unparseable JSON-LD block (%d chars)", len(block))
+            continue
+        for node in data if isinstance(data, list) else [data]:
+            if isinstance(node, dict):
+                graph = node.get("@graph")
+                nodes.extend(
+                    n for n in (graph if isinstance(graph, list) else [node]) if isinstance(n, dict)
+                )
+
+    if _ITEMSCOPE_RE.search(html):
+        collector = _MicrodataCollector()
+        collector.feed(html)
+        collector.close()
+        nodes.extend(collector.items)
+    return nodes
+
+
+def _types(node: dict) -> set[str]:
+    raw = node.get("@type", "")
+    names = raw if isinstance(raw, list) else [raw]
+    return {str(name).rstrip("/").rsplit("/", 1)[-1] for name in names}
+
+
+def _walk(value: Any):
+    """Every dict nested in a node, the node included."""
+    if isinstance(value, dict):
+        yield value
+        for child in value.values():
+            yield from _walk(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _walk(child)
+
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _text(value: Any) -> str | None:
+    """A property as text (a Thing's name if the property is a node)."""
+    for v in _as_list(value):
+        if isinstance(v, dict):
+            v = v.get("name")
+        if isinstance(v, str | int | float) and str(v).strip():
+            return str(v).strip()
+    return None
+
+
+def _date(value: Any) -> str | None:
+    text = _text(value)
+    return text[:10] if text and _ISO_DATE_RE.match(text) else None
+
+
+def _amount(value: Any) -> float | None:
+    for v in _as_list(value):
+        if isinstance(v, dict):
+            v = v.get("price")
+        if isinstance(v, int | float):
+            return float(v)
+        match = _AMOUNT_RE.search(v) if isinstance(v, str) else None
+        if match:
+            return float(match.group(0).replace(",", ""))
+    return None
+
+
+def _item_names(order: dict, deliveries: list[dict]) -> list[str]:
+    names: list[str] = []
+    products = [
+        offer.get("itemOffered") for offer in _as_list(order.get("acceptedOffer"))
+        if isinstance(offer, dict)
+    ]  # fmt: skip
+    for ordered in _as_list(order.get("orderedItem")):
+        # OrderItem wraps the product; a bare Product is allowed too
+        products.append(
+            ordered.get("orderedItem", ordered) if isinstance(ordered, dict) else ordered
+        )
+    for delivery in deliveries:
+        products.extend(_as_list(delivery.get("itemShipped")))
+
+    for product in products:
+        for each in _as_list(product):
+            name = _text(each)
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def markup_fields(html: str | None) -> dict[str, Any]:
+    """
+    Extraction fields from schema.org Order / ParcelDelivery markup.
+
+    Returns:
+        Only the fields the markup states (empty if there is none), with
+        LLMExtractionSchema keys; dates as YYYY-MM-DD
+    """
+    if not html:
+        return {}
+    nodes = [n for node in extract_markup(html) for n in _walk(node)]
+    orders = [n for n in nodes if "Order" in _types(n)]
+    deliveries = [n for n in nodes if "ParcelDelivery" in _types(n)]
+    if not orders and not deliveries:
+        return {}
+
+    order = orders[0] if orders else {}
+    for delivery in deliveries:
+        part_of = delivery.get("partOfOrder")
+        if not order and isinstance(part_of, dict):
+            order = part_of
+
+    payment = order.get("totalPaymentDue")
+    currency = order.get("priceCurrency") or (
+        payment.get("priceCurrency") if isinstance(payment, dict) else None
+    )
+    delivery_date = next(
+        (
+            _date(d.get("expectedArrivalUntil") or d.get("expectedArrivalFrom"))
+            for d in deliveries
+            if d.get("expectedArrivalUntil") or d.get("expectedArrivalFrom")
+        ),
+        None,
+    )
+
+    items = _item_names(order, deliveries)
+    item_summary = None
+    if items:
+        item_summary = items[0]
+        if len(items) > 1:
+            more = len(items) - 1
+            item_summary += f" and {more} more item{'s' if more > 1 else ''}"
+
+    fields = {
+        "merchant_name": _text(order.get("seller") or order.get("merchant")),
+        "item_summary": item_summary,
+        "order_number": _text(order.get("orderNumber")),
+        "amount": _amount(order.get("price") or payment),
+        "currency": _text(currency),
+        "order_date": _date(order.get("orderDate")),
+        "delivery_date": delivery_date,
+    }
+    return {name: value for name, value in fields.items() if value is not None}
+
+
+def is_complete(fields: dict[str, Any]) -> bool:
+    """Whether markup fields are enough to skip the Stage 3 LLM call."""
+    return all(fields.get(f) for f in REQUIRED_FIELDS) and any(fields.get(f) for f in DATE_FIELDS)
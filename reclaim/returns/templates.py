@@ -0,0 +1,212 @@
+"""
+Sender-template fingerprints and the classifier verdict cache keyed on them.
+
+Merchant transactional emails come from a handful of templates per sender:
+two "Your package was delivered" emails from the same merchant differ only
+in item names, dates, amounts and order numbers. template_fingerprint()
+masks those out of the subject and snippet and hashes the remaining
+skeleton with the sender domain, so every instance of a template shares one
+key, and TemplateVerdictCache reuses one classifier verdict for all of them.
+
+Masking is heuristic. A template is only served from the cache once
+TEMPLATE_CACHE_MIN_OBSERVATIONS LLM verdicts for it agree; a disagreeing
+verdict (the same template used for returnable and non-returnable items)
+marks it unstable, so it keeps going to the LLM until it expires. A sampled
+fraction of hits is re-validated against the LLM to catch templates whose
+verdict has drifted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+
+from reclaim.config import (
+    TEMPLATE_CACHE_MAX_ENTRIES,
+    TEMPLATE_CACHE_MIN_OBSERVATIONS,
+    TEMPLATE_CACHE_REVALIDATE_RATE,
+    TEMPLATE_CACHE_TTL_S,
+)
+from reclaim.observability.telemetry import counter, log_event
+from reclaim.storage.cache import TTLCache
+
+if TYPE_CHECKING:
+    from reclaim.returns.returnability_classifier import ReturnabilityResult
+
+# Reason prefix on verdicts served from the template cache
+TEMPLATE_CACHE_REASON = "template_cache"
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"\S+@\S+")
+_PRICE_RE = re.compile(r"[$€£]\s?\d[\d,]*(?:\.\d+)?")
+# Tokens with a digit: order numbers, dates, quantities, tracking numbers
+_ID_RE = re.compile(r"[\w#-]*\d[\w#-]*")
+_GREETING_RE = re.compile(r"\b(hi|hello|hey|dear)\s+[^\s,!]+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+_PLACEHOLDER = r"<(?:url|email|price|id|name)>"
+# Adjacent masks ("Bose QC45 Headphones" -> "<name> <id> <name>") become one
+_PLACEHOLDER_RUN_RE = re.compile(rf"{_PLACEHOLDER}(?:[\s,./&+-]*{_PLACEHOLDER})*")
+_LETTER_RE = re.compile(r"[a-z]")
+
+
+def _mask_names(line: str) -> str:
+    """Replace runs of capitalized words (product, brand and person names)."""
+    masked: list[str] = []
+    for word in line.split():
+        if word[0].isupper():
+            if not masked or masked[-1] != "<name>":
+                masked.append("<name>")
+        else:
+            masked.append(word)
+    return " ".join(masked)
+
+
+def _skeleton_line(line: str) -> str:
+    line = _URL_RE.sub("<url>", line)
+    line = _EMAIL_RE.sub("<email>", line)
+    line = _PRICE_RE.sub("<price>", line)
+    line = _ID_RE.sub("<id>", line)
+    line = _GREETING_RE.sub(r"\1 <name>", line)
+    line = _mask_names(line).lower()
+    line = _SPACE_RE.sub(" ", _PLACEHOLDER_RUN_RE.sub("<*>", line)).strip()
+    # Lines of nothing but per-email details (item rows, addresses) vary in
+    # number and shape between instances of one template
+    if not _LETTER_RE.search(line.replace("<*>", "")):
+        return ""
+    return line
+
+
+def template_skeleton(subject: str, snippet: str) -> str:
+    """
+    Subject and snippet with per-email details masked.
+
+    Each line is masked separately; blank lines are dropped and repeated
+    lines kept once, so orders with one item and with five share a skeleton.
+    """
+    lines = (_skeleton_line(line) for line in f"{subject}\n{snippet}".splitlines())
+    return "\n".join(dict.fromkeys(line for line in lines if line))
+
+
+def template_fingerprint(domain: str, subject: str, snippet: str) -> str:
+    """Stable key for the sender template an email was generated from."""
+    payload = f"{domain}\n{template_skeleton(subject, snippet)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class TemplateEntry:
+    """What the cache knows about one template."""
+
+    verdict: ReturnabilityResult
+    observations: int = 1  # agreeing LLM verdicts
+    hits: int = 0  # classifier calls saved
+    unstable: bool = False  # LLM verdicts disagreed; never served
+
+
+class TemplateVerdictCache:
+    """
+    Classifier verdicts per template fingerprint, with hit-rate statistics.
+
+    Thread-safe. Entries expire ttl_seconds after the template was first
+    learned (per-template expiry); the least recently used are evicted
+    beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = TEMPLATE_CACHE_TTL_S,
+        max_entries: int = TEMPLATE_CACHE_MAX_ENTRIES,
+        min_observations: int = TEMPLATE_CACHE_MIN_OBSERVATIONS,
+        revalidate_rate: float = TEMPLATE_CACHE_REVALIDATE_RATE,
+    ):
+        self._entries = TTLCache[TemplateEntry](
+            name="template_verdict", ttl_seconds=ttl_seconds, max_entries=max_entries
+        )
+        self.min_observations = max(1, min_observations)
+        self.revalidate_rate = revalidate_rate
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+        self._drift = 0
+
+    def lookup(self, fingerprint: str) -> ReturnabilityResult | None:
+        """
+        Cached verdict for a template, or None when the LLM should classify.
+
+        None is also returned for a sampled revalidation; the caller then
+        passes the fresh verdict to observe() as for any miss.
+        """
+        entry = self._entries.get(fingerprint)
+        with self._lock:
+            if entry is None or entry.unstable or entry.observations < self.min_observations:
+                self._misses += 1
+                counter("returns.template_cache.miss")
+                return None
+            if random.random() < self.revalidate_rate:
+                self._revalidations += 1
+                counter("returns.template_cache.revalidate")
+                return None
+            entry.hits += 1
+            self._hits += 1
+            verdict = entry.verdict
+
+        counter("returns.template_cache.hit")
+        return replace(verdict, reason=f"{TEMPLATE_CACHE_REASON}: {verdict.reason}")
+
+    def observe(self, fingerprint: str, verdict: ReturnabilityResult) -> None:
+        """Record an LLM verdict for a template."""
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            self._entries.put(fingerprint, TemplateEntry(verdict))
+            return
+
+        with self._lock:
+            if entry.unstable:
+                return
+            if entry.verdict.is_returnable == verdict.is_returnable:
+                entry.observations += 1
+                return
+            entry.unstable = True
+            served = entry.observations >= self.min_observations
+            if served:
+                self._drift += 1
+
+        counter("returns.template_cache.unstable")
+        if served:
+            # A template that was being served from cache got a different verdict
+            counter("returns.template_cache.drift")
+            log_event(
+                "returns.template_cache.drift",
+                template=fingerprint[:12],
+                cached=entry.verdict.is_returnable,
+                observations=entry.observations,
+                hits=entry.hits,
+            )
+
+    def stats(self) -> dict[str, float]:
+        """Hit rate and revalidation/drift counts since start (or clear())."""
+        with self._lock:
+            lookups = self._hits + self._misses + self._revalidations
+            stats: dict[str, float] = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "revalidations": self._revalidations,
+                "drift": self._drift,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+        stats.update(self._entries.stats())
+        return stats
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._hits = self._misses = self._revalidations = self._drift = 0
+
+
+# Process-wide template verdicts for the Stage 2 classifier
+TEMPLATE_VERDICT_CACHE = TemplateVerdictCache()
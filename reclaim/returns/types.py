@@ -10,7 +10,7 @@ minimal dependencies prevents circular imports when splitting other modules.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
@@ -37,6 +37,27 @@ class FilterResult:
     match_type: str  # "allowlist" | "blocklist" | "heuristic" | "unknown"
 
 
+@dataclass
+class BatchFilterResult:
+    """Stage 1 results for a batch of emails, one list per FilterResult field."""
+
+    is_candidate: list[bool] = field(default_factory=list)
+    reason: list[str] = field(default_factory=list)
+    domain: list[str] = field(default_factory=list)
+    match_type: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.domain)
+
+    def __getitem__(self, index: int) -> FilterResult:
+        return FilterResult(
+            is_candidate=self.is_candidate[index],
+            reason=self.reason[index],
+            domain=self.domain[index],
+            match_type=self.match_type[index],
+        )
+
+
 # ---------------------------------------------------------------------------
 # Stage 3 result (from field_extractor.py)
 # ---------------------------------------------------------------------------
@@ -69,7 +90,7 @@ class ExtractedFields:
     evidence_snippet: str | None = None
 
     # Metadata
-    extraction_method: str = "unknown"  # "llm" | "rules" | "hybrid"
+    extraction_method: str = "unknown"  # "llm" | "rules" | "hybrid" | "parser" | "markup"
 
 
 # ---------------------------------------------------------------------------
@@ -109,6 +130,8 @@ class ExtractionResult:
     extracted_fields: ExtractedFields | None = None
     rejection_reason: str | None = None
     stage_reached: ExtractionStage = ExtractionStage.NONE
+    # True when the request deadline forced rules-only extraction (no/partial LLM)
+    degraded: bool = False
 
     @classmethod
     def rejected_at_filter(cls, filter_result: FilterResult) -> ExtractionResult:
@@ -129,6 +152,23 @@ class ExtractionResult:
             stage_reached=ExtractionStage.FILTER,
         )
 
+    @classmethod
+    def unclassified_at_deadline(cls, filter_result: FilterResult) -> ExtractionResult:
+        """Stage 1 candidate the deadline left without a Stage 2 verdict.
+
+        Held back rather than carded: most candidates are rejected by the
+        classifier, so guessing "returnable" would fill lists with junk. The
+        extension leaves degraded emails unprocessed and retries them on its
+        next scan.
+        """
+        return cls(
+            success=False,
+            filter_result=filter_result,
+            rejection_reason="deadline:unclassified",
+            stage_reached=ExtractionStage.FILTER,
+            degraded=True,
+        )
+
     @classmethod
     def rejected_at_classifier(
         cls,
@@ -5,14 +5,20 @@ Caches parsed emails and classification results to reduce LLM calls and parsing
 overhead. Entries expire automatically after configurable TTL with telemetry tracking.
 
 Key: TTLCache[T] with get/put operations and automatic expiry based on timestamps.
+An optional max_entries bound evicts the least recently used entry on overflow.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Generic, TypeVar
 
+from reclaim.config import GEMINI_MODEL, LLM_RESULT_CACHE_MAX_ENTRIES, LLM_RESULT_CACHE_TTL_S
 from reclaim.observability.telemetry import counter, log_event
 
 T = TypeVar("T")
@@ -27,19 +33,26 @@ class CacheEntry(Generic[T]):
 
 
 class TTLCache(Generic[T]):
-    """Simple TTL-based cache with automatic expiry."""
+    """Simple TTL-based cache with automatic expiry and optional LRU bound.
 
-    def __init__(self, name: str, ttl_seconds: float = 3600.0):
+    Thread-safe: the pipeline calls get/put from its worker threads.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 3600.0, max_entries: int | None = None):
         """
         Initialize cache.
 
         Args:
             name: Cache name for telemetry (e.g., "parsed_email", "classification")
             ttl_seconds: Time-to-live for cache entries (default 1 hour)
+            max_entries: Evict least recently used entries beyond this size
+                (default unbounded)
         """
         self.name = name
         self.ttl_seconds = ttl_seconds
-        self._store: dict[str, CacheEntry[T]] = {}
+        self.max_entries = max_entries
+        self._store: OrderedDict[str, CacheEntry[T]] = OrderedDict()
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> T | None:
         """
@@ -47,21 +60,23 @@ class TTLCache(Generic[T]):
 
         Returns None if key not found or expired.
         """
-        entry = self._store.get(key)
-        if entry is None:
-            counter(f"cache.{self.name}.miss")
-            return None
-
-        now = time.time()
-        if now > entry.expires_at:
-            # Expired, remove and return None
-            del self._store[key]
-            counter(f"cache.{self.name}.expired")
-            log_event("cache.expired", cache=self.name, key_hash=self._hash_key(key))
-            return None
-
-        counter(f"cache.{self.name}.hit")
-        return entry.value
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                counter(f"cache.{self.name}.miss")
+                return None
+
+            now = time.time()
+            if now > entry.expires_at:
+                # Expired, remove and return None
+                del self._store[key]
+                counter(f"cache.{self.name}.expired")
+                log_event("cache.expired", cache=self.name, key_hash=self._hash_key(key))
+                return None
+
+            self._store.move_to_end(key)
+            counter(f"cache.{self.name}.hit")
+            return entry.value
 
     def put(self, key: str, value: T) -> None:
         """
@@ -69,10 +84,17 @@ class TTLCache(Generic[T]):
 
         Side Effects:
             - Writes to _store dict (in-memory cache)
-            - Increments telemetry counter (cache.{name}.write)
+            - Evicts least recently used entries beyond max_entries
+            - Increments telemetry counters (cache.{name}.write, cache.{name}.evicted)
         """
         expires_at = time.time() + self.ttl_seconds
-        self._store[key] = CacheEntry(value=value, expires_at=expires_at)
+        with self._lock:
+            self._store[key] = CacheEntry(value=value, expires_at=expires_at)
+            self._store.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._store) > self.max_entries:
+                    self._store.popitem(last=False)
+                    counter(f"cache.{self.name}.evicted")
         counter(f"cache.{self.name}.write")
 
     def invalidate(self, key: str) -> None:
@@ -83,9 +105,10 @@ class TTLCache(Generic[T]):
             - Deletes entry from _store dict (in-memory cache)
             - Increments telemetry counter (cache.{name}.invalidate)
         """
-        if key in self._store:
-            del self._store[key]
-            counter(f"cache.{self.name}.invalidate")
+        with self._lock:
+            if key in self._store:
+                del self._store[key]
+                counter(f"cache.{self.name}.invalidate")
 
     def clear(self) -> None:
         """
@@ -95,18 +118,21 @@ class TTLCache(Generic[T]):
             - Clears entire _store dict (in-memory cache)
             - Writes telemetry event with entry count
         """
-        count = len(self._store)
-        self._store.clear()
+        with self._lock:
+            count = len(self._store)
+            self._store.clear()
         log_event("cache.cleared", cache=self.name, count=count)
 
     def stats(self) -> dict[str, int]:
         """Get cache statistics."""
         now = time.time()
-        active = sum(1 for entry in self._store.values() if now <= entry.expires_at)
-        expired = len(self._store) - active
+        with self._lock:
+            total = len(self._store)
+            active = sum(1 for entry in self._store.values() if now <= entry.expires_at)
+        expired = total - active
 
         return {
-            "total_entries": len(self._store),
+            "total_entries": total,
             "active_entries": active,
             "expired_entries": expired,
         }
@@ -116,6 +142,27 @@ class TTLCache(Generic[T]):
         return key[:12] if len(key) > 12 else key
 
 
+def llm_result_key(prompt: str, system_instruction: str | None, schema_version: str) -> str:
+    """
+    Content-addressed key for a parsed LLM result.
+
+    prompt must be the exact (redacted, sanitized) text sent to the model, so
+    identical emails map to the same key and raw PII never forms part of it.
+    Changing the model, the system instruction or the stage's schema version
+    yields new keys, so stale results are never reused.
+    """
+    payload = json.dumps(
+        [GEMINI_MODEL, schema_version, system_instruction, prompt], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 # Global caches for pipeline stages
 PARSED_EMAIL_CACHE = TTLCache[object](name="parsed_email", ttl_seconds=3600.0)
 CLASSIFICATION_CACHE = TTLCache[object](name="classification", ttl_seconds=1800.0)
+# Parsed Stage 2 / Stage 3 LLM results, keyed by llm_result_key()
+LLM_RESULT_CACHE = TTLCache[object](
+    name="llm_result",
+    ttl_seconds=LLM_RESULT_CACHE_TTL_S,
+    max_entries=LLM_RESULT_CACHE_MAX_ENTRIES,
+)
@@ -9,9 +9,11 @@ Tests the full flow:
 Run with: RECLAIM_USE_LLM=false pytest tests/integration/test_extraction_pipeline.py -v
 """
 
+import json
 from datetime import datetime
 
 import pytest
+from fastapi.exceptions import RequestValidationError
 
 from reclaim.returns.extractor import ExtractionResult, ReturnableReceiptExtractor
 from reclaim.returns.field_extractor import ReturnFieldExtractor
@@ -23,6 +25,76 @@ from reclaim.returns.returnability_classifier import (
     ReturnabilityResult,
 )
 
+# =============================================================================
+# Shared LLM Fixtures
+# =============================================================================
+
+
+class FakeLLM:
+    """Stand-in for an LLM call that records each call and answers with respond.
+
+    respond is the response text, or a callable (prompt, counter_prefix) ->
+    text that may raise to simulate a failed call.
+    """
+
+    def __init__(self, respond, default_prefix="llm"):
+        self.respond = respond
+        self.default_prefix = default_prefix
+        self.prompts = []
+        self.calls = []  # counter_prefix of each call
+
+    def __call__(self, prompt, counter_prefix=None, **_kwargs):
+        counter_prefix = counter_prefix or self.default_prefix
+        self.prompts.append(prompt)
+        self.calls.append(counter_prefix)
+        if callable(self.respond):
+            return self.respond(prompt, counter_prefix)
+        return self.respond
+
+    async def call_async(self, prompt, counter_prefix=None, **kwargs):
+        return self(prompt, counter_prefix, **kwargs)
+
+
+@pytest.fixture
+def llm_enabled(monkeypatch):
+    """Turn the LLM feature flag on, with an empty LLM result cache."""
+    from reclaim.storage.cache import LLM_RESULT_CACHE
+
+    monkeypatch.setenv("RECLAIM_USE_LLM", "true")
+    LLM_RESULT_CACHE.clear()
+    yield
+    LLM_RESULT_CACHE.clear()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Factory patching target.attr with a FakeLLM (its call_async for *_async attrs)."""
+
+    def install(target, attr, respond, default_prefix="llm"):
+        fake = FakeLLM(respond, default_prefix)
+        monkeypatch.setattr(target, attr, fake.call_async if attr.endswith("_async") else fake)
+        return fake
+
+    return install
+
+
+@pytest.fixture
+def field_extractor(fake_llm):
+    """Factory for a ReturnFieldExtractor on default merchant rules with a fake LLM.
+
+    The prompts sent to the LLM are recorded in the extractor's llm_calls.
+    """
+
+    def make(respond):
+        extractor = ReturnFieldExtractor(
+            merchant_rules={"merchants": {"_default": {"days": 30, "anchor": "delivery"}}}
+        )
+        extractor.llm_calls = fake_llm(extractor, "_call_llm_with_retry", respond).prompts
+        return extractor
+
+    return make
+
+
 # =============================================================================
 # Stage 1: Domain Filter Tests
 # =============================================================================
@@ -358,6 +430,91 @@ class TestBatchProcessing:
         # Second email might pass (unknown store with shopping keywords)
         # Depending on LLM status, could be success or rejected at classifier
 
+    def test_parallel_batch_preserves_input_order(self, extractor, monkeypatch):
+        """Parallel mode returns per-email results in input order."""
+        import time as _time
+
+        original = extractor.extract_from_email
+
+        def slow_first(*args, **kwargs):
+            # Make earlier emails finish last to exercise reordering
+            if kwargs["email_id"] == "msg_0":
+                _time.sleep(0.05)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(extractor, "extract_from_email", slow_first)
+        domains = ["uber.com", "netflix.com", "lyft.com", "hulu.com", "venmo.com", "xbox.com"]
+        emails = [
+            {
+                "id": f"msg_{i}",
+                "from": f"noreply@{domain}",
+                "subject": "Your receipt",
+                "body": "Thanks for being a customer.",
+            }
+            for i, domain in enumerate(domains)
+        ]
+
+        sequential = extractor.process_email_batch("test_user", emails, max_workers=1)
+        parallel = extractor.process_email_batch("test_user", emails, max_workers=4)
+
+        assert [r.filter_result.domain for r in sequential] == domains
+        assert [r.filter_result.domain for r in parallel] == domains
+
+    def test_async_batch_matches_sync(self, extractor, monkeypatch):
+        """process_email_batch_async produces the same results as the sync path."""
+        import asyncio
+
+        monkeypatch.setenv("RECLAIM_USE_LLM", "false")
+        emails = [
+            {
+                "id": "msg_1",
+                "from": "noreply@uber.com",
+                "subject": "Your trip receipt",
+                "body": "Thanks for riding.",
+            },
+            {
+                "id": "msg_2",
+                "from": "orders@unknownstore.com",
+                "subject": "Order confirmation #12345",
+                "body": "Your order #ABC-12345 has been confirmed. Track your package.",
+            },
+        ]
+
+        sync_results = extractor.process_email_batch("test_user", emails, max_workers=1)
+        async_results = asyncio.run(
+            extractor.process_email_batch_async("test_user", emails, max_concurrency=2)
+        )
+
+        assert [(r.success, r.stage_reached) for r in async_results] == [
+            (r.success, r.stage_reached) for r in sync_results
+        ]
+        cards = [r.card for r in async_results if r.card]
+        assert [c.order_number for c in cards] == ["ABC-12345"]
+
+    def test_ndjson_stream_emits_result_per_email_then_complete(self, extractor, monkeypatch):
+        """Streaming mode emits one result line per email and a final complete line."""
+        import asyncio
+        import json
+
+        from reclaim.api.routes.extract import _stream_extraction
+
+        monkeypatch.setenv("RECLAIM_USE_LLM", "false")
+        emails = [
+            {"id": "msg_1", "from": "noreply@uber.com", "subject": "Trip", "body": "Thanks."},
+            {"id": "msg_2", "from": "noreply@netflix.com", "subject": "Bill", "body": "Paid."},
+        ]
+
+        async def collect():
+            return [line async for line in _stream_extraction(extractor, "test_user", emails)]
+
+        events = [json.loads(line) for line in asyncio.run(collect())]
+
+        assert [e["type"] for e in events] == ["result", "result", "complete"]
+        by_index = {e["index"]: e["item"] for e in events[:2]}
+        assert by_index[0]["email_id"] == "msg_1"
+        assert by_index[1]["email_id"] == "msg_2"
+        assert events[-1]["stats"]["rejected_filter"] == 2
+
 
 # =============================================================================
 # Cross-Email Cancellation Suppression Tests
@@ -697,5 +854,2073 @@ class TestEmptyCardRejection:
         assert "empty_card" in (result.rejection_reason or "")
 
 
+# =============================================================================
+# Shared Pipeline / Merchant Rules Hot Reload Tests
+# =============================================================================
+
+
+class TestMerchantRulesStore:
+    """Test the process-wide merchant rules snapshot and hot reload."""
+
+    def _write(self, path, days):
+        path.write_text(f"merchants:\n  example.com:\n    days: {days}\n    anchor: delivery\n")
+
+    def test_reloads_on_content_change(self, tmp_path):
+        """A changed file produces a new snapshot with the new rules."""
+        import os
+
+        from reclaim.returns.merchant_rules import MerchantRulesStore
+
+        rules_path = tmp_path / "merchant_rules.yaml"
+        self._write(rules_path, 30)
+        store = MerchantRulesStore(rules_path, check_interval_s=0)
+        first = store.current()
+        assert first.rules["merchants"]["example.com"]["days"] == 30
+
+        self._write(rules_path, 60)
+        os.utime(rules_path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+        second = store.current()
+
+        assert second.digest != first.digest
+        assert second.rules["merchants"]["example.com"]["days"] == 60
+
+    def test_touch_without_change_keeps_rules(self, tmp_path):
+        """Touching the file without changing content keeps the same rules object."""
+        import os
+
+        from reclaim.returns.merchant_rules import MerchantRulesStore
+
+        rules_path = tmp_path / "merchant_rules.yaml"
+        self._write(rules_path, 30)
+        store = MerchantRulesStore(rules_path, check_interval_s=0)
+        first = store.current()
+
+        os.utime(rules_path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+        second = store.current()
+
+        assert second.rules is first.rules
+        assert second.digest == first.digest
+
+    def test_invalid_yaml_keeps_previous_snapshot(self, tmp_path):
+        """A rules file that fails to parse does not replace the live rules."""
+        import os
+
+        from reclaim.returns.merchant_rules import MerchantRulesStore
+
+        rules_path = tmp_path / "merchant_rules.yaml"
+        self._write(rules_path, 30)
+        store = MerchantRulesStore(rules_path, check_interval_s=0)
+        first = store.current()
+
+        rules_path.write_text("merchants: [unclosed")
+        os.utime(rules_path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+
+        assert store.current() is first
+
+    def test_shared_extractor_is_reused(self):
+        """get_extractor() returns the same instance while rules are unchanged."""
+        from reclaim.returns.extractor import get_extractor, reset_extractor
+
+        reset_extractor()
+        first = get_extractor()
+        assert get_extractor() is first
+        assert first.domain_filter.merchant_rules is first.merchant_rules
+
+
+# =============================================================================
+# Background Extraction Job Tests
+# =============================================================================
+
+
+class TestExtractionJobs:
+    """Test the bounded in-process extraction job queue."""
+
+    EMAILS = [
+        {"id": "msg_1", "from": "noreply@uber.com", "subject": "Trip", "body": "Thanks."},
+        {"id": "msg_2", "from": "noreply@netflix.com", "subject": "Bill", "body": "Paid."},
+    ]
+
+    def test_job_runs_to_completion(self, monkeypatch):
+        """A submitted job records per-email progress and final results."""
+        import asyncio
+
+        from reclaim.returns.jobs import ExtractionJobManager, JobStatus
+
+        monkeypatch.setenv("RECLAIM_USE_LLM", "false")
+
+        async def run():
+            manager = ExtractionJobManager(max_workers=1, max_queue_depth=2)
+            job = manager.submit("test_user", list(self.EMAILS))
+            assert job.status == JobStatus.QUEUED
+            while not job.done:
+                await job.wait_for_change()
+            await manager.shutdown()
+            return job
+
+        job = asyncio.run(run())
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.completed == 2
+        assert sorted(index for index, _ in job.progress) == [0, 1]
+        assert [r.success for r in job.results] == [False, False]
+        assert job.emails == []  # bodies released once finished
+
+    def test_stream_sends_progress_made_while_suspended(self):
+        """Progress landing while the stream waits on its client is sent without a later update."""
+        import asyncio
+
+        from reclaim.api.routes.extract import _stream_job
+        from reclaim.returns.jobs import ExtractionJob, JobStatus
+
+        def rejected():
+            return ExtractionResult(success=False, rejection_reason="filter:blocklist")
+
+        async def run():
+            job = ExtractionJob(
+                id="job_1",
+                user_id="test_user",
+                emails=[],
+                email_ids=["msg_1", "msg_2"],
+                total=2,
+                status=JobStatus.RUNNING,
+                progress=[(0, rejected())],
+            )
+            stream = _stream_job(job)
+            first = await anext(stream)
+            # Lands while the generator is suspended in its yield
+            job.progress.append((1, rejected()))
+            job._notify()
+            second = await asyncio.wait_for(anext(stream), timeout=1)
+            await stream.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert '"msg_1"' in first
+        assert '"msg_2"' in second
+
+    def test_queue_depth_limit(self):
+        """Submitting beyond the queue depth raises JobQueueFullError."""
+        import asyncio
+
+        from reclaim.returns.jobs import ExtractionJobManager, JobQueueFullError
+
+        async def run():
+            manager = ExtractionJobManager(max_workers=1, max_queue_depth=1)
+            manager.submit("test_user", list(self.EMAILS))
+            try:
+                with pytest.raises(JobQueueFullError):
+                    manager.submit("test_user", list(self.EMAILS))
+            finally:
+                await manager.shutdown()
+
+        asyncio.run(run())
+
+    def test_per_user_job_limit(self):
+        """One user's queued and running jobs count against their cap, not others'."""
+        import asyncio
+
+        from reclaim.returns.jobs import ExtractionJobManager, JobUserLimitError
+
+        async def run():
+            manager = ExtractionJobManager(max_workers=1, max_queue_depth=5, max_jobs_per_user=2)
+            manager.submit("busy_user", list(self.EMAILS))
+            manager.submit("busy_user", list(self.EMAILS))
+            try:
+                await asyncio.sleep(0)  # first job is picked up and running
+                with pytest.raises(JobUserLimitError):
+                    manager.submit("busy_user", list(self.EMAILS))
+                assert manager.active_jobs("busy_user") == 2
+                manager.submit("other_user", list(self.EMAILS))
+            finally:
+                await manager.shutdown()
+
+        asyncio.run(run())
+
+    def test_jobs_are_scoped_to_user(self):
+        """Another user's job id looks the same as a missing one."""
+        import asyncio
+
+        from reclaim.returns.jobs import ExtractionJobManager
+
+        async def run():
+            manager = ExtractionJobManager(max_workers=1, max_queue_depth=1)
+            job = manager.submit("owner", list(self.EMAILS))
+            try:
+                assert manager.get(job.id, "owner") is job
+                assert manager.get(job.id, "someone_else") is None
+            finally:
+                await manager.shutdown()
+
+        asyncio.run(run())
+
+
+# =============================================================================
+# LLM Request Coalescing Tests
+# =============================================================================
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight LLM calls."""
+
+    def test_key_covers_instruction_prompt_and_schema(self):
+        """Any difference in instruction, prompt or schema gives a different key."""
+        from reclaim.llm.singleflight import llm_call_key
+
+        base = llm_call_key("prompt", "system", {"type": "object"})
+        assert base == llm_call_key("prompt", "system", {"type": "object"})
+        assert base != llm_call_key("prompt2", "system", {"type": "object"})
+        assert base != llm_call_key("prompt", "system2", {"type": "object"})
+        assert base != llm_call_key("prompt", "system", None)
+
+    def test_concurrent_threads_share_one_call(self):
+        """Threads calling with the same key while in flight share one result."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from reclaim.llm.singleflight import SingleFlight
+
+        flight = SingleFlight("test")
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def upstream():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "key", upstream) for _ in range(3)]
+            started.wait(timeout=5)
+            # Let the followers reach the in-flight call before it finishes
+            threading.Event().wait(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["response"] * 3
+        assert len(calls) == 1
+
+    def test_async_callers_share_result_and_error(self):
+        """Coroutines with the same key share the outcome, including exceptions."""
+        import asyncio
+
+        from reclaim.llm.singleflight import AsyncSingleFlight
+
+        flight = AsyncSingleFlight("test")
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise TimeoutError("upstream timed out")
+
+        async def run():
+            return await asyncio.gather(
+                flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(isinstance(r, TimeoutError) for r in results)
+        assert flight._tasks == {}
+
+    def test_key_released_after_call(self):
+        """Coalescing only spans in-flight calls; later calls run again."""
+        from reclaim.llm.singleflight import SingleFlight
+
+        flight = SingleFlight("test")
+        calls = []
+
+        def upstream():
+            calls.append(1)
+            return len(calls)
+
+        assert flight.do("key", upstream) == 1
+        assert flight.do("key", upstream) == 2
+
+
+# =============================================================================
+# LLM Result Cache Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestLLMResultCache:
+    """Test the content-addressed cache in front of the Stage 2/3 LLM calls."""
+
+    CLASSIFIER_JSON = (
+        '{"reason": "Physical product", "is_returnable": true, '
+        '"confidence": 0.9, "receipt_type": "product_order"}'
+    )
+
+    def test_classifier_rescan_hits_cache(self, fake_llm):
+        """Classifying the same email twice makes one LLM call."""
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(classifier, "_call_llm_with_retry", self.CLASSIFIER_JSON, "classifier")
+
+        first = classifier.classify("orders@shop.com", "Your order", "Order #12345 shipped")
+        second = classifier.classify("orders@shop.com", "Your order", "Order #12345 shipped")
+        classifier.classify("orders@shop.com", "Your order", "Your sweater shipped")
+
+        assert first.is_returnable and second.is_returnable
+        assert len(llm.calls) == 2  # second scan was served from cache
+
+    def test_classifier_parse_fallback_not_cached(self, fake_llm):
+        """Unparseable responses are not cached, so the next scan asks again."""
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(classifier, "_call_llm_with_retry", "not json", "classifier")
+
+        classifier.classify("orders@shop.com", "Your order", "Order #12345 shipped")
+        result = classifier.classify("orders@shop.com", "Your order", "Order #12345 shipped")
+
+        assert result.reason == "parse_error_fallback"
+        assert len(llm.calls) == 2
+
+    def test_extractor_rescan_hits_cache(self, field_extractor):
+        """Stage 3 reuses parsed fields for an identical prompt."""
+        extractor = field_extractor('{"merchant_name": "Shop", "item_summary": "Blue sweater"}')
+        received_at = datetime(2026, 1, 10)
+
+        first = extractor._extract_with_llm("orders@shop.com", "Order", "Body", received_at)
+        first["item_summary"] = "mutated by caller"
+        second = extractor._extract_with_llm("orders@shop.com", "Order", "Body", received_at)
+
+        assert second["item_summary"] == "Blue sweater"
+        assert len(extractor.llm_calls) == 1
+
+    def test_key_depends_on_schema_version(self):
+        """Bumping a stage's schema version invalidates its cached results."""
+        from reclaim.storage.cache import llm_result_key
+
+        assert llm_result_key("prompt", "system", "1") != llm_result_key("prompt", "system", "2")
+
+    def test_lru_bound_evicts_least_recently_used(self):
+        """A bounded cache evicts the entry that was used least recently."""
+        from reclaim.storage.cache import TTLCache
+
+        cache = TTLCache[int](name="test_lru", ttl_seconds=60, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+# =============================================================================
+# Combined Classify+Extract Mode Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestCombinedLLMMode:
+    """Test the single-call Stage 2+3 engine."""
+
+    EMAIL = {
+        "user_id": "test_user",
+        "email_id": "msg_1",
+        "from_address": "orders@unknownstore.com",
+        "subject": "Order confirmation #12345",
+        "body": "Your order #ABC-12345 has been confirmed. Blue wool sweater. Track your package.",
+        "received_at": datetime(2026, 1, 10),
+    }
+
+    @staticmethod
+    def _fake_call_llm(fake_llm, response):
+        import reclaim.llm.retry
+
+        return fake_llm(reclaim.llm.retry, "call_llm", response)
+
+    def test_returnable_email_uses_one_call(self, fake_llm):
+        """A returnable email is classified and extracted by one LLM call."""
+        llm = self._fake_call_llm(
+            fake_llm,
+            '{"reason": "Physical product", "is_returnable": true, "confidence": 0.9, '
+            '"receipt_type": "product_order", "merchant_name": "Unknown Store", '
+            '"item_summary": "Blue wool sweater", "return_window_days": 30}',
+        )
+        extractor = ReturnableReceiptExtractor(llm_mode="combined")
+
+        result = extractor.extract_from_email(**self.EMAIL)
+
+        assert llm.calls == ["combined"]
+        assert result.success
+        assert result.card.item_summary == "Blue wool sweater"
+        assert result.card.order_number == "ABC-12345"  # rules fields still merged
+
+    def test_not_returnable_rejected_at_classifier(self, fake_llm):
+        """A negative verdict rejects at Stage 2 and ignores extraction fields."""
+        llm = self._fake_call_llm(
+            fake_llm,
+            '{"reason": "Subscription", "is_returnable": false, "confidence": 0.9, '
+            '"receipt_type": "subscription", "merchant_name": null, "item_summary": null}',
+        )
+        extractor = ReturnableReceiptExtractor(llm_mode="combined")
+
+        result = extractor.extract_from_email(**self.EMAIL)
+
+        assert llm.calls == ["combined"]
+        assert not result.success
+        assert result.stage_reached.value == "classifier"
+
+    def test_mode_report_covers_both_modes(self):
+        """The report lists latency and token figures for each mode."""
+        from reclaim.returns.combined_stage import get_llm_mode_report
+
+        report = get_llm_mode_report()
+
+        assert set(report) == {"two_call", "combined"}
+        assert "prompt_tokens_per_email" in report["combined"]
+
+    def test_unknown_mode_rejected(self):
+        """A typo in the deployment setting fails fast."""
+        with pytest.raises(ValueError):
+            ReturnableReceiptExtractor(llm_mode="single")
+
+
+# =============================================================================
+# Packed Classifier Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestPackedClassifier:
+    """Test classifying several emails in one Stage 2 LLM call."""
+
+    EMAILS = [
+        ("orders@shop.com", "Your order", "Blue wool sweater shipped"),
+        ("billing@stream.tv", "Your receipt", "Monthly subscription renewed"),
+        ("orders@shoes.com", "Order confirmed", "Running shoes on the way"),
+    ]
+
+    @staticmethod
+    def _verdict(index, returnable):
+        return {
+            "index": index,
+            "reason": "Physical product" if returnable else "Subscription",
+            "is_returnable": returnable,
+            "confidence": 0.9,
+            "receipt_type": "product_order" if returnable else "subscription",
+        }
+
+    def test_one_call_for_pack(self, fake_llm):
+        """Three emails are classified by a single packed call, in order."""
+        import json
+
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(
+            classifier,
+            "_call_llm_with_retry",
+            json.dumps([self._verdict(2, True), self._verdict(1, False), self._verdict(0, True)]),
+            "classifier",
+        )
+
+        results = classifier.classify_packed(self.EMAILS)
+
+        assert llm.calls == ["classifier_packed"]
+        assert [r.is_returnable for r in results] == [True, False, True]
+
+    def test_missing_item_falls_back_to_single_call(self, fake_llm):
+        """An email absent from the packed answer is classified on its own."""
+        import json
+
+        def respond(_prompt, counter_prefix):
+            if counter_prefix == "classifier_packed":
+                return json.dumps([self._verdict(0, True), self._verdict(2, True)])
+            return json.dumps(self._verdict(1, False))
+
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(classifier, "_call_llm_with_retry", respond, "classifier")
+
+        results = classifier.classify_packed(self.EMAILS)
+
+        assert llm.calls == ["classifier_packed", "classifier"]
+        assert [r.is_returnable for r in results] == [True, False, True]
+
+    def test_malformed_item_falls_back_to_single_call(self, fake_llm):
+        """An item with a valid index but invalid fields is retried on its own."""
+        import asyncio
+        import json
+
+        from reclaim.storage.cache import LLM_RESULT_CACHE
+
+        def respond(_prompt, counter_prefix):
+            if counter_prefix == "classifier_packed":
+                malformed = {**self._verdict(1, True), "is_returnable": "garbage"}
+                return json.dumps([self._verdict(0, True), malformed, self._verdict(2, True)])
+            return json.dumps(self._verdict(1, False))
+
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(classifier, "_call_llm_with_retry", respond, "classifier")
+        llm_async = fake_llm(classifier, "_call_llm_with_retry_async", respond, "classifier")
+
+        results = classifier.classify_packed(self.EMAILS)
+
+        assert llm.calls == ["classifier_packed", "classifier"]
+        assert [r.is_returnable for r in results] == [True, False, True]
+        assert results[1].reason == "Subscription"
+
+        LLM_RESULT_CACHE.clear()
+        results = asyncio.run(classifier.classify_packed_async(self.EMAILS))
+
+        assert llm_async.calls == ["classifier_packed", "classifier"]
+        assert [r.is_returnable for r in results] == [True, False, True]
+
+    def test_packed_verdicts_cached_per_email(self, fake_llm):
+        """A later single-email scan is served from the packed call's results."""
+        import json
+
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(
+            classifier,
+            "_call_llm_with_retry",
+            json.dumps([self._verdict(i, True) for i in range(3)]),
+            "classifier",
+        )
+
+        classifier.classify_packed(self.EMAILS)
+        result = classifier.classify(*self.EMAILS[0])
+
+        assert result.is_returnable
+        assert llm.calls == ["classifier_packed"]
+
+    def test_packed_call_failure_rejects_items(self, fake_llm):
+        """An LLM outage rejects the pack without per-email retries."""
+
+        def respond(_prompt, _counter_prefix):
+            raise RuntimeError("upstream unavailable")
+
+        classifier = ReturnabilityClassifier()
+        llm = fake_llm(classifier, "_call_llm_with_retry", respond, "classifier")
+
+        results = classifier.classify_packed(self.EMAILS)
+
+        assert llm.calls == ["classifier_packed"]
+        assert not any(r.is_returnable for r in results)
+
+    def test_batch_preclassifies_in_packs(self, fake_llm):
+        """process_email_batch classifies its candidates in one packed call."""
+        import json
+
+        extractor = ReturnableReceiptExtractor()
+        llm = fake_llm(
+            extractor.returnability_classifier,
+            "_call_llm_with_retry",
+            json.dumps([self._verdict(i, False) for i in range(3)]),
+            "classifier",
+        )
+        emails = [
+            {"id": f"msg_{i}", "from": from_address, "subject": subject, "body": body}
+            for i, (from_address, subject, body) in enumerate(self.EMAILS)
+        ]
+
+        results = extractor.process_email_batch("test_user", emails, max_workers=1)
+
+        assert llm.calls == ["classifier_packed"]
+        assert len(results) == 3
+
+    def test_batch_converts_html_once_per_email(self, fake_llm, monkeypatch):
+        """The packing pre-pass hands its HTML-to-text output to the per-email pass."""
+        import json
+
+        from reclaim.returns import extractor as extractor_module
+
+        extractor = ReturnableReceiptExtractor()
+        fake_llm(
+            extractor.returnability_classifier,
+            "_call_llm_with_retry",
+            json.dumps([self._verdict(i, False) for i in range(3)]),
+            "classifier",
+        )
+        converted = []
+        html_to_text = extractor_module.html_to_text
+
+        def counting_html_to_text(html, **kwargs):
+            converted.append(html)
+            return html_to_text(html, **kwargs)
+
+        monkeypatch.setattr(extractor_module, "html_to_text", counting_html_to_text)
+        emails = [
+            {
+                "id": f"msg_{i}",
+                "from": from_address,
+                "subject": subject,
+                "body": "",
+                "body_html": f"<p>{body}</p>",
+            }
+            for i, (from_address, subject, body) in enumerate(self.EMAILS)
+        ]
+
+        extractor.process_email_batch("test_user", emails, max_workers=2)
+
+        assert sorted(converted) == sorted(email["body_html"] for email in emails)
+
+
+# =============================================================================
+# Cross-Request Micro-Batching Tests
+# =============================================================================
+
+
+class TestMicroBatcher:
+    """Test collecting concurrent LLM requests into batched dispatches."""
+
+    def test_concurrent_submits_share_one_dispatch(self):
+        """Items submitted together are dispatched once and fanned back out in order."""
+        import asyncio
+
+        from reclaim.llm.microbatch import MicroBatcher
+
+        batches = []
+
+        async def dispatch(items):
+            batches.append(items)
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher("test_share", dispatch, max_batch_size=4, max_wait_s=0.05)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+        assert asyncio.run(run()) == [0, 10, 20, 30]
+        assert batches == [[0, 1, 2, 3]]
+        assert batcher.stats()["fill_ratio"] == 1.0
+
+    def test_partial_batch_flushed_after_max_wait(self):
+        """A lone request is not held past the maximum wait."""
+        import asyncio
+
+        from reclaim.llm.microbatch import MicroBatcher
+
+        async def dispatch(items):
+            return items
+
+        batcher = MicroBatcher("test_wait", dispatch, max_batch_size=8, max_wait_s=0.01)
+
+        assert asyncio.run(asyncio.wait_for(batcher.submit("x"), timeout=1)) == "x"
+        stats = batcher.stats()
+        assert stats["batches"] == 1
+        assert stats["fill_ratio"] == 1 / 8
+        assert stats["queue_wait_p50_ms"] > 0
+
+    def test_dispatch_failure_reaches_every_caller(self):
+        """If the batched call fails, each waiting caller sees the error."""
+        import asyncio
+
+        from reclaim.llm.microbatch import MicroBatcher
+
+        async def dispatch(_items):
+            raise TimeoutError("upstream timeout")
+
+        batcher = MicroBatcher("test_fail", dispatch, max_batch_size=2, max_wait_s=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(1), batcher.submit(2), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, TimeoutError) for r in results)
+
+    @pytest.mark.usefixtures("llm_enabled")
+    def test_classifier_batches_concurrent_requests(self, fake_llm):
+        """Concurrent classify_async calls become one packed LLM call."""
+        import asyncio
+        import json
+
+        classifier = ReturnabilityClassifier(microbatch=True)
+        llm = fake_llm(
+            classifier,
+            "_call_llm_with_retry_async",
+            json.dumps(
+                [
+                    {
+                        "index": i,
+                        "reason": "Physical product",
+                        "is_returnable": True,
+                        "confidence": 0.9,
+                        "receipt_type": "product_order",
+                    }
+                    for i in range(3)
+                ]
+            ),
+            "classifier",
+        )
+
+        async def run():
+            return await asyncio.gather(
+                classifier.classify_async("orders@a.com", "Order", "Blue sweater"),
+                classifier.classify_async("orders@b.com", "Order", "Red scarf"),
+                classifier.classify_async("orders@c.com", "Order", "Green hat"),
+            )
+
+        results = asyncio.run(run())
+
+        assert llm.calls == ["classifier_packed"]
+        assert all(r.is_returnable for r in results)
+
+    @pytest.mark.usefixtures("llm_enabled")
+    def test_extractor_missing_item_retried_alone(self, fake_llm):
+        """An email the packed extraction skipped gets its own call."""
+        import asyncio
+        import json
+
+        def respond(_prompt, counter_prefix):
+            if counter_prefix == "extractor_packed":
+                return json.dumps([{"index": 0, "merchant_name": "A", "item_summary": "Sweater"}])
+            return json.dumps({"merchant_name": "B", "item_summary": "Scarf"})
+
+        extractor = ReturnFieldExtractor(microbatch=True)
+        llm = fake_llm(extractor, "_call_llm_with_retry_async", respond, "extractor")
+        received_at = datetime(2026, 1, 10)
+
+        async def run():
+            return await asyncio.gather(
+                extractor._extract_with_llm_async("orders@a.com", "Order", "Body A", received_at),
+                extractor._extract_with_llm_async("orders@b.com", "Order", "Body B", received_at),
+            )
+
+        first, second = asyncio.run(run())
+
+        assert llm.calls == ["extractor_packed", "extractor"]
+        assert first["item_summary"] == "Sweater"
+        assert second["item_summary"] == "Scarf"
+
+
+# =============================================================================
+# Stage Timing Tests
+# =============================================================================
+
+
+class TestStageTimings:
+    """Test per-stage latency collection and the Server-Timing breakdown."""
+
+    EMAILS = [
+        {
+            "id": "msg_1",
+            "from": "orders@unknownstore.com",
+            "subject": "Order confirmation",
+            "body": "Your order #12345 has been confirmed.",
+        },
+        {
+            "id": "msg_2",
+            "from": "receipts@uber.com",
+            "subject": "Your trip receipt",
+            "body": "Thanks for riding with Uber.",
+        },
+    ]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_batch_stages_collected(self, max_workers):
+        """Every stage an email passes through is timed, including in worker threads."""
+        from reclaim.observability.telemetry import collect_timings
+        from reclaim.returns.extractor import stage_timings
+
+        extractor = ReturnableReceiptExtractor()
+
+        with collect_timings() as timings:
+            extractor.process_email_batch("test_user", self.EMAILS, max_workers=max_workers)
+
+        stages = stage_timings(timings)
+        assert stages["filter"][1] == 2
+        assert stages["classifier"][1] == 1  # Uber rejected at Stage 1
+        assert "dedup" in stages and "cancellation" in stages
+
+    def test_async_batch_stages_collected(self):
+        """Stages timed inside event-loop tasks reach the enclosing scope."""
+        import asyncio
+
+        from reclaim.observability.telemetry import collect_timings
+        from reclaim.returns.extractor import stage_timings
+
+        extractor = ReturnableReceiptExtractor()
+
+        async def run():
+            with collect_timings() as timings:
+                await extractor.process_email_batch_async("test_user", self.EMAILS)
+            return timings
+
+        stages = stage_timings(asyncio.run(run()))
+        assert stages["filter"][1] == 2
+
+    def test_server_timing_header_format(self):
+        """Stages become Server-Timing metrics with the call count as description."""
+        from reclaim.api.routes.extract import ExtractStageTiming, _server_timing
+
+        header = _server_timing(
+            {
+                "filter": ExtractStageTiming(total_ms=0.4, calls=2),
+                "classifier": ExtractStageTiming(total_ms=812.5, calls=1),
+            },
+            duration_ms=815.04,
+        )
+
+        assert header == (
+            'filter;dur=0.4;desc="2 calls", classifier;dur=812.5;desc="1 calls", total;dur=815.0'
+        )
+
+
+# =============================================================================
+# Deadline Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestExtractionDeadline:
+    """Test degrading to rules-only extraction when the request deadline runs out."""
+
+    EMAIL = {
+        "id": "msg_1",
+        "from": "orders@unknownstore.com",
+        "subject": "Order confirmation #12345",
+        "body": "Your order #ABC-12345 has been confirmed. Blue wool sweater.",
+    }
+
+    def test_no_budget_holds_back_unclassified(self, monkeypatch):
+        """With no time for the classifier the candidate comes back degraded, without a card."""
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+
+        def no_llm(*_args, **_kwargs):
+            raise AssertionError("LLM called past the deadline")
+
+        monkeypatch.setattr(extractor.returnability_classifier, "classify", no_llm)
+
+        results = extractor.process_email_batch(
+            "test_user", [self.EMAIL], deadline=Deadline.after(0)
+        )
+
+        assert not results[0].success
+        assert results[0].degraded
+        assert results[0].card is None
+        assert results[0].rejection_reason == "deadline:unclassified"
+
+    def test_no_budget_after_verdict_extracts_by_rules(self, monkeypatch):
+        """A candidate the classifier accepted still gets a rules-only card when time runs out."""
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        deadline = Deadline.after(60)
+
+        def classify_then_run_out(*_args, **_kwargs):
+            deadline.expires_at = 0
+            return ReturnabilityResult.returnable("Physical product", confidence=0.9)
+
+        monkeypatch.setattr(extractor.returnability_classifier, "classify", classify_then_run_out)
+
+        results = extractor.process_email_batch("test_user", [self.EMAIL], deadline=deadline)
+
+        assert results[0].success
+        assert results[0].degraded
+        assert results[0].card.order_number == "ABC-12345"
+
+    def test_async_slow_llm_cut_off_at_deadline(self, monkeypatch):
+        """An LLM call still running at the deadline is abandoned for the rules path."""
+        import asyncio
+        import time
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+
+        async def slow_classify(*_args, **_kwargs):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(extractor.returnability_classifier, "classify_async", slow_classify)
+
+        started = time.monotonic()
+        results = asyncio.run(
+            extractor.process_email_batch_async(
+                "test_user", [self.EMAIL], deadline=Deadline.after(0.2, llm_reserve_s=0)
+            )
+        )
+
+        assert time.monotonic() - started < 2
+        assert results[0].degraded and results[0].card is None
+
+    def test_thread_pool_slow_llm_cut_off_at_deadline(self, monkeypatch):
+        """The thread-pool path returns on time without waiting for stuck calls."""
+        import threading
+        import time
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        release = threading.Event()
+
+        def stuck_classify(*_args, **_kwargs):
+            release.wait(5)
+            raise RuntimeError("released")
+
+        monkeypatch.setattr(extractor.returnability_classifier, "classify", stuck_classify)
+        monkeypatch.setattr(extractor.returnability_classifier, "classify_packed", stuck_classify)
+        emails = [self.EMAIL, {**self.EMAIL, "id": "msg_2", "subject": "Order #67890"}]
+
+        started = time.monotonic()
+        results = extractor.process_email_batch(
+            "test_user", emails, max_workers=2, deadline=Deadline.after(0.2, llm_reserve_s=0)
+        )
+        release.set()
+
+        assert time.monotonic() - started < 2
+        assert all(r.degraded for r in results)
+
+    def test_thread_pool_stuck_extractor_keeps_verdict(self, monkeypatch):
+        """An email cut off in Stage 3 still gets its rules-only card."""
+        import threading
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        release = threading.Event()
+
+        def stuck_extract(*_args, **_kwargs):
+            release.wait(5)
+            raise RuntimeError("released")
+
+        monkeypatch.setattr(
+            extractor.returnability_classifier,
+            "classify",
+            lambda *_args, **_kwargs: ReturnabilityResult.returnable("Physical product"),
+        )
+        monkeypatch.setattr(extractor.field_extractor, "extract", stuck_extract)
+        monkeypatch.setattr(extractor, "_preclassify", lambda *_args: ({}, None))
+        emails = [self.EMAIL, {**self.EMAIL, "id": "msg_2", "subject": "Order #67890"}]
+
+        results = extractor.process_email_batch(
+            "test_user", emails, max_workers=2, deadline=Deadline.after(0.3, llm_reserve_s=0)
+        )
+        release.set()
+
+        assert all(r.success and r.degraded for r in results)
+        assert results[0].card.order_number == "ABC-12345"
+
+    def test_async_cut_off_emails_keep_packed_verdicts(self, monkeypatch):
+        """Queued and in-flight emails fall back on the verdicts they already have."""
+        import asyncio
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+
+        async def packed(items):
+            return [
+                ReturnabilityResult.returnable("Physical product"),
+                ReturnabilityResult.not_returnable("Subscription", ReceiptType.SUBSCRIPTION),
+                ReturnabilityResult.returnable("Physical product"),
+            ][: len(items)]
+
+        async def slow_extract(*_args, **_kwargs):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(extractor.returnability_classifier, "classify_packed_async", packed)
+        monkeypatch.setattr(extractor.field_extractor, "extract_async", slow_extract)
+        emails = [
+            {
+                **self.EMAIL,
+                "id": f"msg_{i}",
+                "body": self.EMAIL["body"].replace("ABC-12345", f"ABC-1234{i}"),
+            }
+            for i in range(3)
+        ]
+
+        results = asyncio.run(
+            extractor.process_email_batch_async(
+                "test_user",
+                emails,
+                max_concurrency=1,
+                deadline=Deadline.after(0.3, llm_reserve_s=0),
+            )
+        )
+        by_id = {r.card.source_email_ids[0] if r.card else None: r for r in results}
+
+        assert set(by_id) == {"msg_0", "msg_2", None}
+        assert all(by_id[i].degraded for i in ("msg_0", "msg_2"))
+        assert by_id[None].rejection_reason.startswith("classifier:")
+
+    def _two_packs(self, monkeypatch):
+        """Four emails in packs of two; only the first pack's subjects say "fast"."""
+        from reclaim.returns import extractor as extractor_module
+
+        monkeypatch.setattr(extractor_module, "CLASSIFIER_PACK_SIZE", 2)
+        return [
+            {
+                **self.EMAIL,
+                "id": f"msg_{i}",
+                "subject": f"Order confirmation #{i} {'fast' if i < 2 else 'slow'}",
+                "body": self.EMAIL["body"].replace("ABC-12345", f"ABC-1234{i}"),
+            }
+            for i in range(4)
+        ]
+
+    @staticmethod
+    def _cards_by_email(results):
+        return {
+            r.card.source_email_ids[0]: r.degraded
+            for r in results
+            if r.success and r.card is not None
+        }
+
+    def test_thread_pool_keeps_packs_finished_by_deadline(self, monkeypatch):
+        """A pack that misses the deadline doesn't discard the verdicts of the others."""
+        import threading
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        emails = self._two_packs(monkeypatch)
+        release = threading.Event()
+
+        def packed(items):
+            if "slow" in items[0][1]:
+                release.wait(5)
+            return [ReturnabilityResult.returnable("Physical product") for _ in items]
+
+        def stuck(*_args, **_kwargs):
+            release.wait(5)
+            raise RuntimeError("released")
+
+        classifier = extractor.returnability_classifier
+        monkeypatch.setattr(classifier, "classify_packed", packed)
+        monkeypatch.setattr(classifier, "classify", stuck)
+        monkeypatch.setattr(extractor.field_extractor, "extract", stuck)
+
+        results = extractor.process_email_batch(
+            "test_user", emails, max_workers=4, deadline=Deadline.after(0.3, llm_reserve_s=0)
+        )
+        release.set()
+
+        assert self._cards_by_email(results) == {"msg_0": True, "msg_1": True}
+        assert all(r.degraded for r in results)
+
+    def test_async_keeps_packs_finished_by_deadline(self, monkeypatch):
+        """Async variant: finished packs are kept, the late one is cancelled."""
+        import asyncio
+
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        emails = self._two_packs(monkeypatch)
+
+        async def packed(items):
+            if "slow" in items[0][1]:
+                await asyncio.sleep(5)
+            return [ReturnabilityResult.returnable("Physical product") for _ in items]
+
+        async def slow(*_args, **_kwargs):
+            await asyncio.sleep(5)
+
+        classifier = extractor.returnability_classifier
+        monkeypatch.setattr(classifier, "classify_packed_async", packed)
+        monkeypatch.setattr(classifier, "classify_async", slow)
+        monkeypatch.setattr(extractor.field_extractor, "extract_async", slow)
+
+        results = asyncio.run(
+            extractor.process_email_batch_async(
+                "test_user", emails, deadline=Deadline.after(0.3, llm_reserve_s=0)
+            )
+        )
+
+        assert self._cards_by_email(results) == {"msg_0": True, "msg_1": True}
+        assert all(r.degraded for r in results)
+
+    def test_response_counts_degraded(self):
+        """Degraded results are flagged per item and counted in stats."""
+        from reclaim.api.routes.extract import _build_response
+        from reclaim.returns.deadline import Deadline
+
+        extractor = ReturnableReceiptExtractor()
+        results = extractor.process_email_batch(
+            "test_user", [self.EMAIL], deadline=Deadline.after(0)
+        )
+
+        response = _build_response(results, 1, "test_user")
+
+        assert response.stats.degraded == 1
+        assert response.stats.rejected_filter == 0
+        assert response.stats.cards_extracted == 0
+        assert response.results[0].degraded
+        assert response.results[0].card is None
+
+
+# =============================================================================
+# Stage 1 Pre-screen Endpoint Tests
+# =============================================================================
+
+
+class TestScreenEndpoint:
+    """Test the header-only Stage 1 pre-screen."""
+
+    def test_returns_only_stage1_candidates(self):
+        """Candidates match what Stage 1 of /extract would let through."""
+        import asyncio
+        from types import SimpleNamespace
+
+        from reclaim.api.routes.extract import ScreenEmail, ScreenRequest, screen_emails
+
+        request = ScreenRequest(
+            emails=[
+                ScreenEmail(
+                    email_id="msg_1",
+                    from_address="orders@unknownstore.com",
+                    subject="Order confirmation #12345",
+                    snippet="Your order has been confirmed.",
+                ),
+                ScreenEmail(
+                    email_id="msg_2",
+                    from_address="receipts@uber.com",
+                    subject="Your trip receipt",
+                ),
+            ]
+        )
+        user = SimpleNamespace(id="test_user", user_id="test_user")
+
+        response = asyncio.run(screen_emails(request, user))
+
+        assert response.candidate_ids == ["msg_1"]
+        assert response.total == 2
+        assert response.rejected == 1
+
+
+# =============================================================================
+# Body Compression Middleware Tests
+# =============================================================================
+
+
+class TestCompressionMiddleware:
+    """Test compressed request decoding, bomb limits and response negotiation."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI, Request
+        from fastapi.testclient import TestClient
+
+        from reclaim.api.middleware.compression import CompressionMiddleware
+
+        app = FastAPI()
+
+        @app.post("/echo")
+        async def echo(request: Request):
+            body = await request.body()
+            return {"size": len(body), "emails": len(json.loads(body)["emails"]), "pad": "x" * 2000}
+
+        app.add_middleware(CompressionMiddleware, max_decoded_bytes=5_000_000, max_ratio=50)
+        return TestClient(app)
+
+    def test_gzip_request_body_is_decoded(self, client):
+        """Routes see the decoded JSON with a matching Content-Length."""
+        import gzip
+
+        payload = json.dumps({"emails": [{"body": "<td>x</td>" * 100}] * 3}).encode()
+        response = client.post(
+            "/echo",
+            content=gzip.compress(payload),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["size"] == len(payload)
+        assert response.json()["emails"] == 3
+
+    def test_zip_bomb_is_rejected(self, client):
+        """A body that inflates past the ratio limit is cut off with 413."""
+        import gzip
+
+        bomb = gzip.compress(b"0" * 20_000_000)
+        response = client.post("/echo", content=bomb, headers={"Content-Encoding": "gzip"})
+
+        assert response.status_code == 413
+
+    @pytest.mark.parametrize(("encoding", "module"), [("br", "brotli"), ("zstd", "zstandard")])
+    def test_br_and_zstd_bombs_are_capped_per_call(self, client, encoding, module):
+        """br/zstd decoders stop at the output budget instead of inflating a whole slice."""
+        lib = pytest.importorskip(module)
+        from reclaim.api.middleware import compression
+
+        if encoding not in compression.DECODERS:
+            pytest.skip(f"{module} too old for bounded decoding")
+        raw = b"0" * 128_000_000
+        if encoding == "br":
+            bomb = lib.compress(raw, quality=4)
+        else:
+            bomb = lib.ZstdCompressor().compress(raw)
+
+        decoder = compression.DECODERS[encoding]()
+        with pytest.raises(compression.BodyDecodeError) as exc_info:
+            decoder.decode(bomb[: compression._DECODE_SLICE_BYTES], 1_000_000)
+        assert exc_info.value.reason == "too_large"
+
+        response = client.post("/echo", content=bomb, headers={"Content-Encoding": encoding})
+        assert response.status_code == 413
+
+    def test_unsupported_encoding_is_rejected(self, client):
+        """Unknown encodings get 415 and the list of supported ones."""
+        response = client.post("/echo", content=b"...", headers={"Content-Encoding": "lzma"})
+
+        assert response.status_code == 415
+        assert "gzip" in response.headers["accept-encoding"]
+
+    def test_response_compressed_when_accepted(self, client):
+        """Large responses use the negotiated encoding; identity clients get plain JSON."""
+        payload = json.dumps({"emails": []}).encode()
+
+        compressed = client.post("/echo", content=payload, headers={"Accept-Encoding": "gzip"})
+        plain = client.post("/echo", content=payload, headers={"Accept-Encoding": "identity"})
+
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed.headers["vary"]
+        assert compressed.json()["emails"] == 0
+        assert "content-encoding" not in plain.headers
+
+
+# =============================================================================
+# Fast Response Serialization Tests
+# =============================================================================
+
+
+class TestFastResponseSerialization:
+    """Test that the dict/orjson /extract response matches the pydantic models."""
+
+    def test_fast_payload_matches_model_serialization(self):
+        """Same JSON as ExtractResponse, for both cards and rejections."""
+        from reclaim.api.routes.extract import _build_response, _json_response, _response_payload
+        from reclaim.returns.models import ReturnCard
+        from reclaim.returns.types import ExtractionStage
+
+        card = ReturnCard(
+            id="test-id",
+            user_id="other",
+            merchant="Amazon",
+            merchant_domain="amazon.com",
+            item_summary="Nintendo Switch",
+            source_email_ids=["msg_1"],
+            amount=299.99,
+            order_date=datetime(2026, 1, 5),
+            return_by_date=datetime(2099, 2, 4),
+        )
+        results = [
+            ExtractionResult(success=True, card=card, stage_reached="complete"),
+            ExtractionResult(
+                success=False,
+                rejection_reason="filter:blocklisted_domain",
+                stage_reached=ExtractionStage.FILTER,
+            ),
+        ]
+
+        fast = json.loads(_json_response(_response_payload(results, 2, "test_user")).body)
+        model = json.loads(_build_response(results, 2, "test_user").model_dump_json())
+
+        assert fast == model
+        assert fast["stats"]["cards_extracted"] == 1
+        assert fast["stats"]["rejected_filter"] == 1
+        assert card.user_id == "test_user"
+
+
+# =============================================================================
+# Incremental Request Parsing Tests
+# =============================================================================
+
+
+class TestIncrementalExtraction:
+    """Test /extract/incremental: streamed parsing fed email by email."""
+
+    EMAILS = [
+        {
+            "email_id": "msg_1",
+            "from_address": "orders@unknownstore.com",
+            "subject": "Order confirmation #12345",
+            "body": "Thank you for your order. Order total: $49.99. " * 20,
+        },
+        {
+            "email_id": "msg_2",
+            "from_address": "receipts@uber.com",
+            "subject": "Your trip receipt",
+            "body": "Thanks for riding",
+        },
+    ]
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from reclaim.api.app import validation_exception_handler
+        from reclaim.api.middleware.user_auth import AuthenticatedUser, get_current_user
+        from reclaim.api.routes.extract import router
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_exception_handler(RequestValidationError, validation_exception_handler)
+        app.dependency_overrides[get_current_user] = lambda: AuthenticatedUser(
+            id="test_user", email="test@example.com"
+        )
+        return TestClient(app)
+
+    def test_json_items_parsed_across_chunk_boundaries(self):
+        """Items split over arbitrary chunk boundaries decode intact."""
+        import asyncio
+
+        from reclaim.utils.json_stream import iter_json_array_items
+
+        doc = {"meta": 1.5, "emails": [{"i": i, "html": '<td class="é">' * i} for i in range(30)]}
+        data = json.dumps(doc, ensure_ascii=False).encode()
+
+        async def chunks():
+            for start in range(0, len(data), 7):
+                yield data[start : start + 7]
+
+        async def collect():
+            other = {}
+            items = [item async for item in iter_json_array_items(chunks(), "emails", 10**6, other)]
+            return items, other
+
+        items, other = asyncio.run(collect())
+
+        assert items == doc["emails"]
+        assert other == {"meta": 1.5}
+
+    def test_matches_regular_extract(self, client):
+        """Same stats and rejections as /extract for the same batch."""
+        body = {"emails": self.EMAILS}
+
+        incremental = client.post("/api/extract/incremental", json=body).json()
+        regular = client.post("/api/extract", json=body).json()
+
+        assert incremental["stats"] == regular["stats"]
+        assert [r["rejection_reason"] for r in incremental["results"]] == [
+            r["rejection_reason"] for r in regular["results"]
+        ]
+
+    def test_invalid_email_is_rejected(self, client):
+        """Field validation errors get the same sanitized 422 as /extract."""
+        bad = {**self.EMAILS[0], "email_id": "../etc/passwd"}
+
+        response = client.post("/api/extract/incremental", json={"emails": [bad]})
+
+        assert response.status_code == 422
+        assert response.json()["invalid_fields"] == ["email_id"]
+
+    def test_malformed_body_is_rejected(self, client):
+        """Truncated JSON is a 422, not a 500."""
+        response = client.post(
+            "/api/extract/incremental",
+            content=b'{"emails": [{"email_id": "msg_1"',
+            headers={"Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 422
+
+
+# =============================================================================
+# HTML-to-Text Tests
+# =============================================================================
+
+
+class TestHtmlToText:
+    """Test the streaming HTML-to-text converter."""
+
+    HTML = (
+        "<html><head><title>Order</title><style>td{color:red}</style></head><body>"
+        "<div style='display:none;max-height:0;overflow:hidden'>Preview text</div>"
+        "<table><tr><td>Thanks for your order!</td></tr>\n\n\n"
+        "<tr><td>  Order Number: <b>112-9862455-9195428</b>  </td></tr></table>"
+        "<p>Returns &amp; Exchanges</p><script>track()</script></body></html>"
+    )
+
+    def test_visible_text_only(self):
+        """Head, style, script and hidden preheaders are dropped; lines normalized."""
+        from reclaim.utils.html import html_to_text
+
+        assert html_to_text(self.HTML) == (
+            "Thanks for your order!\n\nOrder Number:\n112-9862455-9195428\n\nReturns & Exchanges"
+        )
+
+    def test_budget_returns_exact_prefix(self):
+        """With max_chars, the output is the start of the full conversion."""
+        from reclaim.utils.html import html_to_text
+
+        html = self.HTML.replace("</table>", "<tr><td>Item</td></tr>" * 5000 + "</table>")
+        full = html_to_text(html)
+
+        for budget in (5, 40, 2000):
+            assert html_to_text(html, max_chars=budget) == full[:budget]
+
+
+# =============================================================================
+# Domain Resolver Tests
+# =============================================================================
+
+
+class TestDomainResolver:
+    """Test sender domain resolution shared by Stage 1 and Stage 3."""
+
+    RULES = {
+        "merchants": {
+            "gap.com": {"days": 30, "aliases": ["gapfactory.com"]},
+            "_default": {"days": 30},
+        }
+    }
+
+    def test_suffixes_and_shipping_services(self):
+        """Multi-label suffixes keep one more label; shipping subdomains name the merchant."""
+        from reclaim.returns.domains import DomainResolver
+
+        resolver = DomainResolver()
+
+        assert resolver.resolve("Amazon UK <auto@mail.amazon.co.uk>") == "amazon.co.uk"
+        assert resolver.resolve("news@mail.example.ac.uk") == "example.ac.uk"
+        assert resolver.resolve("br@bananarepublic.narvar.com") == "bananarepublic.com"
+        assert resolver.resolve("ORDERS@Ship.Store.Amazon.com ") == "amazon.com"
+
+    def test_aliases_shared_by_filter_and_extractor(self):
+        """An alias domain resolves to its merchant in Stage 1 and Stage 3 rule lookup."""
+        extractor = ReturnableReceiptExtractor(merchant_rules=self.RULES)
+
+        result = extractor.domain_filter.filter(
+            "Gap Factory <orders@email.gapfactory.com>", "Your order", "Order total $40"
+        )
+
+        assert extractor.field_extractor.domain_resolver is extractor.domain_resolver
+        assert result.domain == "gap.com"
+        assert result.reason == "known_merchant"
+        rule = extractor.domain_filter.get_merchant_rule("gapfactory.com")
+        assert rule is self.RULES["merchants"]["gap.com"]
+
+    def test_memoized_per_header(self):
+        """Repeated From headers are served from the cache."""
+        from reclaim.returns.domains import DomainResolver
+
+        resolver = DomainResolver(cache_size=2)
+        resolver.resolve("a@x.example.com")
+
+        resolver._resolve_uncached = None  # any miss would now fail
+        assert resolver.resolve("a@x.example.com") == "example.com"
+
+
+# =============================================================================
+# Keyword Matcher Tests
+# =============================================================================
+
+
+class TestKeywordMatcher:
+    """Test the single-pass Stage 1 keyword matcher."""
+
+    KEYWORDS = ["order confirm", "order confirmation", "confirmation number", "ride", "% off"]
+    TEXTS = [
+        "your order confirmation number is 42",
+        "override the ride, 20% off rides",
+        "order confir",
+        "",
+    ]
+
+    @pytest.fixture(params=["automaton", "regex"])
+    def backend(self, request, monkeypatch):
+        from reclaim.utils import keywords
+
+        if request.param == "automaton" and keywords.ahocorasick is None:
+            pytest.skip("pyahocorasick not installed")
+        if request.param == "regex":
+            monkeypatch.setattr(keywords, "ahocorasick", None)
+        return keywords.KeywordMatcher
+
+    def test_matches_substring_search(self, backend):
+        """Overlapping keywords are all found, with their first offsets."""
+        matcher = backend(self.KEYWORDS)
+
+        for text in self.TEXTS:
+            expected = {kw: text.find(kw) for kw in self.KEYWORDS if kw in text}
+            assert matcher.scan(text) == expected
+
+    def test_survey_keyword_only_in_subject(self):
+        """Survey keywords reject from the subject, not from the snippet."""
+        domain_filter = MerchantDomainFilter()
+
+        in_snippet = domain_filter.filter(
+            "orders@unknownstore.com", "Your order has shipped", "Love it? Leave a review"
+        )
+        in_subject = domain_filter.filter(
+            "orders@unknownstore.com", "Leave a review", "Your order has shipped"
+        )
+
+        assert in_snippet.is_candidate
+        assert in_subject.reason == "survey_feedback:leave a review"
+
+
+# =============================================================================
+# Batch Filter Tests
+# =============================================================================
+
+
+class TestFilterBatch:
+    """Test the columnar Stage 1 API against per-email filter()."""
+
+    EMAILS = [
+        ("noreply@uber.com", "Your trip receipt", "Thanks for riding."),
+        ("ship-confirm@amazon.com", "Your order has shipped", "Your package is on its way."),
+        ("orders@unknownstore.com", "Order confirmation #1", "Thank you for your order.\nShop now"),
+        ("billing@randomservice.com", "Your subscription", "Recurring membership renewed."),
+        ("orders@unknownstore.com", "Leave a review", "Thank you for your order.\nShop now"),
+        ("Whole Foods <orders@wholefoods.com>", "Your Whole Foods order", "Snacks and more"),
+        ("x@y.com", "", ""),
+    ]
+
+    def test_matches_per_email_filter(self):
+        """Every column entry equals filter() on the same email."""
+        domain_filter = MerchantDomainFilter()
+
+        batch = domain_filter.filter_batch(*zip(*self.EMAILS, strict=True))
+
+        assert len(batch) == len(self.EMAILS)
+        for i, email in enumerate(self.EMAILS):
+            assert batch[i] == domain_filter.filter(*email)
+
+    def test_scan_many_matches_scan(self):
+        """Hits assembled from shared lines keep each text's own offsets."""
+        from reclaim.utils.keywords import KeywordMatcher
+
+        matcher = KeywordMatcher(["order", "shop now", "ride"])
+        texts = ["order\nshop now", "shop now\norder ride", "\n\nride\norder", ""]
+
+        assert matcher.scan_many(texts) == [matcher.scan(text) for text in texts]
+
+    def test_mismatched_columns_rejected(self):
+        """Columns of different lengths are an error."""
+        with pytest.raises(ValueError):
+            MerchantDomainFilter().filter_batch(["a@b.com"], [], [])
+
+
+# =============================================================================
+# Local Returnability Model Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestLocalReturnabilityModel:
+    """Test the Stage 1.5 model that settles confident emails without the LLM."""
+
+    EMAIL = TestCombinedLLMMode.EMAIL
+
+    @pytest.fixture
+    def llm_calls(self, fake_llm, monkeypatch):
+        """Prompts sent to the LLM and calls recorded against the budget."""
+        import reclaim.llm.retry
+        import reclaim.returns.extractor
+
+        llm = fake_llm(
+            reclaim.llm.retry,
+            "call_llm",
+            '{"reason": "Physical product", "is_returnable": true, "confidence": 0.9, '
+            '"receipt_type": "product_order", "merchant_name": "Unknown Store", '
+            '"item_summary": "Blue wool sweater"}',
+        )
+        calls = {"llm": llm.calls, "budget": []}
+        monkeypatch.setattr(
+            reclaim.returns.extractor,
+            "record_llm_call",
+            lambda _user_id, llm_call: calls["budget"].append(llm_call),
+        )
+        return calls
+
+    @staticmethod
+    def _extractor(bias, llm_mode=None):
+        from reclaim.returns.local_model import LocalReturnabilityModel
+
+        extractor = ReturnableReceiptExtractor(llm_mode=llm_mode)
+        extractor.local_model = LocalReturnabilityModel({}, bias=bias)
+        return extractor
+
+    def test_train_separates_and_round_trips(self, tmp_path):
+        """A trained model ranks the two classes apart and survives save/load."""
+        from reclaim.returns.local_model import LocalReturnabilityModel
+
+        rows = [
+            ("shop.com", "orders@shop.com", "Your order has shipped", "Wool sweater", True),
+            ("shop.com", "orders@shop.com", "Order confirmed", "Running shoes", True),
+            ("stream.tv", "billing@stream.tv", "Your receipt", "Subscription renewed", False),
+            ("stream.tv", "billing@stream.tv", "Payment received", "Monthly plan", False),
+        ]
+        untrained = LocalReturnabilityModel({})
+        examples = [(untrained.features(*row[:4]), row[4]) for row in rows]
+        model = LocalReturnabilityModel.train(examples)
+        model.save(tmp_path / "model.json")
+        loaded = LocalReturnabilityModel.load(tmp_path / "model.json")
+
+        order = loaded.predict_proba("shop.com", "orders@shop.com", "Order shipped", "Boots")
+        bill = loaded.predict_proba("stream.tv", "billing@stream.tv", "Receipt", "Renewed")
+        assert order > 0.5 > bill
+
+    def test_shipped_model_loads(self):
+        """config/returnability_model.json matches the current feature version."""
+        from reclaim.returns.local_model import DEFAULT_LOCAL_MODEL_PATH, LocalReturnabilityModel
+
+        assert LocalReturnabilityModel.load(DEFAULT_LOCAL_MODEL_PATH).weights
+
+    def test_confident_reject_skips_llm(self, llm_calls):
+        """A confident local reject costs no LLM call and no budget."""
+        extractor = self._extractor(bias=-10.0)
+
+        result = extractor.extract_from_email(**self.EMAIL)
+
+        assert not result.success
+        assert result.stage_reached.value == "classifier"
+        assert result.returnability_result.reason.startswith("local_model")
+        assert llm_calls == {"llm": [], "budget": []}
+
+    def test_confident_accept_goes_straight_to_extraction(self, llm_calls):
+        """A confident local accept skips the classifier but not Stage 3."""
+        extractor = self._extractor(bias=10.0)
+
+        result = extractor.extract_from_email(**self.EMAIL)
+
+        assert result.success
+        assert llm_calls["llm"] == ["extractor"]
+        assert llm_calls["budget"] == ["extractor"]
+
+    def test_uncertain_band_uses_classifier(self, llm_calls):
+        """Between the thresholds the LLM classifier decides as before."""
+        extractor = self._extractor(bias=0.0)
+
+        extractor.extract_from_email(**self.EMAIL)
+
+        assert llm_calls["llm"][0] == "classifier"
+        assert llm_calls["budget"][0] == "classifier"
+
+    def test_combined_mode_only_bypasses_rejects(self, llm_calls):
+        """Combined mode still needs its one call for a returnable email's fields."""
+        rejected = self._extractor(bias=-10.0, llm_mode="combined").extract_from_email(**self.EMAIL)
+        accepted = self._extractor(bias=10.0, llm_mode="combined").extract_from_email(**self.EMAIL)
+
+        assert not rejected.success
+        assert accepted.success
+        assert llm_calls["llm"] == ["combined"]
+
+    def test_batch_prepass_skips_decided_emails(self, llm_calls):
+        """Emails the model decides are left out of packed classification."""
+        extractor = self._extractor(bias=-10.0)
+        emails = [
+            {"id": f"msg_{i}", "from": "orders@shop.com", "subject": "Your order", "body": body}
+            for i, body in enumerate(["Wool sweater shipped", "Running shoes shipped"])
+        ]
+
+        results = extractor.process_email_batch("test_user", emails, max_workers=1)
+
+        assert len(results) == 2
+        assert llm_calls["llm"] == []
+
+
+# =============================================================================
+# Sender-Template Verdict Cache Tests
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestTemplateVerdictCache:
+    """Test reusing classifier verdicts across emails from one sender template."""
+
+    @staticmethod
+    def _shipped(item, order, price, name):
+        return (
+            "Amazon <ship-confirm@amazon.com>",
+            f"Your Amazon.com order of {item} has shipped",
+            f"Hi {name},\nYour package is on its way.\n{item}\nQty: 1\n{price}\n"
+            f"Order #{order}\nTrack your package at https://amazon.com/track/{order}",
+        )
+
+    EMAILS = [
+        ("Bose QC45 Headphones", "112-1000001-2000001", "$329.00", "Maria"),
+        ("Kindle Paperwhite", "112-5550123-9876543", "$139.99", "Sam"),
+        ("Levi's 501 Jeans", "113-0000042-1111111", "$59.50", "Alex"),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def template_cache(self, monkeypatch):
+        from reclaim.returns.templates import TEMPLATE_VERDICT_CACHE
+
+        monkeypatch.setattr(TEMPLATE_VERDICT_CACHE, "revalidate_rate", 0.0)
+        TEMPLATE_VERDICT_CACHE.clear()
+        yield TEMPLATE_VERDICT_CACHE
+        TEMPLATE_VERDICT_CACHE.clear()
+
+    def test_instances_share_fingerprint(self):
+        """Item names, amounts, order numbers and greetings are masked out."""
+        from reclaim.returns.templates import template_fingerprint
+
+        prints = {
+            template_fingerprint("amazon.com", *self._shipped(*email)[1:]) for email in self.EMAILS
+        }
+        other_sender = template_fingerprint("target.com", *self._shipped(*self.EMAILS[0])[1:])
+
+        assert len(prints) == 1
+        assert other_sender not in prints
+
+    def test_served_after_agreeing_verdicts(self, template_cache, fake_llm):
+        """The third email of a learned template costs no classifier call."""
+        classifier = ReturnabilityClassifier(template_cache=True)
+        llm = fake_llm(
+            classifier,
+            "_call_llm_with_retry",
+            '{"reason": "Physical product", "is_returnable": true, '
+            '"confidence": 0.95, "receipt_type": "product_order"}',
+            "classifier",
+        )
+
+        results = [classifier.classify(*self._shipped(*email)) for email in self.EMAILS]
+
+        assert len(llm.calls) == 2  # TEMPLATE_CACHE_MIN_OBSERVATIONS
+        assert all(r.is_returnable for r in results)
+        assert results[2].reason.startswith("template_cache")
+        assert template_cache.stats()["hits"] == 1
+
+    def test_disagreeing_verdicts_never_served(self, template_cache):
+        """One template with returnable and non-returnable items stays on the LLM."""
+        template_cache.observe("fp", ReturnabilityResult.returnable("Headphones"))
+        template_cache.observe(
+            "fp", ReturnabilityResult.not_returnable("Protein bars", ReceiptType.SERVICE)
+        )
+        template_cache.observe("fp", ReturnabilityResult.returnable("Jeans"))
+
+        assert template_cache.lookup("fp") is None
+        assert template_cache.stats()["drift"] == 0  # never served, so no drift
+
+    def test_revalidation_detects_drift(self, template_cache):
+        """A sampled re-check that disagrees retires the cached verdict."""
+        for _ in range(2):
+            template_cache.observe("fp", ReturnabilityResult.returnable("Headphones"))
+        assert template_cache.lookup("fp").is_returnable
+
+        template_cache.revalidate_rate = 1.0
+        assert template_cache.lookup("fp") is None  # sampled for revalidation
+        template_cache.observe(
+            "fp", ReturnabilityResult.not_returnable("Subscription", ReceiptType.SUBSCRIPTION)
+        )
+        template_cache.revalidate_rate = 0.0
+
+        assert template_cache.lookup("fp") is None
+        stats = template_cache.stats()
+        assert stats["drift"] == 1
+        assert stats["revalidations"] == 1
+        assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    def test_llm_errors_not_learned(self, template_cache, fake_llm):
+        """A failed call's rejection is not taken as the template's verdict."""
+        classifier = ReturnabilityClassifier(template_cache=True)
+
+        def failing_llm(_prompt, _counter_prefix):
+            raise RuntimeError("upstream unavailable")
+
+        fake_llm(classifier, "_call_llm_with_retry", failing_llm, "classifier")
+
+        for email in self.EMAILS:
+            classifier.classify(*self._shipped(*email))
+
+        assert template_cache.stats()["total_entries"] == 0
+
+
+# =============================================================================
+# MERCHANT PARSER TESTS
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestMerchantParsers:
+    """Test deterministic Stage 3 parsers for known merchant layouts."""
+
+    AMAZON_ORDER = (
+        "Hello,\n\nThank you for your order.\n\nOrder# 112-1000001-2000001\n\n"
+        "Sony WH-1000XM5 Wireless Headphones\nQty: 1\n$348.00\n\n"
+        "Arriving January 20, 2026\n\nOrder Total: $372.36\n"
+    )
+    TARGET_ORDER = (
+        "Thanks for your order!\n\nOrder number: 101000006\nPlaced on January 15, 2026\n\n"
+        "1x KitchenAid Stand Mixer\n$349.99\n2x Mixing Bowl\n$15.00\n\n"
+        "Estimated arrival: January 20, 2026\n\n"
+        "Most items can be returned within 90 days.\n\nOrder total: $381.49\n"
+    )
+
+    @pytest.fixture
+    def extractor(self, field_extractor):
+        return field_extractor('{"merchant_name": "Amazon", "item_summary": "Headphones"}')
+
+    def test_amazon_parse_skips_llm(self, extractor):
+        """A confident parse is the extraction result; Gemini is not called."""
+        result = extractor.extract(
+            "Amazon.com <auto-confirm@amazon.com>",
+            "Your Amazon.com order #112-1000001-2000001",
+            self.AMAZON_ORDER,
+            "amazon.com",
+        )
+
+        assert extractor.llm_calls == []
+        assert result.extraction_method == "parser"
+        assert result.merchant == "Amazon"
+        assert result.order_number == "112-1000001-2000001"
+        assert result.item_summary == "Sony WH-1000XM5 Wireless Headphones"
+        assert result.amount == 372.36
+        assert result.delivery_date.date().isoformat() == "2026-01-20"
+        assert result.return_by_date is not None
+
+    def test_target_parse_fields(self):
+        """Quantity prefixes are stripped and the stated window is kept."""
+        from reclaim.returns.merchant_parsers import get_merchant_parser
+
+        fields = get_merchant_parser("target.com").parse("Thanks!", self.TARGET_ORDER)
+
+        assert fields["item_summary"] == "KitchenAid Stand Mixer and 1 more item"
+        assert fields["order_date"] == "2026-01-15"
+        assert fields["delivery_date"] == "2026-01-20"
+        assert fields["return_window_days"] == 90
+        assert fields["return_policy_quote"] == "Most items can be returned within 90 days."
+
+    def test_unconfident_parse_falls_back_to_llm(self, extractor):
+        """Without an order number the LLM extracts, and the fallback is counted."""
+        from reclaim.observability.telemetry import get_counter
+
+        before = get_counter("returns.extractor.parser.amazon.com.fallback")
+        result = extractor.extract(
+            "Amazon.com <auto-confirm@amazon.com>",
+            "Your Amazon.com order",
+            self.AMAZON_ORDER.replace("Order# 112-1000001-2000001", ""),
+            "amazon.com",
+        )
+
+        assert len(extractor.llm_calls) == 1
+        assert result.extraction_method == "hybrid"
+        assert get_counter("returns.extractor.parser.amazon.com.fallback") == before + 1
+
+    def test_unregistered_merchant_uses_llm(self, extractor):
+        extractor.extract(
+            "Shop <orders@smallshop.com>", "Your order", self.AMAZON_ORDER, "smallshop.com"
+        )
+
+        assert len(extractor.llm_calls) == 1
+
+    def test_parser_report(self, extractor):
+        """The report gives each merchant's LLM skip share and the latency saved."""
+        from reclaim.returns.merchant_parsers import get_parser_report
+
+        extractor.extract("a@amazon.com", "Order", self.AMAZON_ORDER, "amazon.com")
+        extractor.extract("a@amazon.com", "Order", "Your order shipped.", "amazon.com")
+
+        report = get_parser_report()
+        amazon = report["amazon.com"]
+        assert amazon["parsed"] >= 1 and amazon["fell_back"] >= 1
+        assert 0.0 < amazon["skip_share"] < 1.0
+        assert amazon["llm_p50_ms"] >= amazon["parser_p50_ms"] >= 0.0
+        assert set(amazon) >= {"saved_ms_per_parse", "saved_ms_total"}
+        assert 0.0 < report["all"]["skip_share"] <= 1.0
+
+
+# =============================================================================
+# STRUCTURED MARKUP TESTS
+# =============================================================================
+
+
+@pytest.mark.usefixtures("llm_enabled")
+class TestStructuredMarkup:
+    """Test Stage 3 fields from schema.org Order / ParcelDelivery markup."""
+
+    JSON_LD = """<html><head><script type="application/ld+json">
+    {"@context": "http://schema.org", "@type": "Order",
+     "merchant": {"@type": "Organization", "name": "Crate & Barrel"},
+     "orderNumber": "CB-55501", "orderDate": "2026-01-15T10:00:00-08:00",
+     "priceCurrency": "USD", "price": "249.00",
+     "acceptedOffer": [
+       {"@type": "Offer", "itemOffered": {"@type": "Product", "name": "Dining Chair"}},
+       {"@type": "Offer", "itemOffered": {"@type": "Product", "name": "Table Lamp"}}]}
+    </script></head><body><p>Thanks for your order!</p></body></html>"""
+
+    MICRODATA = """<div itemscope itemtype="http://schema.org/ParcelDelivery">
+      <meta itemprop="expectedArrivalUntil" content="2026-01-20T12:00:00-08:00">
+      <div itemprop="carrier" itemscope itemtype="http://schema.org/Organization">
+        <meta itemprop="name" content="FedEx"></div>
+      <div itemprop="itemShipped" itemscope itemtype="http://schema.org/Product">
+        <span itemprop="name">Samsung <b>55" TV</b></span></div>
+      <div itemprop="partOfOrder" itemscope itemtype="http://schema.org/Order">
+        <span itemprop="orderNumber">176057</span>
+        <div itemprop="merchant" itemscope itemtype="http://schema.org/Organization">
+          <meta itemprop="name" content="Crate &amp; Barrel"></div>
+      </div>
+    </div>"""
+
+    @pytest.fixture
+    def extractor(self, field_extractor):
+        return field_extractor(
+            '{"merchant_name": "Crate and Barrel", "item_summary": "Chair", '
+            '"order_number": "CB-55501", "delivery_date": "2026-01-22", '
+            '"return_window_days": 90}'
+        )
+
+    def test_json_ld_order(self):
+        from reclaim.returns.structured_markup import is_complete, markup_fields
+
+        fields = markup_fields(self.JSON_LD)
+
+        assert fields == {
+            "merchant_name": "Crate & Barrel",
+            "item_summary": "Dining Chair and 1 more item",
+            "order_number": "CB-55501",
+            "amount": 249.0,
+            "currency": "USD",
+            "order_date": "2026-01-15",
+        }
+        assert is_complete(fields)
+
+    def test_microdata_parcel_delivery(self):
+        """Nested items resolve through partOfOrder; other names don't leak in."""
+        from reclaim.returns.structured_markup import is_complete, markup_fields
+
+        fields = markup_fields(self.MICRODATA)
+
+        assert fields == {
+            "merchant_name": "Crate & Barrel",
+            "item_summary": 'Samsung 55" TV',
+            "order_number": "176057",
+            "delivery_date": "2026-01-20",
+        }
+        assert is_complete(fields)
+        assert markup_fields("<p>Order #176057 shipped</p>") == {}
+
+    def test_complete_markup_skips_llm(self, extractor):
+        result = extractor.extract(
+            "Crate & Barrel <orders@crateandbarrel.com>",
+            "Your order",
+            "Thanks for your order!",
+            "crateandbarrel.com",
+            body_html=self.JSON_LD,
+        )
+
+        assert extractor.llm_calls == []
+        assert result.extraction_method == "markup"
+        assert result.merchant == "Crate & Barrel"
+        assert result.order_number == "CB-55501"
+        assert result.amount == 249.0
+        assert result.order_date.date().isoformat() == "2026-01-15"
+
+    def test_partial_markup_overrides_llm(self, extractor):
+        """The LLM fills what the markup lacks; stated markup fields win."""
+        partial = self.JSON_LD.replace('"orderNumber": "CB-55501", ', "")
+
+        result = extractor.extract(
+            "Crate & Barrel <orders@crateandbarrel.com>",
+            "Your order",
+            "Thanks for your order!",
+            "crateandbarrel.com",
+            body_html=partial,
+        )
+
+        assert len(extractor.llm_calls) == 1
+        assert result.extraction_method == "hybrid"
+        assert result.merchant == "Crate & Barrel"
+        assert result.item_summary == "Dining Chair and 1 more item"
+        assert result.order_number == "CB-55501"  # from the LLM
+        assert result.delivery_date.date().isoformat() == "2026-01-22"
+
+    def test_markup_complete_counts_only_skipped_llm_calls(self, extractor):
+        """Combined mode already called the LLM, so its complete markup isn't a skip."""
+        from reclaim.observability.telemetry import get_counter
+
+        args = (
+            "Crate & Barrel <orders@crateandbarrel.com>",
+            "Your order",
+            "Thanks for your order!",
+            "crateandbarrel.com",
+        )
+        before = get_counter("returns.extractor.markup_complete")
+
+        extractor.extract_from_llm_fields(*args, None, {"item_summary": "Chair"}, self.JSON_LD)
+        assert get_counter("returns.extractor.markup_complete") == before
+
+        extractor.extract(*args, body_html=self.JSON_LD)
+        assert get_counter("returns.extractor.markup_complete") == before + 1
+
+
+# =============================================================================
+# BODY WINDOW TESTS
+# =============================================================================
+
+
+class TestBodyWindows:
+    """Test relevance-windowed extractor prompt bodies."""
+
+    PROMO = (
+        "Trending this week\nWireless earbuds from $29.99\nSmart home kits from $49.99\n\n"
+        "SALE: Up to 50% off everything. Shop now!\n\n"
+    )
+    ORDER = (
+        "Thanks for your order!\n\nOrder number: 101000006\nPlaced on January 15, 2026\n\n"
+        "KitchenAid Stand Mixer\nQty: 1\n$349.99\n\n"
+        "Estimated arrival: January 20, 2026\n\n"
+        "Most items can be returned within 90 days of delivery."
+    )
+    LEGAL = "\n\nPrivacy Policy | Terms and Conditions | Unsubscribe\n\n© 2026 Retailer Inc."
+
+    def test_short_body_unchanged(self):
+        from reclaim.returns.body_windows import select_body_windows
+
+        assert select_body_windows(self.ORDER, 600) is self.ORDER
+
+    def test_keeps_order_blocks_within_budget(self):
+        """Order details past the truncation point survive; promos and legal don't."""
+        from reclaim.config import PIPELINE_BODY_TRUNCATION
+        from reclaim.returns.body_windows import estimate_tokens, select_body_windows
+
+        body = self.PROMO * 40 + self.ORDER + self.LEGAL * 10
+        assert "101000006" not in body[:PIPELINE_BODY_TRUNCATION]
+
+        windowed = select_body_windows(body, 150)
+
+        assert estimate_tokens(windowed) <= 150
+        for detail in ("101000006", "$349.99", "January 20, 2026", "within 90 days"):
+            assert detail in windowed
+        assert "earbuds" not in windowed
+        assert "Privacy Policy" not in windowed
+
+    def test_extractor_prompt_uses_windows(self):
+        from reclaim.observability.telemetry import get_counter
+
+        body = self.PROMO * 40 + self.ORDER
+        head = ReturnFieldExtractor(body_token_budget=None)
+        windowed = ReturnFieldExtractor(body_token_budget=200)
+        saved_before = get_counter("returns.extractor.prompt_body_tokens_saved")
+
+        head_prompt = head._build_llm_prompt("orders@target.com", "Your order", body)
+        windowed_prompt = windowed._build_llm_prompt("orders@target.com", "Your order", body)
+
+        assert "Stand Mixer" not in head_prompt
+        assert "Stand Mixer" in windowed_prompt
+        assert "within 90 days" in windowed_prompt
+        assert len(windowed_prompt) < len(head_prompt)
+        assert get_counter("returns.extractor.prompt_body_tokens_saved") > saved_before
+
+    @pytest.mark.usefixtures("llm_enabled")
+    def test_combined_prompt_uses_windows(self, fake_llm):
+        """Combined mode builds its prompt through the extractor, so it is windowed too."""
+        import reclaim.llm.retry
+        from reclaim.returns.combined_stage import CombinedReturnabilityExtractor
+
+        llm = fake_llm(
+            reclaim.llm.retry,
+            "call_llm",
+            '{"reason": "Physical product", "is_returnable": true, "confidence": 0.9, '
+            '"receipt_type": "product_order", "item_summary": "Stand Mixer"}',
+        )
+        combined = CombinedReturnabilityExtractor(
+            ReturnabilityClassifier(), ReturnFieldExtractor(body_token_budget=200)
+        )
+
+        combined.classify_and_extract(
+            "orders@target.com", "Your order", self.PROMO * 40 + self.ORDER
+        )
+
+        assert len(llm.prompts) == 1
+        assert "Stand Mixer" in llm.prompts[0]
+        assert "within 90 days" in llm.prompts[0]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
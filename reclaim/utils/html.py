@@ -3,24 +3,176 @@
 Many merchant emails (Walmart, Calvin Klein, etc.) are HTML-only with no
 text/plain MIME part. This module converts HTML to readable plain text
 for the extraction pipeline.
+
+The converter streams: the stdlib HTMLParser is fed the HTML in slices and
+visible text is emitted as it is found, so there is no document tree and
+conversion can stop as soon as a character budget is filled. Email HTML is
+often hundreds of KB while the pipeline reads a few thousand characters.
 """
 
 from __future__ import annotations
 
 import re
+from html.parser import HTMLParser
 
 from reclaim.observability.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Elements whose content is never visible text
+_SKIP_TAGS = frozenset({"script", "style", "head"})
+
+# Elements that never have an end tag (don't push them on the open-tag stack)
+_VOID_TAGS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "param", "source", "track", "wbr",
+    }
+)  # fmt: skip
+
+# Inline styles used to hide preheaders and tracking blocks
+_HIDDEN_STYLE_RE = re.compile(
+    r"display\s*:\s*none"
+    r"|visibility\s*:\s*hidden"
+    r"|mso-hide\s*:\s*all"
+    r"|(?<![-\w])(?:max-height|font-size|opacity)\s*:\s*0(?:\.0*)?(?:px|pt|em|rem|%)?\s*(?:;|!|$)",
+    re.IGNORECASE,
+)
+
+# HTML is fed to the parser this many characters at a time; the budget is
+# checked between slices
+_FEED_SLICE_CHARS = 8192
+
+
+class _BudgetReached(Exception):
+    """Internal: enough text has been collected."""
+
+
+class _TextCollector(HTMLParser):
+    """
+    Collect visible text nodes, normalized the way the rules expect.
+
+    Output matches the previous BeautifulSoup path (text nodes joined with
+    newlines, each line stripped, runs of blank lines collapsed to one),
+    minus hidden elements.
+    """
 
-def html_to_text(html: str) -> str:
+    def __init__(self, max_chars: int | None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.lines: list[str] = []
+        self.chars = 0
+        # Open non-void tags as (name, hides_content)
+        self._stack: list[tuple[str, bool]] = []
+        self._hidden_depth = 0
+        self._partial = ""  # Text after the last line break, not yet a full line
+        self._started = False  # Any text node seen (separators go between nodes)
+        # HTMLParser may deliver one text node in several handle_data calls
+        self._in_node = False
+        self._blank_pending = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._in_node = False
+        if tag in _VOID_TAGS:
+            return
+        hides = tag in _SKIP_TAGS or self._is_hidden(attrs)
+        self._stack.append((tag, hides))
+        if hides:
+            self._hidden_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:  # noqa: ARG002
+        # <div/> opens and closes nothing
+        self._in_node = False
+
+    def handle_endtag(self, tag: str) -> None:
+        self._in_node = False
+        # Close up to the matching open tag; stray end tags are ignored
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                for _, hides in self._stack[i:]:
+                    if hides:
+                        self._hidden_depth -= 1
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        if self._hidden_depth:
+            return
+        if self._started and not self._in_node:
+            data = "\n" + data
+        self._started = True
+        self._in_node = True
+
+        lines = (self._partial + data).splitlines(keepends=True)
+        self._partial = ""
+        if lines:
+            last = lines[-1]
+            # Unterminated, or a "\r" that may be half of a "\r\n" split across nodes
+            if len(last.splitlines()[0]) == len(last) or last.endswith("\r"):
+                self._partial = lines.pop()
+        for line in lines:
+            self._emit(line.strip())
+
+    def handle_comment(self, data: str) -> None:  # noqa: ARG002
+        self._in_node = False
+
+    def handle_decl(self, decl: str) -> None:  # noqa: ARG002
+        self._in_node = False
+
+    def handle_pi(self, data: str) -> None:  # noqa: ARG002
+        self._in_node = False
+
+    def unknown_decl(self, data: str) -> None:
+        self._in_node = False
+        # <![CDATA[...]]> is text to BeautifulSoup as well
+        if data.startswith("CDATA["):
+            self.handle_data(data[6:])
+            self._in_node = False
+
+    def finish(self) -> str:
+        if self._partial:
+            self._emit(self._partial.strip())
+            self._partial = ""
+        return "\n".join(self.lines)
+
+    def _emit(self, line: str) -> None:
+        if not line:
+            # Leading blanks are dropped; a run of blanks becomes one
+            self._blank_pending = bool(self.lines)
+            return
+        if self._blank_pending:
+            self.lines.append("")
+            self.chars += 1
+            self._blank_pending = False
+        self.lines.append(line)
+        self.chars += len(line) + 1
+        # Only stop after a non-blank line so the output is an exact prefix
+        if self.max_chars is not None and self.chars > self.max_chars:
+            raise _BudgetReached
+
+    @staticmethod
+    def _is_hidden(attrs: list[tuple[str, str | None]]) -> bool:
+        for name, value in attrs:
+            if name == "hidden":
+                return True
+            if name == "style" and value and _HIDDEN_STYLE_RE.search(value):
+                return True
+            if name == "class" and value and "preheader" in value.lower():
+                return True
+        return False
+
+
+def html_to_text(html: str, max_chars: int | None = None) -> str:
     """Convert HTML email body to plain text.
 
-    Uses BeautifulSoup if available, falls back to regex stripping.
+    Visible text only: script, style and head content and hidden elements
+    (display:none, zero-height/size preheaders, etc.) are dropped.
 
     Args:
         html: Raw HTML string from email body.
+        max_chars: Stop once this much text is collected. The result is
+            then exactly the first max_chars characters of the full
+            conversion.
 
     Returns:
         Plain text extracted from the HTML.
@@ -28,36 +180,11 @@ def html_to_text(html: str) -> str:
     if not html:
         return ""
 
+    collector = _TextCollector(max_chars)
     try:
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(html, "html.parser")
-
-        # Remove script and style elements
-        for tag in soup(["script", "style", "head"]):
-            tag.decompose()
-
-        text = soup.get_text(separator="\n")
-    except ImportError:
-        logger.warning("beautifulsoup4 not installed, using regex fallback for HTML conversion")
-        text = _regex_html_to_text(html)
-
-    # Collapse whitespace: multiple blank lines -> single, strip each line
-    lines = [line.strip() for line in text.splitlines()]
-    text = "\n".join(lines)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
-
-
-def _regex_html_to_text(html: str) -> str:
-    """Fallback HTML-to-text using regex when BeautifulSoup is unavailable."""
-    text = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<style[^>]*>.*?</style>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"</(p|div|tr|li|h[1-6])>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"<[^>]+>", "", text)
-    text = re.sub(r"&nbsp;", " ", text)
-    text = re.sub(r"&amp;", "&", text)
-    text = re.sub(r"&lt;", "<", text)
-    text = re.sub(r"&gt;", ">", text)
-    return re.sub(r"&#\d+;", "", text)
+        for start in range(0, len(html), _FEED_SLICE_CHARS):
+            collector.feed(html[start : start + _FEED_SLICE_CHARS])
+        collector.close()
+        return collector.finish()
+    except _BudgetReached:
+        return "\n".join(collector.lines)[:max_chars]
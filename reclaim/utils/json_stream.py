@@ -0,0 +1,174 @@
+"""
+Incremental parsing of large JSON request bodies.
+
+iter_json_array_items() reads a body like {"emails": [{...}, {...}], ...}
+from a byte stream and yields the array's items one at a time, so only the
+item being decoded (plus one network chunk) is held in memory instead of
+the whole document. Each item is decoded with the stdlib's C scanner; a
+decode attempt on a partial item is only retried once the buffer has grown
+by half again, which keeps the total work linear in the body size.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+
+class JSONStreamError(ValueError):
+    """Body is not a JSON object of the expected shape, or an item is too large."""
+
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Text buffer over an async byte stream, trimmed as values are consumed."""
+
+    def __init__(self, chunks: AsyncIterator[bytes], max_value_chars: int):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._max_value_chars = max_value_chars
+        # Chunks read since the last join; joined lazily so growing a large
+        # value doesn't re-copy the buffer for every chunk
+        self._tail: list[str] = []
+        self._tail_chars = 0
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    @property
+    def pending(self) -> int:
+        """Characters available from the cursor on."""
+        return len(self.buf) - self.pos + self._tail_chars
+
+    def _join(self) -> None:
+        # Drop consumed text so the buffer only holds the value in progress
+        self.buf = self.buf[self.pos :] + "".join(self._tail)
+        self.pos = 0
+        self._tail = []
+        self._tail_chars = 0
+
+    async def fill(self) -> bool:
+        """Read the next chunk; False once the stream is exhausted."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._tail.append(text)
+        self._tail_chars += len(text)
+        return not self.eof
+
+    async def peek(self) -> str:
+        """Next non-whitespace character ("" at end of stream)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self._tail:
+                self._join()
+            elif not await self.fill():
+                self._join()
+                if self.pos >= len(self.buf):
+                    return ""
+
+    async def expect(self, char: str) -> None:
+        found = await self.peek()
+        if found != char:
+            raise JSONStreamError(f"Expected {char!r}, found {found or 'end of body'!r}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        """Decode the JSON value starting at the cursor."""
+        await self.peek()
+        decoder = json.JSONDecoder()
+        retry_at = 0
+        while True:
+            pending = self.pending
+            if pending >= retry_at or self.eof:
+                self._join()
+                try:
+                    value, end = decoder.raw_decode(self.buf, self.pos)
+                    # A number (or anything) ending exactly at the buffer edge
+                    # may continue in the next chunk
+                    if end < len(self.buf) or self.eof:
+                        self.pos = end
+                        return value
+                except json.JSONDecodeError as e:
+                    if self.eof:
+                        raise JSONStreamError(f"Malformed JSON body: {e.msg}") from e
+                retry_at = pending + pending // 2 + 1
+            if pending > self._max_value_chars:
+                raise JSONStreamError("JSON array item too large")
+            await self.fill()
+
+
+async def iter_json_array_items(
+    chunks: AsyncIterator[bytes],
+    key: str,
+    max_item_chars: int,
+    other_keys: dict[str, Any] | None = None,
+) -> AsyncIterator[Any]:
+    """
+    Yield the items of the array at top-level ``key`` as they are parsed.
+
+    Args:
+        chunks: Raw body bytes (e.g. starlette's request.stream())
+        key: Top-level key holding the array
+        max_item_chars: Largest single item (in characters) to buffer
+        other_keys: Filled in with any other top-level keys' values (they
+            are small and decoded whole); only complete once iteration ends
+
+    Raises:
+        JSONStreamError: Body isn't an object, ``key`` is missing or not an
+            array, malformed JSON, or an item over max_item_chars
+    """
+    reader = _Reader(chunks, max_item_chars)
+    found = False
+
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            name = await reader.value()
+            if not isinstance(name, str):
+                raise JSONStreamError("Object keys must be strings")
+            await reader.expect(":")
+
+            if name == key:
+                found = True
+                await reader.expect("[")
+                if await reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield await reader.value()
+                        if await reader.peek() == ",":
+                            reader.pos += 1
+                            continue
+                        await reader.expect("]")
+                        break
+            else:
+                value = await reader.value()
+                if other_keys is not None:
+                    other_keys[name] = value
+
+            if await reader.peek() == ",":
+                reader.pos += 1
+                continue
+            await reader.expect("}")
+            break
+
+    if await reader.peek():
+        raise JSONStreamError("Unexpected data after JSON body")
+    if not found:
+        raise JSONStreamError(f"Missing {key!r} array")
@@ -0,0 +1,146 @@
+"""
+Single-pass multi-keyword matching.
+
+KeywordMatcher answers "which of these keywords occur in this text" for a
+fixed keyword set in one scan of the text, instead of one ``kw in text``
+search per keyword.
+
+With pyahocorasick installed the keywords are compiled into an Aho-Corasick
+automaton. Without it, they are arranged in a prefix trie and compiled into
+one regular expression that walks the trie at each text position (inside a
+lookahead, so overlapping occurrences are all seen). Every keyword occurring
+at a position is a prefix of the longest one occurring there, so the regex
+only matches the longest and its prefixes come from a precomputed table.
+
+Matching is exact substring matching, the same as ``kw in text``; callers
+lowercase the text themselves if the keywords are lowercase.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from itertools import accumulate, chain
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _trie_pattern(node: dict[str, dict], end: str) -> str:
+    """Regex for a trie node's subtree, longest alternative first."""
+    branches = []
+    for char, child in sorted(node.items()):
+        if char == end:
+            continue
+        # Collapse chains of single-child, non-terminal nodes into one literal
+        literal = char
+        while end not in child and len(child) == 1:
+            ((char, child),) = child.items()
+            literal += char
+        branches.append(re.escape(literal) + _trie_pattern(child, end))
+
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if end in node:
+        # Greedy: try continuing to a longer keyword before stopping here
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+class KeywordMatcher:
+    """Find all of a fixed set of keywords in a text with one scan."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(kw for kw in keywords if kw)
+        self._automaton = None
+        self._regex: re.Pattern[str] | None = None
+
+        if not self.keywords:
+            return
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+            return
+
+        # "" can't be a character, so it marks where a keyword ends
+        trie: dict[str, dict] = {}
+        for kw in self.keywords:
+            node = trie
+            for char in kw:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._regex = re.compile(f"(?=({_trie_pattern(trie, '')}))", re.DOTALL)
+        # Keyword -> every keyword that is a prefix of it (itself included)
+        self._prefixes: dict[str, tuple[str, ...]] = {
+            kw: tuple(kw[:i] for i in range(1, len(kw) + 1) if kw[:i] in self.keywords)
+            for kw in self.keywords
+        }
+
+    def scan(self, text: str) -> dict[str, int]:
+        """
+        Find which keywords occur in text.
+
+        Returns:
+            Each keyword found, mapped to the offset of its first occurrence
+        """
+        found: dict[str, int] = {}
+        # Occurrences of one keyword arrive in text order
+        for start, kw in self._hits(text):
+            found.setdefault(kw, start)
+        return found
+
+    def scan_many(self, texts: Iterable[str]) -> list[dict[str, int]]:
+        """
+        scan() for a batch of texts.
+
+        Texts in a batch (emails from the same merchants' templates) share
+        most of their lines, so each distinct line is scanned only once: the
+        distinct lines are joined and scanned in a single pass, and each
+        text's hits are assembled from its lines' hits.
+        """
+        if any("\n" in kw for kw in self.keywords):
+            return [self.scan(text) for text in texts]
+
+        texts_lines = [text.split("\n") for text in texts]
+        distinct = list(dict.fromkeys(chain.from_iterable(texts_lines)))
+
+        # Hits per distinct line that has any, offsets relative to the line
+        line_starts = [
+            start + i for i, start in enumerate(accumulate(map(len, distinct), initial=0))
+        ]
+        line_hits: dict[str, list[tuple[int, str]]] = {}
+        for start, kw in self._hits("\n".join(distinct)):
+            i = bisect_right(line_starts, start) - 1
+            line_hits.setdefault(distinct[i], []).append((start - line_starts[i], kw))
+
+        results = []
+        for lines in texts_lines:
+            found: dict[str, int] = {}
+            hit_rows = [row for row, line in enumerate(lines) if line in line_hits]
+            if hit_rows:
+                # Offset of each line: preceding lines plus their separators
+                offsets = list(accumulate(map(len, lines), initial=0))
+                for row in hit_rows:
+                    for start, kw in line_hits[lines[row]]:
+                        found.setdefault(kw, offsets[row] + row + start)
+            results.append(found)
+        return results
+
+    def _hits(self, text: str) -> Iterator[tuple[int, str]]:
+        """(start offset, keyword) for every occurrence of every keyword."""
+        if self._automaton is not None:
+            # Hits arrive in order of end offset
+            for end, kw in self._automaton.iter(text):
+                yield end - len(kw) + 1, kw
+        elif self._regex is not None:
+            for match in self._regex.finditer(text):
+                start = match.start()
+                for kw in self._prefixes[match.group(1)]:
+                    yield start, kw
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: /api/extract response serialization, model path vs fast path.
+
+The model path is what /extract did before the fast path: build an
+ExtractedCard/ExtractResultItem per result, then let FastAPI re-validate the
+ExtractResponse against response_model, run jsonable_encoder and json.dumps.
+The fast path builds plain dicts from the pipeline's ReturnCards and encodes
+them once (orjson when installed).
+
+No LLM or network; results are synthetic.
+
+Usage:
+    python tests/eval/bench_extract_response.py
+    python tests/eval/bench_extract_response.py --emails 500 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from reclaim.api.routes.extract import (  # noqa: E402
+    ExtractResponse,
+    _build_response,
+    _json_response,
+    _response_payload,
+    orjson,
+)
+from reclaim.returns.models import ReturnCard  # noqa: E402
+from reclaim.returns.types import ExtractionResult, ExtractionStage  # noqa: E402
+
+
+def make_results(count: int, card_ratio: float = 0.4) -> list[ExtractionResult]:
+    """Mix of extracted cards and filter/classifier rejections."""
+    now = datetime.now(UTC)
+    results = []
+    for i in range(count):
+        if i % 100 < card_ratio * 100:
+            card = ReturnCard(
+                id=f"card-{i}",
+                user_id="bench",
+                merchant="Example Store",
+                merchant_domain="example.com",
+                item_summary=f"Wireless headphones, charging case (order {i})",
+                source_email_ids=[f"msg_{i}"],
+                order_number=f"112-{i:07d}-9195428",
+                amount=79.99,
+                order_date=now - timedelta(days=3),
+                delivery_date=now - timedelta(days=1),
+                return_by_date=now + timedelta(days=27),
+                return_portal_link="https://example.com/returns",
+                evidence_snippet="Returns accepted within 30 days of delivery.",
+            )
+            results.append(ExtractionResult(success=True, card=card, stage_reached="complete"))
+        elif i % 2:
+            results.append(
+                ExtractionResult(
+                    success=False,
+                    rejection_reason="filter:blocklisted_domain",
+                    stage_reached=ExtractionStage.FILTER,
+                )
+            )
+        else:
+            results.append(
+                ExtractionResult(
+                    success=False,
+                    rejection_reason="classifier:not_returnable",
+                    stage_reached=ExtractionStage.CLASSIFIER,
+                )
+            )
+    return results
+
+
+def model_path(results: list[ExtractionResult]) -> bytes:
+    response = _build_response(results, len(results), "bench")
+    # FastAPI: validate against response_model, encode, json.dumps
+    validated = ExtractResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(results: list[ExtractionResult]) -> bytes:
+    return _json_response(_response_payload(results, len(results), "bench")).body
+
+
+def bench(fn, results: list[ExtractionResult], repeat: int) -> list[float]:
+    fn(results)  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(results)
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ExtractResponse serialization")
+    parser.add_argument("--emails", type=int, default=500, help="Results per response")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per path")
+    args = parser.parse_args()
+
+    results = make_results(args.emails)
+    assert json.loads(model_path(results)) == json.loads(fast_path(results))
+
+    print(f"{args.emails} results, {args.repeat} runs, encoder: {'orjson' if orjson else 'json'}")
+    medians = {}
+    for name, fn in (("model", model_path), ("fast", fast_path)):
+        samples = bench(fn, results, args.repeat)
+        medians[name] = samples[len(samples) // 2]
+        print(
+            f"  {name:>5}: p50 {medians[name] * 1000:.2f} ms, "
+            f"p95 {samples[int(len(samples) * 0.95) - 1] * 1000:.2f} ms"
+        )
+    print(f"  speedup: {medians['model'] / medians['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
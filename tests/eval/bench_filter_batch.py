@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark Stage 1 batch filtering: filter_batch() vs a filter() loop.
+
+Builds backfill-sized batches (10k and 100k emails by default) from the eval
+fixtures: each fixture's subject and body padded to a 2,000-char snippet, sent
+either by its real sender or by one of a few thousand synthetic senders on
+unknown domains, so allowlist, blocklist and heuristic paths all run. Every
+number in an email is made unique to it (order numbers, amounts, dates), so
+lines with them never repeat across emails; --unique-lines makes every line
+unique, the worst case for filter_batch's line sharing. Checks
+filter_batch() returns exactly what per-email filter() does, then reports
+throughput in emails per second for both. Each run uses a fresh filter, so
+domain resolution starts with a cold cache.
+
+Usage:
+    python tests/eval/bench_filter_batch.py
+    python tests/eval/bench_filter_batch.py --sizes 1000 10000 --senders 500
+    python tests/eval/bench_filter_batch.py --unique-lines
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.returns.filters import MerchantDomainFilter  # noqa: E402
+from reclaim.utils import keywords  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+NUMBER_RE = re.compile(r"\d+")
+
+FOOTER = (
+    "Questions about your order? Visit our Help Center or reply to this email. "
+    "Returns are free within 30 days of delivery; items must be unworn with tags "
+    "attached. You are receiving this email because you made a purchase. "
+)
+
+
+def build_columns(
+    size: int, senders: int, unique_lines: bool = False
+) -> tuple[list[str], list[str], list[str]]:
+    cases = json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text())
+    snippets = []
+    for case in cases:
+        body = case["body"]
+        while len(body) < 2000:
+            body += "\n" + FOOTER
+        snippets.append(body[:2000])
+
+    from_addresses, subjects, bodies = [], [], []
+    for i in range(size):
+        case = cases[i % len(cases)]
+        if i % 2:
+            sender = i % senders
+            from_addresses.append(f"Shop {sender} <orders@mail.shop{sender}.example.com>")
+        else:
+            from_addresses.append(case["from_address"])
+        snippet = NUMBER_RE.sub(lambda m, i=i: f"{m.group()}{i}", snippets[i % len(cases)])
+        if unique_lines:
+            snippet = "\n".join(f"{line} ref{i}" for line in snippet.split("\n"))
+        subjects.append(NUMBER_RE.sub(lambda m, i=i: f"{m.group()}{i}", case["subject"]))
+        bodies.append(snippet[:2000])
+    return from_addresses, subjects, bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark filter_batch vs per-email filter")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--senders", type=int, default=3000, help="Distinct synthetic senders")
+    parser.add_argument("--unique-lines", action="store_true", help="No line repeats")
+    args = parser.parse_args()
+
+    backend = "pyahocorasick" if keywords.ahocorasick is not None else "regex trie"
+    print(f"keyword matcher: {backend}")
+
+    for size in args.sizes:
+        columns = build_columns(size, args.senders, args.unique_lines)
+
+        domain_filter = MerchantDomainFilter()
+        started = time.perf_counter()
+        per_email = [domain_filter.filter(*email) for email in zip(*columns, strict=True)]
+        loop_s = time.perf_counter() - started
+
+        domain_filter = MerchantDomainFilter()
+        started = time.perf_counter()
+        batch = domain_filter.filter_batch(*columns)
+        batch_s = time.perf_counter() - started
+
+        mismatches = sum(1 for i, result in enumerate(per_email) if batch[i] != result)
+        print(f"{size:,} emails ({mismatches} mismatches)")
+        print(f"  filter() loop:  {size / loop_s:9,.0f} emails/s")
+        print(f"  filter_batch(): {size / batch_s:9,.0f} emails/s ({loop_s / batch_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
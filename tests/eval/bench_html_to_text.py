@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark html_to_text: streaming converter vs the previous BeautifulSoup path.
+
+Inputs are the eval fixtures' HTML emails plus every fixture body rendered
+into a typical table-based marketing template (hidden preheader, inline
+styles, nav, footer), padded with promo rows to realistic sizes. For each
+input it checks that the streaming output matches BeautifulSoup's (on a
+preheader-free copy, since only the new converter drops hidden text), then
+times BeautifulSoup, streaming to the end, and streaming with the
+pipeline's PIPELINE_HTML_TEXT_MAX_CHARS budget.
+
+Needs beautifulsoup4 (reference path only).
+
+Usage:
+    python tests/eval/bench_html_to_text.py
+    python tests/eval/bench_html_to_text.py --promo-rows 200 --repeat 3   # quick run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from html import escape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.config import PIPELINE_HTML_TEXT_MAX_CHARS  # noqa: E402
+from reclaim.utils.html import html_to_text  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+PREHEADER = (
+    "<div style='display:none;max-height:0;overflow:hidden;mso-hide:all'>"
+    "Your order is confirmed - see what's inside &zwnj;&nbsp;&zwnj;&nbsp;</div>"
+)
+
+PROMO_ROW = (
+    "<tr><td style='padding:8px;border-bottom:1px solid #eee'>"
+    "<a href='https://example.com/p/{n}?utm_source=email'><img src='https://example.com/i/{n}.jpg'"
+    " width='120' alt=''></a></td><td style='padding:8px;font-size:13px;color:#333'>"
+    "<strong>Recommended item {n}</strong><br>Now $ {n}.99 &middot; Free shipping</td></tr>\n"
+)
+
+
+def bs4_html_to_text(html: str) -> str:
+    """The converter html_to_text used before (BeautifulSoup html.parser tree)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "head"]):
+        tag.decompose()
+    text = soup.get_text(separator="\n")
+    lines = [line.strip() for line in text.splitlines()]
+    text = "\n".join(lines)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def render(case: dict, promo_rows: int, preheader: bool) -> str:
+    rows = "".join(
+        f"<tr><td style='padding:4px 20px'>{escape(line)}</td></tr>\n"
+        for line in case["body"].splitlines()
+    )
+    promos = "".join(PROMO_ROW.format(n=n) for n in range(promo_rows))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Order</title>"
+        "<style>td{font-family:Arial} .btn{color:#fff}</style></head><body>"
+        + (PREHEADER if preheader else "")
+        + "<table width='600' align='center'><tr><td><a href='https://example.com'>Home</a> | "
+        "<a href='https://example.com/deals'>Deals</a></td></tr>"
+        + rows
+        + "</table><table width='600' align='center'>"
+        + promos
+        + "</table><table><tr><td style='font-size:11px;color:#999'>You received this email "
+        "because you made a purchase. Returns accepted within 30 days. "
+        "<a href='https://example.com/unsub'>Unsubscribe</a></td></tr></table>"
+        "<script>window.track && track('open')</script></body></html>"
+    )
+
+
+def timed(fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming html_to_text vs bs4")
+    parser.add_argument("--promo-rows", type=int, default=1200, help="Padding rows per email")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per input (best of)")
+    args = parser.parse_args()
+
+    cases = json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text())
+    inputs = [(c["body_html"], c["body_html"]) for c in cases if c.get("body_html")]
+    inputs += [
+        (render(c, args.promo_rows, preheader=True), render(c, args.promo_rows, preheader=False))
+        for c in cases
+    ]
+
+    mismatches = sum(1 for _, plain in inputs if html_to_text(plain) != bs4_html_to_text(plain))
+    preheaders_dropped = sum(
+        1 for html, _ in inputs if "see what's inside" not in html_to_text(html)
+    )
+
+    budget = PIPELINE_HTML_TEXT_MAX_CHARS
+    totals = {"bs4": 0.0, "stream": 0.0, f"stream[:{budget}]": 0.0}
+    for html, _ in inputs:
+        totals["bs4"] += timed(bs4_html_to_text, html, args.repeat)
+        totals["stream"] += timed(html_to_text, html, args.repeat)
+        totals[f"stream[:{budget}]"] += timed(
+            lambda h: html_to_text(h, max_chars=budget), html, args.repeat
+        )
+
+    avg_kb = sum(len(html) for html, _ in inputs) / len(inputs) / 1024
+    print(f"{len(inputs)} HTML emails, avg {avg_kb:.0f} KB")
+    print(f"  output mismatches vs bs4 (no preheader): {mismatches}/{len(inputs)}")
+    print(f"  hidden preheaders dropped: {preheaders_dropped}/{len(inputs)}")
+    for name, total in totals.items():
+        print(
+            f"  {name:>18}: {total / len(inputs) * 1000:7.2f} ms/email "
+            f"({totals['bs4'] / total:.1f}x vs bs4)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark Stage 1 keyword matching: single-pass matcher vs per-keyword scans.
+
+Runs MerchantDomainFilter.filter over the eval fixtures as the pipeline calls
+it (subject + first 2,000 chars of body), once with the real sender and once
+from an unknown domain so every email also goes through the keyword
+heuristics. The reference filter is the previous implementation, one
+``kw in text`` search per keyword. Checks both return identical
+FilterResults, then reports throughput in emails per second.
+
+The single-pass matcher uses pyahocorasick when installed and the stdlib
+regex trie otherwise; the backend in use is printed.
+
+Usage:
+    python tests/eval/bench_keyword_filter.py
+    python tests/eval/bench_keyword_filter.py --snippet-chars 500 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.returns.filter_data import (  # noqa: E402
+    DELIVERY_KEYWORDS,
+    GROCERY_PERISHABLE_PATTERNS,
+    NON_PURCHASE_KEYWORDS,
+    PURCHASE_CONFIRMATION_KEYWORDS,
+    SURVEY_SUBJECT_KEYWORDS,
+)
+from reclaim.returns.filters import MerchantDomainFilter  # noqa: E402
+from reclaim.returns.types import FilterResult  # noqa: E402
+from reclaim.utils import keywords  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Typical receipt footer, appended until the body fills the snippet window
+FOOTER = (
+    "Questions about your order? Visit our Help Center or reply to this email. "
+    "Returns are free within 30 days of delivery; items must be unworn with tags "
+    "attached. Prices and availability are subject to change. You are receiving "
+    "this email because you made a purchase. View our privacy policy. "
+)
+
+
+class PerKeywordFilter(MerchantDomainFilter):
+    """The previous filter: one substring search per keyword."""
+
+    def filter(self, from_address: str, subject: str, snippet: str = "") -> FilterResult:
+        domain = self._extract_domain(from_address)
+        text_lower = f"{subject} {snippet}".lower()
+        for pattern in GROCERY_PERISHABLE_PATTERNS:
+            if pattern in text_lower:
+                return FilterResult(False, f"grocery_food:{pattern}", domain, "blocklist")
+        subject_lower = subject.lower()
+        for keyword in SURVEY_SUBJECT_KEYWORDS:
+            if keyword in subject_lower:
+                return FilterResult(False, f"survey_feedback:{keyword}", domain, "blocklist")
+        if domain in self.blocklist:
+            return FilterResult(False, "blocklist", domain, "blocklist")
+        if domain in self.allowlist:
+            return FilterResult(True, "known_merchant", domain, "allowlist")
+        return self._check_heuristics(domain, subject, snippet)
+
+    def _check_heuristics(self, domain, subject, snippet, found=None):  # noqa: ARG002
+        text = f"{subject} {snippet}".lower()
+        purchase = sum(1 for kw in PURCHASE_CONFIRMATION_KEYWORDS if kw in text)
+        delivery = sum(1 for kw in DELIVERY_KEYWORDS if kw in text)
+        non_purchase = sum(1 for kw in NON_PURCHASE_KEYWORDS if kw in text)
+        if delivery >= 1:
+            return FilterResult(True, f"delivery_signal({delivery})", domain, "heuristic")
+        if purchase >= 1:
+            return FilterResult(True, f"purchase_signal({purchase})", domain, "heuristic")
+        if non_purchase >= 2:
+            return FilterResult(False, f"marketing_only({non_purchase})", domain, "heuristic")
+        return FilterResult(True, "unknown_let_llm_decide", domain, "unknown")
+
+
+def emails_per_second(domain_filter: MerchantDomainFilter, inputs: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for from_address, subject, snippet in inputs:
+            domain_filter.filter(from_address, subject, snippet)
+        best = min(best, time.perf_counter() - started)
+    return len(inputs) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Stage 1 keyword matching")
+    parser.add_argument("--snippet-chars", type=int, default=2000, help="Snippet length")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs (best of)")
+    args = parser.parse_args()
+
+    cases = json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text())
+    inputs = []
+    for case in cases:
+        body = case["body"]
+        while len(body) < args.snippet_chars:
+            body += "\n" + FOOTER
+        snippet = body[: args.snippet_chars]
+        inputs.append((case["from_address"], case["subject"], snippet))
+        inputs.append(("orders@unknown-shop.example", case["subject"], snippet))
+
+    reference = PerKeywordFilter()
+    single_pass = MerchantDomainFilter()
+    mismatches = sum(
+        1 for email in inputs if reference.filter(*email) != single_pass.filter(*email)
+    )
+
+    backend = "pyahocorasick" if keywords.ahocorasick is not None else "regex trie"
+    before = emails_per_second(reference, inputs, args.repeat)
+    after = emails_per_second(single_pass, inputs, args.repeat)
+
+    print(f"{len(inputs)} emails, {args.snippet_chars}-char snippets, matcher: {backend}")
+    print(f"  result mismatches vs per-keyword filter: {mismatches}/{len(inputs)}")
+    print(f"  per-keyword: {before:9,.0f} emails/s")
+    print(f"  single-pass: {after:9,.0f} emails/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compare the two Stage 2+3 LLM engines on the synthetic eval cases.
+
+Runs every case in-process through the pipeline once per mode
+(RECLAIM_PIPELINE_LLM_MODE=two_call and =combined) against the real Gemini
+backend, then reports per-email latency, tokens per email, and where the two
+modes disagree on the outcome.
+
+Usage:
+    RECLAIM_USE_LLM=true python tests/eval/compare_llm_modes.py
+    RECLAIM_USE_LLM=true python tests/eval/compare_llm_modes.py --tag amazon --limit 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.returns.combined_stage import LLM_MODES, get_llm_mode_report  # noqa: E402
+from reclaim.returns.extractor import ReturnableReceiptExtractor  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+REPORTS_DIR = Path(__file__).parent / "reports"
+
+
+def load_cases(tag: str | None, limit: int | None) -> list[dict]:
+    cases = json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text())
+    if tag:
+        cases = [c for c in cases if tag in c.get("tags", [])]
+    return cases[:limit] if limit else cases
+
+
+def run_mode(mode: str, cases: list[dict]) -> dict[str, dict]:
+    """Run all cases through one mode; outcome keyed by case id."""
+    extractor = ReturnableReceiptExtractor(llm_mode=mode)
+    outcomes = {}
+    for case in cases:
+        result = extractor.extract_from_email(
+            user_id="eval",
+            email_id=case["id"],
+            from_address=case["from_address"],
+            subject=case["subject"],
+            body=case["body"],
+            body_html=case.get("body_html"),
+        )
+        outcomes[case["id"]] = {
+            "success": result.success,
+            "stage_reached": result.stage_reached.value if result.stage_reached else None,
+            "item_summary": result.card.item_summary if result.card else None,
+        }
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two_call vs combined LLM modes")
+    parser.add_argument("--tag", help="Filter cases by tag")
+    parser.add_argument("--limit", type=int, help="Only run the first N cases")
+    parser.add_argument("--output", help="Output report file path (default: auto-generated)")
+    args = parser.parse_args()
+
+    cases = load_cases(args.tag, args.limit)
+    print(f"Running {len(cases)} cases through {', '.join(LLM_MODES)}")
+
+    outcomes = {mode: run_mode(mode, cases) for mode in LLM_MODES}
+    disagreements = [
+        {"case_id": case["id"], **{mode: outcomes[mode][case["id"]] for mode in LLM_MODES}}
+        for case in cases
+        if len({outcomes[mode][case["id"]]["success"] for mode in LLM_MODES}) > 1
+    ]
+
+    report = {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "cases": len(cases),
+        "modes": get_llm_mode_report(),
+        "disagreements": disagreements,
+    }
+
+    print()
+    for mode, stats in report["modes"].items():
+        print(
+            f"  {mode:>9}: p50 {stats['latency_p50_ms']:.0f} ms, "
+            f"p95 {stats['latency_p95_ms']:.0f} ms, "
+            f"{stats['prompt_tokens_per_email']:.0f} prompt + "
+            f"{stats['output_tokens_per_email']:.0f} output tokens/email"
+        )
+    print(f"  Outcome disagreements: {len(disagreements)}/{len(cases)}")
+
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+    output_path = args.output or str(REPORTS_DIR / f"llm-modes-{ts}.json")
+    Path(output_path).write_text(json.dumps(report, indent=2))
+    print(f"Report saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Compare relevance-windowed extractor prompt bodies with head truncation.
+
+For every returnable eval case, builds the Stage 3 prompt body both ways:
+- head: the first PIPELINE_BODY_TRUNCATION characters (the default)
+- windows: select_body_windows() within --budget estimated tokens
+
+and reports prompt body tokens and evidence recall: the share of the case's
+order details (expected order number, and every original body line with a
+digit or return wording) that survive into the prompt body.
+
+The fixture bodies are short, so by default each one is wrapped the way
+HTML-converted merchant emails usually are: navigation and promotions above
+the order details, legal and preference links below (--header-rows 0 to
+disable).
+
+With --llm, also runs ReturnFieldExtractor both ways against Gemini and
+reports extraction accuracy (order number, return date found) per variant.
+
+Usage:
+    python tests/eval/eval_body_windows.py
+    python tests/eval/eval_body_windows.py --budget 400 --header-rows 4 --verbose
+    RECLAIM_USE_LLM=true python tests/eval/eval_body_windows.py --llm
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.config import EXTRACTOR_BODY_TOKEN_BUDGET, PIPELINE_BODY_TRUNCATION  # noqa: E402
+from reclaim.returns.body_windows import estimate_tokens, select_body_windows  # noqa: E402
+from reclaim.returns.extractor import ReturnableReceiptExtractor  # noqa: E402
+from reclaim.returns.field_extractor import ReturnFieldExtractor  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# One row of header navigation and promotions (~550 chars); --header-rows sets
+# how many precede the order details
+HEADER_ROW = "\n\n".join(
+    [
+        "View this email in your browser",
+        "Shop | Deals | Gift Cards | Registry | Weekly Ad | Find a Store | Help",
+        "SALE: Up to 50% off select home, electronics and apparel. Shop now before it ends.\n"
+        "Members get free shipping on thousands of items. Sign up today.",
+        "Trending this week\nWireless earbuds from $29.99\nSmart home starter kits from $49.99\n"
+        "Kitchen essentials from $9.99\nBack to school deals from $4.99",
+        "Recommended for you\nBased on your browsing history, we picked these deals for you.\n"
+        "Top rated vacuums, air fryers, and outdoor furniture are all on sale.",
+    ]
+)
+FOOTER = "\n\n".join(
+    [
+        "Download our app for exclusive deals. Follow us on social media.",
+        "You are receiving this email because you opted in to marketing emails. "
+        "Manage your preferences or unsubscribe at any time.",
+        "Privacy Policy | Terms and Conditions | Accessibility | Interest-Based Ads",
+        "© 2026 Retailer Inc. All rights reserved. 1000 Main Street, Minneapolis, MN 55403.",
+    ]
+    * 3
+)
+
+_EVIDENCE_LINE_RE = re.compile(r"\d|\breturn", re.IGNORECASE)
+
+
+def load_cases(header_rows: int) -> list[dict]:
+    header = "\n\n".join([HEADER_ROW] * header_rows)
+    cases = []
+    for case in json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text()):
+        if not case["expected"]["should_extract"]:
+            continue
+        body = ReturnableReceiptExtractor._working_body(case["body"], case.get("body_html"))
+        evidence = [line.strip() for line in body.splitlines() if _EVIDENCE_LINE_RE.search(line)]
+        # Footer boilerplate in the fixtures (addresses, phone numbers) isn't evidence
+        evidence = [
+            line for line in evidence if "|" not in line and "unsubscribe" not in line.lower()
+        ]
+        if case["expected"].get("order_number"):
+            evidence.append(case["expected"]["order_number"])
+        cases.append(
+            {
+                **case,
+                "working_body": f"{header}\n\n{body}\n\n{FOOTER}" if header_rows else body,
+                "evidence": evidence,
+            }
+        )
+    return cases
+
+
+def recall(text: str, evidence: list[str]) -> float:
+    return sum(item in text for item in evidence) / len(evidence) if evidence else 1.0
+
+
+def prompt_report(cases: list[dict], budget: int, verbose: bool) -> None:
+    totals = {"head": [0, 0.0], "windows": [0, 0.0]}
+    for case in cases:
+        body = case["working_body"]
+        variants = {
+            "head": body[:PIPELINE_BODY_TRUNCATION],
+            "windows": select_body_windows(body, budget),
+        }
+        for name, text in variants.items():
+            totals[name][0] += estimate_tokens(text)
+            totals[name][1] += recall(text, case["evidence"])
+        if verbose:
+            print(
+                f"  {case['id']}: tokens {estimate_tokens(variants['head'])} -> "
+                f"{estimate_tokens(variants['windows'])}, recall "
+                f"{recall(variants['head'], case['evidence']):.0%} -> "
+                f"{recall(variants['windows'], case['evidence']):.0%}"
+            )
+
+    n = len(cases)
+    head_tokens, windows_tokens = totals["head"][0], totals["windows"][0]
+    print(f"{n} returnable cases, budget {budget} tokens")
+    print(f"  {'variant':<10}{'body tokens/email':>18}{'evidence recall':>17}")
+    for name, (tokens, recall_sum) in totals.items():
+        print(f"  {name:<10}{tokens / n:>18.0f}{recall_sum / n:>17.1%}")
+    if head_tokens:
+        saved = 1 - windows_tokens / head_tokens
+        print(f"  prompt body tokens saved: {saved:.1%}")
+
+
+def llm_report(cases: list[dict], budget: int) -> None:
+    variants = {
+        "head": ReturnFieldExtractor(body_token_budget=None),
+        "windows": ReturnFieldExtractor(body_token_budget=budget),
+    }
+    print("\nLLM extraction accuracy (vs expected)")
+    print(f"  {'variant':<10}{'order # ok':>12}{'return date':>13}")
+    accuracy = {}
+    for name, extractor in variants.items():
+        order_ok = return_ok = 0
+        for case in cases:
+            fields = extractor.extract(
+                case["from_address"],
+                case["subject"],
+                case["working_body"],
+                case["expected"].get("merchant_domain") or "",
+            )
+            order_ok += fields.order_number == case["expected"].get("order_number")
+            return_ok += (fields.return_by_date is not None) == case["expected"]["has_return_date"]
+        accuracy[name] = (order_ok / len(cases), return_ok / len(cases))
+        print(f"  {name:<10}{accuracy[name][0]:>12.1%}{accuracy[name][1]:>13.1%}")
+    delta = [w - h for h, w in zip(accuracy["head"], accuracy["windows"], strict=True)]
+    print(f"  {'delta':<10}{delta[0]:>+12.1%}{delta[1]:>+13.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Windowed vs truncated extractor prompt bodies")
+    parser.add_argument("--budget", type=int, default=EXTRACTOR_BODY_TOKEN_BUDGET)
+    parser.add_argument(
+        "--header-rows", type=int, default=7, help="Promo rows above the order (0: no wrapping)"
+    )
+    parser.add_argument("--llm", action="store_true", help="Also compare Gemini extractions")
+    parser.add_argument("--verbose", action="store_true", help="Print every case")
+    args = parser.parse_args()
+
+    cases = load_cases(args.header_rows)
+    prompt_report(cases, args.budget, args.verbose)
+    if args.llm:
+        llm_report(cases, args.budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Report merchant parser coverage on the eval fixtures.
+
+For every fixture that passes Stage 1 and comes from a merchant with a
+registered parser, runs the parser and reports per merchant:
+- parsed: share of returnable emails that would skip the Stage 3 LLM call
+- order # ok: parsed order numbers matching expected.order_number
+- misses: returnable emails left to the LLM (e.g. pickup or pre-order layouts)
+
+Usage:
+    python tests/eval/eval_merchant_parsers.py
+    python tests/eval/eval_merchant_parsers.py --verbose
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.returns.extractor import ReturnableReceiptExtractor  # noqa: E402
+from reclaim.returns.filters import MerchantDomainFilter  # noqa: E402
+from reclaim.returns.merchant_parsers import get_merchant_parser  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merchant parser coverage on eval fixtures")
+    parser.add_argument("--verbose", action="store_true", help="Print every parse")
+    args = parser.parse_args()
+
+    domain_filter = MerchantDomainFilter()
+    rows: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for case in json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text()):
+        expected = case["expected"]
+        if not expected["should_extract"]:
+            continue
+        body = ReturnableReceiptExtractor._working_body(case["body"], case.get("body_html"))
+        filter_result = domain_filter.filter(case["from_address"], case["subject"], body[:2000])
+        merchant_parser = filter_result.is_candidate and get_merchant_parser(filter_result.domain)
+        if not merchant_parser:
+            continue
+
+        fields = merchant_parser.parse(case["subject"], body)
+        row = rows[merchant_parser.domain]
+        row["emails"] += 1
+        if fields is None:
+            row["misses"] += 1
+        else:
+            row["parsed"] += 1
+            row["order_ok"] += fields["order_number"] == expected.get("order_number")
+        if args.verbose:
+            print(f"  {case['id']}: {json.dumps(fields) if fields else 'no confident parse'}")
+
+    print(f"{'merchant':<16}{'emails':>7}{'parsed':>14}{'order # ok':>12}{'misses':>8}")
+    for domain, row in sorted(rows.items()):
+        print(
+            f"{domain:<16}{row['emails']:>7}{row['parsed']:>7} ({row['parsed'] / row['emails']:4.0%})"
+            f"{row['order_ok']:>12}{row['misses']:>8}"
+        )
+    emails = sum(row["emails"] for row in rows.values())
+    parsed = sum(row["parsed"] for row in rows.values())
+    if emails:
+        print(f"{'all':<16}{emails:>7}{parsed:>7} ({parsed / emails:4.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Train the local returnability model and report its LLM-call trade-off.
+
+Training examples are the eval fixtures that pass Stage 1 (the model only
+ever sees those), labelled by expected.should_extract, plus optionally
+logged classifier verdicts: a JSONL file with one
+{"from_address", "subject", "snippet", "is_returnable"} object per line.
+
+Before writing the model, every example is scored by a model trained without
+it (k-fold cross-validation), and for each (reject, accept) threshold pair
+the script reports the share of Stage 2 LLM calls the model would replace
+and how often those local verdicts disagree with the label:
+- false rejects: returnable emails rejected locally (lost cards)
+- false accepts: non-returnable emails sent to Stage 3 without the LLM check
+
+Usage:
+    python tests/eval/train_local_model.py
+    python tests/eval/train_local_model.py --verdicts verdicts.jsonl --folds 10
+    python tests/eval/train_local_model.py --output /tmp/model.json --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from reclaim.returns.extractor import ReturnableReceiptExtractor  # noqa: E402
+from reclaim.returns.filters import MerchantDomainFilter  # noqa: E402
+from reclaim.returns.local_model import (  # noqa: E402
+    DEFAULT_BUCKETS,
+    DEFAULT_LOCAL_MODEL_PATH,
+    LocalReturnabilityModel,
+    feature_names,
+    hash_features,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+THRESHOLDS = [(0.02, 0.98), (0.05, 0.95), (0.1, 0.9), (0.2, 0.8), (0.3, 0.7)]
+
+
+def load_examples(verdicts_path: Path | None) -> list[tuple[list[int], bool]]:
+    domain_filter = MerchantDomainFilter()
+    rows = []
+    for case in json.loads((FIXTURES_DIR / "synthetic-emails.json").read_text()):
+        body = ReturnableReceiptExtractor._working_body(case["body"], case.get("body_html"))
+        snippet = body[:2000] if body else ""
+        rows.append(
+            (case["from_address"], case["subject"], snippet, case["expected"]["should_extract"])
+        )
+    if verdicts_path is not None:
+        for line in verdicts_path.read_text().splitlines():
+            if line.strip():
+                v = json.loads(line)
+                rows.append((v["from_address"], v["subject"], v["snippet"], v["is_returnable"]))
+
+    examples = []
+    for from_address, subject, snippet, label in rows:
+        filter_result = domain_filter.filter(from_address, subject, snippet)
+        if filter_result.is_candidate:
+            names = feature_names(filter_result.domain, from_address, subject, snippet)
+            examples.append((hash_features(names, DEFAULT_BUCKETS), bool(label)))
+    return examples
+
+
+def cross_val_scores(examples: list[tuple[list[int], bool]], folds: int, seed: int) -> list[float]:
+    """Out-of-fold P(returnable) per example."""
+    order = list(range(len(examples)))
+    random.Random(seed).shuffle(order)
+    scores = [0.0] * len(examples)
+    for fold in range(folds):
+        held_out = set(order[fold::folds])
+        model = LocalReturnabilityModel.train(
+            [ex for i, ex in enumerate(examples) if i not in held_out]
+        )
+        for i in held_out:
+            scores[i] = model._score(examples[i][0])
+    return scores
+
+
+def report(examples: list[tuple[list[int], bool]], scores: list[float]) -> None:
+    total = len(examples)
+    positives = sum(label for _, label in examples)
+    print(f"{total} Stage 1 survivors ({positives} returnable), out-of-fold scores")
+    print("  reject<=  accept>=  LLM calls saved  false rejects  false accepts  local accuracy")
+    for reject_p, accept_p in THRESHOLDS:
+        decided = false_rejects = false_accepts = 0
+        for (_, label), p in zip(examples, scores, strict=True):
+            if p >= accept_p:
+                decided += 1
+                false_accepts += not label
+            elif p <= reject_p:
+                decided += 1
+                false_rejects += label
+        wrong = false_rejects + false_accepts
+        accuracy = f"{(decided - wrong) / decided:.1%}" if decided else "-"
+        print(
+            f"  {reject_p:7.2f}  {accept_p:8.2f}  {decided:4d} ({decided / total:5.1%})"
+            f"  {false_rejects:13d}  {false_accepts:13d}  {accuracy:>14}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local returnability model")
+    parser.add_argument("--verdicts", type=Path, help="JSONL of logged classifier verdicts")
+    parser.add_argument("--folds", type=int, default=10, help="Cross-validation folds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_LOCAL_MODEL_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="Report only, write nothing")
+    args = parser.parse_args()
+
+    examples = load_examples(args.verdicts)
+    report(examples, cross_val_scores(examples, args.folds, args.seed))
+
+    if not args.dry_run:
+        model = LocalReturnabilityModel.train(examples, seed=args.seed)
+        model.save(args.output)
+        print(f"Wrote {len(model.weights)} weights to {args.output}")
+
+
+if __name__ == "__main__":
+    main()